@@ -2,48 +2,18 @@
 Admin API Routes - Complete Admin Panel Backend
 """
 
-from flask import Blueprint, request, jsonify, current_app
-from functools import wraps
+from flask import Blueprint, request, jsonify
 from bson import ObjectId
-from datetime import datetime, timedelta
-import jwt
+from datetime import datetime
+from career_summary_cache import career_summary_cache
+from catalogue_snapshot import catalogue_cache
+from user_role_cache import user_role_cache
+from dashboard_stats import dashboard_stats
+from user_search import name_tokens
+from admin_common import admin_required, list_users
 
 admin_bp = Blueprint('admin', __name__)
 
-# Helper to get current user from token
-def get_current_user():
-    """Get current user from JWT token"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None
-    
-    token = auth_header.split(' ')[1]
-    
-    try:
-        payload = jwt.decode(
-            token,
-            current_app.config['SECRET_KEY'],
-            algorithms=['HS256']
-        )
-        
-        from app import db
-        user = db.users.find_one({'_id': ObjectId(payload['user_id'])})
-        return user
-    except:
-        return None
-
-
-# Admin authentication decorator
-def admin_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        user = get_current_user()
-        if not user or user.get('role') != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
-        return f(*args, **kwargs)
-    return decorated_function
-
 
 @admin_bp.route('/dashboard', methods=['GET', 'OPTIONS'])
 @admin_required
@@ -55,53 +25,10 @@ def get_dashboard_stats():
     try:
         from app import db
         
-        # Count users by role
-        total_users = db.users.count_documents({})
-        total_students = db.users.count_documents({'role': 'student'})
-        total_counsellors = db.users.count_documents({'role': 'counsellor'})
-        
-        # Count careers and colleges
-        total_careers = db.careers.count_documents({})
-        total_colleges = db.colleges.count_documents({})
+        # One shared document, recomputed at most once a minute
+        stats, computed_at = dashboard_stats.get(db, refresh=request.args.get('refresh') == 'true')
         
-        # Count sessions
-        collection_names = db.list_collection_names()
-        total_sessions = db.appointments.count_documents({}) if 'appointments' in collection_names else 0
-        
-        # Calculate revenue
-        if 'appointments' in collection_names:
-            revenue_pipeline = [
-                {'$match': {'status': 'completed'}},
-                {'$group': {'_id': None, 'total': {'$sum': '$amount_paid'}}}
-            ]
-            revenue_result = list(db.appointments.aggregate(revenue_pipeline))
-            revenue = revenue_result[0]['total'] if revenue_result else 0
-        else:
-            revenue = 0
-        
-        # Active users (logged in last 24 hours)
-        twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
-        active_now = db.users.count_documents({
-            'last_login': {'$gte': twenty_four_hours_ago}
-        })
-        
-        # Pending counsellor approvals
-        pending_approvals = db.users.count_documents({
-            'role': 'counsellor',
-            'is_active': False
-        })
-        
-        return jsonify({
-            'totalUsers': total_users,
-            'totalStudents': total_students,
-            'totalCounsellors': total_counsellors,
-            'totalSessions': total_sessions,
-            'totalCareers': total_careers,
-            'totalColleges': total_colleges,
-            'revenue': revenue,
-            'activeNow': active_now,
-            'pendingApprovals': pending_approvals
-        }), 200
+        return jsonify({**stats, 'computedAt': computed_at.isoformat()}), 200
         
     except Exception as e:
         print(f"❌ Dashboard stats error: {e}")
@@ -121,45 +48,7 @@ def get_all_users():
     
     try:
         from app import db
-        
-        # Get query parameters
-        role = request.args.get('role')
-        search = request.args.get('search')
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 50))
-        
-        # Build query
-        query = {}
-        if role:
-            query['role'] = role
-        if search:
-            query['$or'] = [
-                {'name': {'$regex': search, '$options': 'i'}},
-                {'email': {'$regex': search, '$options': 'i'}},
-                {'username': {'$regex': search, '$options': 'i'}}
-            ]
-        
-        # Get users
-        users = list(db.users.find(query, {'password': 0})
-                    .skip((page - 1) * limit)
-                    .limit(limit)
-                    .sort('created_at', -1))
-        
-        # Format response
-        for user in users:
-            user['_id'] = str(user['_id'])
-            if 'created_at' in user:
-                user['created_at'] = user['created_at'].isoformat()
-        
-        # Get total count
-        total = db.users.count_documents(query)
-        
-        return jsonify({
-            'users': users,
-            'total': total,
-            'page': page,
-            'pages': (total + limit - 1) // limit
-        }), 200
+        return list_users(db)
         
     except Exception as e:
         print(f"❌ Get users error: {e}")
@@ -184,6 +73,11 @@ def update_user(user_id):
         
         data['updated_at'] = datetime.utcnow()
         
+        # Keep the indexed search words in step with the name
+        data.pop('name_tokens', None)
+        if 'name' in data:
+            data['name_tokens'] = name_tokens(data['name'])
+        
         result = db.users.update_one(
             {'_id': ObjectId(user_id)},
             {'$set': data}
@@ -192,6 +86,9 @@ def update_user(user_id):
         if result.matched_count == 0:
             return jsonify({'error': 'User not found'}), 404
         
+        user_role_cache.invalidate(user_id)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({'message': 'User updated successfully'}), 200
         
     except Exception as e:
@@ -214,6 +111,9 @@ def delete_user(user_id):
         if result.deleted_count == 0:
             return jsonify({'error': 'User not found'}), 404
         
+        user_role_cache.invalidate(user_id)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({'message': 'User deleted successfully'}), 200
         
     except Exception as e:
@@ -282,6 +182,9 @@ def approve_counsellor(counsellor_id):
         if result.matched_count == 0:
             return jsonify({'error': 'Counsellor not found'}), 404
         
+        user_role_cache.invalidate(counsellor_id)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({
             'message': f'Counsellor {"approved" if approved else "rejected"} successfully'
         }), 200
@@ -337,6 +240,9 @@ def add_career():
         data['updated_at'] = datetime.utcnow()
         
         result = db.careers.insert_one(data)
+        career_summary_cache.invalidate()
+        catalogue_cache.invalidate(db)
+        dashboard_stats.invalidate(db)
         
         return jsonify({
             'message': 'Career added successfully',
@@ -369,6 +275,10 @@ def update_career(career_id):
         if result.matched_count == 0:
             return jsonify({'error': 'Career not found'}), 404
         
+        career_summary_cache.invalidate()
+        catalogue_cache.invalidate(db)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({'message': 'Career updated successfully'}), 200
         
     except Exception as e:
@@ -391,6 +301,10 @@ def delete_career(career_id):
         if result.deleted_count == 0:
             return jsonify({'error': 'Career not found'}), 404
         
+        career_summary_cache.invalidate()
+        catalogue_cache.invalidate(db)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({'message': 'Career deleted successfully'}), 200
         
     except Exception as e:
@@ -444,6 +358,8 @@ def add_college():
         data['updated_at'] = datetime.utcnow()
         
         result = db.colleges.insert_one(data)
+        catalogue_cache.invalidate(db)
+        dashboard_stats.invalidate(db)
         
         return jsonify({
             'message': 'College added successfully',
@@ -476,6 +392,9 @@ def update_college(college_id):
         if result.matched_count == 0:
             return jsonify({'error': 'College not found'}), 404
         
+        catalogue_cache.invalidate(db)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({'message': 'College updated successfully'}), 200
         
     except Exception as e:
@@ -498,6 +417,9 @@ def delete_college(college_id):
         if result.deleted_count == 0:
             return jsonify({'error': 'College not found'}), 404
         
+        catalogue_cache.invalidate(db)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({'message': 'College deleted successfully'}), 200
         
     except Exception as e:
@@ -537,4 +459,67 @@ def get_user_analytics():
         
     except Exception as e:
         print(f"❌ Analytics error: {e}")
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+# ==================== QUIZ MAINTENANCE ====================
+
+@admin_bp.route('/quiz/rescore', methods=['POST', 'OPTIONS'])
+@admin_required
+def start_quiz_rescore():
+    """Re-score stored quiz results with the current question bank"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        from app import db
+        from rescore_quiz_results import start_rescore_job
+        
+        data = request.json or {}
+        quiz_type = data.get('quiz_type', 'all')
+        if quiz_type not in ('aptitude', 'personality', 'all'):
+            return jsonify({'error': 'Invalid quiz type'}), 400
+        
+        job_id = str(data.get('job_id', 'quiz-rescore'))
+        started = start_rescore_job(
+            db,
+            quiz_type=quiz_type,
+            batch_size=min(max(int(data.get('batch_size', 500)), 1), 5000),
+            workers=min(max(int(data.get('workers', 2)), 0), 8),
+            resume=bool(data.get('resume', False)),
+            job_id=job_id
+        )
+        
+        if not started:
+            return jsonify({'error': 'Re-scoring job is already running', 'job_id': job_id}), 409
+        
+        return jsonify({'message': 'Re-scoring started', 'job_id': job_id}), 202
+        
+    except Exception as e:
+        print(f"❌ Start re-score error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/quiz/rescore/<job_id>', methods=['GET', 'OPTIONS'])
+@admin_required
+def get_quiz_rescore_status(job_id):
+    """Progress of a re-scoring job"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        from app import db
+        from rescore_quiz_results import CHECKPOINT_COLLECTION
+        
+        checkpoint = db[CHECKPOINT_COLLECTION].find_one({'_id': job_id})
+        if not checkpoint:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        for progress in checkpoint.get('progress', {}).values():
+            if progress.get('last_id') is not None:
+                progress['last_id'] = str(progress['last_id'])
+        
+        return jsonify({'job': checkpoint}), 200
+        
+    except Exception as e:
+        print(f"❌ Re-score status error: {e}")
+        return jsonify({'error': str(e)}), 500
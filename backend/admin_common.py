@@ -0,0 +1,107 @@
+"""
+Admin Common
+Authorization and the user listing shared by admin_api and routes/admin_routes
+"""
+
+from flask import request, jsonify
+from functools import wraps
+from auth_middleware import authenticate
+from user_role_cache import user_role_cache
+from keyset_cursor import encode_cursor, decode_cursor, after_cursor
+from user_search import user_search_query
+
+# Admin user listings report totals above this as "at least"
+USER_COUNT_CAP = 10000
+
+
+# Admin authentication decorator
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user_id, role, error, status = authenticate()
+        if error:
+            return jsonify({'error': 'Admin access required'}), 403
+
+        try:
+            from app import db
+            identity = user_role_cache.get(user_id, db)
+        except:
+            identity = None
+
+        if not identity or identity['role'] != 'admin' or not identity['is_active']:
+            return jsonify({'error': 'Admin access required'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def list_users(db, default_limit=50):
+    """
+    One page of users for the admin user list, newest first
+
+    Pages are fetched by next_cursor. The older ?page=N is still honoured
+    with a skip and answered with 'page' and 'pages' as before; it gets
+    slower the deeper the page, so new callers should use the cursor.
+    """
+    role = request.args.get('role')
+    search = request.args.get('search', '').strip()
+    cursor = request.args.get('cursor')
+    page = request.args.get('page')
+
+    try:
+        limit = min(max(int(request.args.get('limit', default_limit)), 1), 100)
+        page = max(int(page), 1) if page is not None else None
+    except ValueError:
+        return jsonify({'error': 'page and limit must be numbers'}), 400
+
+    if cursor and page is not None:
+        return jsonify({'error': 'Use either cursor or page, not both'}), 400
+
+    # Build query
+    filters = []
+    if role:
+        filters.append({'role': role})
+    if search:
+        filters.append(user_search_query(search))
+    count_query = {'$and': list(filters)} if filters else {}
+
+    if cursor:
+        try:
+            created_at, last_id = decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        filters.append(after_cursor('created_at', created_at, last_id))
+
+    # Get one page past the cursor, newest first, from the (created_at, _id) index
+    users = db.users.find({'$and': filters} if filters else {}, {'password': 0}).sort([('created_at', -1), ('_id', -1)])
+    if page is not None:
+        users = users.skip((page - 1) * limit)
+    users = list(users.limit(limit + 1))
+
+    has_more = len(users) > limit
+    users = users[:limit]
+    next_cursor = encode_cursor(users[-1], 'created_at') if has_more else None
+
+    # Format response
+    for user in users:
+        user['_id'] = str(user['_id'])
+        if 'created_at' in user:
+            user['created_at'] = user['created_at'].isoformat()
+
+    # Exact counts stop at USER_COUNT_CAP; the unfiltered total comes from collection metadata
+    if count_query:
+        total = db.users.count_documents(count_query, limit=USER_COUNT_CAP)
+    else:
+        total = db.users.estimated_document_count()
+
+    response = {
+        'users': users,
+        'total': total,
+        'total_capped': bool(count_query) and total >= USER_COUNT_CAP,
+        'has_more': has_more,
+        'next_cursor': next_cursor
+    }
+    if page is not None:
+        response['page'] = page
+        response['pages'] = (total + limit - 1) // limit
+
+    return jsonify(response), 200
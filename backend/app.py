@@ -3,18 +3,25 @@ AI Career Counselling Backend - Complete Production Version
 All Features Integrated - FIXED VERSION WITH CHAT ROUTES
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from datetime import datetime, timedelta
-from pymongo import MongoClient, ASCENDING
+from pymongo import MongoClient, ASCENDING, DESCENDING
 from bson import ObjectId
-import bcrypt
 import jwt
 import os
 import re
+import json
 from dotenv import load_dotenv
 from flask_mail import Mail, Message
 import secrets
+import hashlib
+from career_recommendation import recommendation_engine, get_batch_career_recommendations
+from auth_middleware import authenticate, init_auth, token_verifier
+from password_hasher import password_hasher, PasswordPoolBusy
+from user_search import name_tokens
+from catalogue_snapshot import catalogue_cache, compute_college_stats
+from dashboard_stats import dashboard_stats
 
 # Load environment variables
 load_dotenv()
@@ -25,6 +32,7 @@ app = Flask(__name__)
 # Configuration
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'career-counselling-secret-key-2026')
 app.config['MONGODB_URI'] = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/career_counselling')
+app.config['MAX_BATCH_PROFILES'] = int(os.getenv('MAX_BATCH_PROFILES', 10000))
 
 # Email Configuration
 app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
@@ -45,15 +53,35 @@ CORS(app, resources={
     }
 })
 
+# Verify bearer tokens once per request, claims land on flask.g
+init_auth(app)
+
+def ensure_indexes(db):
+    """Create the indexes the routes rely on; a failure only logs a warning"""
+    indexes = [
+        (db.users, [("email", ASCENDING)], {'unique': True}),
+        (db.users, [("username", ASCENDING)], {'unique': True}),
+        (db.users, [("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        (db.users, [("role", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        (db.users, [("name_tokens", ASCENDING)], {}),
+        (db.career_recommendations, [("user_id", ASCENDING)], {'unique': True}),
+        (db.chat_history, [("session_id", ASCENDING)], {}),
+        (db.quiz_results, [("user_id", ASCENDING), ("completed_at", DESCENDING), ("_id", DESCENDING)], {})
+    ]
+    
+    for collection, keys, options in indexes:
+        try:
+            collection.create_index(keys, **options)
+        except Exception as e:
+            # e.g. existing duplicates or an index with conflicting options
+            print(f"⚠️ Could not create index {keys} on {collection.name}: {e}")
+
+
 # MongoDB Connection
 try:
     client = MongoClient(app.config['MONGODB_URI'], serverSelectionTimeoutMS=5000)
     db = client.get_database()
     
-    # Create unique indexes
-    db.users.create_index([("email", ASCENDING)], unique=True)
-    db.users.create_index([("username", ASCENDING)], unique=True)
-    
     # Test connection
     client.server_info()
     print("=" * 60)
@@ -70,6 +98,10 @@ except Exception as e:
     print("=" * 60)
     db = None
 
+# Kept out of the connection check so an index problem can't disable the database
+if db is not None:
+    ensure_indexes(db)
+
 
 # ==================== VALIDATION FUNCTIONS ====================
 
@@ -128,20 +160,7 @@ def validate_dob(dob_str):
 
 def hash_password(password):
     """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-
-
-def verify_password(password, hashed):
-    """Verify password against hash"""
-    try:
-        if isinstance(password, bytes):
-            password = password.decode('utf-8')
-        if isinstance(hashed, str):
-            hashed = hashed.encode('utf-8')
-        return bcrypt.checkpw(password.encode('utf-8'), hashed)
-    except Exception as e:
-        print(f"❌ Password verification error: {e}")
-        return False
+    return password_hasher.hash(password)
 
 
 def generate_token(user_id, role='student'):
@@ -155,22 +174,6 @@ def generate_token(user_id, role='student'):
     return jwt.encode(payload, app.config['SECRET_KEY'], algorithm='HS256')
 
 
-def get_user_from_token():
-    """Extract user from Authorization header"""
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None, None, 'No token provided', 401
-    
-    token = auth_header.split(' ')[1]
-    try:
-        payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        return payload['user_id'], payload.get('role'), None, None
-    except jwt.ExpiredSignatureError:
-        return None, None, 'Token expired', 401
-    except jwt.InvalidTokenError:
-        return None, None, 'Invalid token', 401
-
-
 # ==================== AUTHENTICATION ROUTES ====================
 
 @app.route('/api/auth/register', methods=['POST', 'OPTIONS'])
@@ -250,6 +253,7 @@ def register():
         # Create user document
         user = {
             'name': data['name'].strip(),
+            'name_tokens': name_tokens(data['name']),
             'email': email,
             'username': username,
             'password': hashed_password,
@@ -296,6 +300,7 @@ def register():
         # Insert into database
         result = db.users.insert_one(user)
         user_id = str(result.inserted_id)
+        dashboard_stats.invalidate(db)
         
         print(f"✅ User registered: {user_id}, Role: {role}\n")
         
@@ -314,6 +319,8 @@ def register():
             }
         }), 201
         
+    except PasswordPoolBusy as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
     except Exception as e:
         print(f"❌ Registration error: {str(e)}\n")
         import traceback
@@ -349,8 +356,9 @@ def login():
         
         print(f"✅ User found: {user['name']} ({user.get('role', 'student')})")
         
-        # Verify password
-        if not verify_password(password, user['password']):
+        # Verify password, upgrading hashes made with an old cost factor
+        matched, upgraded_hash = password_hasher.verify_and_upgrade(password, user['password'])
+        if not matched:
             print(f"❌ Invalid password\n")
             return jsonify({'error': 'Invalid username/email or password'}), 401
         
@@ -361,7 +369,10 @@ def login():
             return jsonify({'error': 'Account is deactivated'}), 403
         
         # Update last login
-        db.users.update_one({'_id': user['_id']}, {'$set': {'last_login': datetime.utcnow()}})
+        login_update = {'last_login': datetime.utcnow()}
+        if upgraded_hash:
+            login_update['password'] = upgraded_hash
+        db.users.update_one({'_id': user['_id']}, {'$set': login_update})
         
         # Generate token
         user_id = str(user['_id'])
@@ -381,6 +392,8 @@ def login():
             }
         }), 200
         
+    except PasswordPoolBusy as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
     except Exception as e:
         print(f"❌ Login error: {str(e)}\n")
         import traceback
@@ -455,7 +468,7 @@ def verify_token():
     if request.method == 'OPTIONS':
         return '', 200
     
-    user_id, role, error, status = get_user_from_token()
+    user_id, role, error, status = authenticate()
     
     if error:
         return jsonify({'error': error}), status
@@ -682,6 +695,8 @@ def reset_password():
         
         return jsonify({'message': 'Password reset successful. You can now login with your new password.'}), 200
         
+    except PasswordPoolBusy as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
     except Exception as e:
         print(f"❌ Reset password error: {str(e)}")
         import traceback
@@ -701,7 +716,7 @@ def get_profile():
         return jsonify({'error': 'Database connection error'}), 500
     
     try:
-        user_id, role, error, status = get_user_from_token()
+        user_id, role, error, status = authenticate()
         if error:
             return jsonify({'error': error}), status
         
@@ -751,7 +766,7 @@ def update_profile():
         return jsonify({'error': 'Database connection error'}), 500
     
     try:
-        user_id, role, error, status = get_user_from_token()
+        user_id, role, error, status = authenticate()
         if error:
             return jsonify({'error': error}), status
         
@@ -762,6 +777,7 @@ def update_profile():
         
         if 'name' in data:
             update_doc['$set']['name'] = data['name']
+            update_doc['$set']['name_tokens'] = name_tokens(data['name'])
         
         if role == 'student':
             if 'profile' in data:
@@ -800,24 +816,11 @@ def get_careers():
         return jsonify({'error': 'Database connection error'}), 500
     
     try:
-        category = request.args.get('category')
-        search = request.args.get('search')
-        
-        query = {}
-        
-        if category and category.lower() != 'all':
-            query['category'] = {'$regex': category, '$options': 'i'}
-        
-        if search:
-            query['$or'] = [
-                {'name': {'$regex': search, '$options': 'i'}},
-                {'description': {'$regex': search, '$options': 'i'}}
-            ]
-        
-        careers = list(db.careers.find(query))
-        
-        for career in careers:
-            career['_id'] = str(career['_id'])
+        careers = catalogue_cache.get(db).find(
+            'careers',
+            filters={'category': request.args.get('category')},
+            search=request.args.get('search')
+        )
         
         print(f"✅ Fetched {len(careers)} careers")
         
@@ -838,13 +841,11 @@ def get_career_details(career_id):
         return jsonify({'error': 'Database connection error'}), 500
     
     try:
-        career = db.careers.find_one({'_id': ObjectId(career_id)})
+        career = catalogue_cache.get(db).get('careers', career_id)
         
         if not career:
             return jsonify({'error': 'Career not found'}), 404
         
-        career['_id'] = str(career['_id'])
-        
         return jsonify(career), 200
         
     except Exception as e:
@@ -864,33 +865,15 @@ def get_colleges():
         return jsonify({'error': 'Database connection error'}), 500
     
     try:
-        district = request.args.get('district')
-        college_type = request.args.get('type')
-        search = request.args.get('search')
-        
-        query = {}
-        
-        if district and district.lower() != 'all':
-            query['district'] = {'$regex': district, '$options': 'i'}
-        
-        if college_type and college_type.lower() != 'all':
-            query['type'] = {'$regex': college_type, '$options': 'i'}
-        
-        if search:
-            query['$or'] = [
-                {'name': {'$regex': search, '$options': 'i'}},
-                {'location': {'$regex': search, '$options': 'i'}},
-                {'short_name': {'$regex': search, '$options': 'i'}}
-            ]
-        
-        colleges = list(db.colleges.find(query))
-        
-        for college in colleges:
-            college['_id'] = str(college['_id'])
-            if 'created_at' in college:
-                college['created_at'] = college['created_at'].isoformat()
-            if 'updated_at' in college:
-                college['updated_at'] = college['updated_at'].isoformat()
+        colleges = catalogue_cache.get(db).find(
+            'colleges',
+            filters={
+                'district': request.args.get('district'),
+                'type': request.args.get('type'),
+                'course': request.args.get('course')
+            },
+            search=request.args.get('search')
+        )
         
         print(f"✅ Fetched {len(colleges)} colleges")
         
@@ -913,18 +896,11 @@ def get_college_details(college_id):
         return jsonify({'error': 'Database connection error'}), 500
     
     try:
-        college = db.colleges.find_one({'_id': ObjectId(college_id)})
+        college = catalogue_cache.get(db).get('colleges', college_id)
         
         if not college:
             return jsonify({'error': 'College not found'}), 404
         
-        college['_id'] = str(college['_id'])
-        
-        if 'created_at' in college:
-            college['created_at'] = college['created_at'].isoformat()
-        if 'updated_at' in college:
-            college['updated_at'] = college['updated_at'].isoformat()
-        
         return jsonify(college), 200
         
     except Exception as e:
@@ -942,25 +918,11 @@ def get_college_stats():
         return jsonify({'error': 'Database connection error'}), 500
     
     try:
-        total = db.colleges.count_documents({})
-        
-        by_type = {}
-        types = db.colleges.distinct('type')
-        for ctype in types:
-            count = db.colleges.count_documents({'type': ctype})
-            by_type[ctype] = count
-        
-        by_district = {}
-        districts = db.colleges.distinct('district')
-        for district in districts:
-            count = db.colleges.count_documents({'district': district})
-            by_district[district] = count
+        # Recomputed only when the catalogue version changes
+        snapshot = catalogue_cache.get(db)
+        stats = snapshot.memo('college_stats', lambda: compute_college_stats(db))
         
-        return jsonify({
-            'total': total,
-            'by_type': by_type,
-            'by_district': by_district
-        }), 200
+        return jsonify({**stats, 'catalogue_version': snapshot.version}), 200
         
     except Exception as e:
         print(f"❌ Error fetching stats: {str(e)}")
@@ -979,10 +941,7 @@ def get_courses():
         return jsonify({'error': 'Database connection error'}), 500
     
     try:
-        courses = list(db.courses.find({}))
-        
-        for course in courses:
-            course['_id'] = str(course['_id'])
+        courses = catalogue_cache.get(db).find('courses')
         
         return jsonify({'courses': courses, 'count': len(courses)}), 200
         
@@ -993,6 +952,67 @@ def get_courses():
 
 # ==================== RECOMMENDATIONS ROUTES ====================
 
+def normalize_profile_terms(terms):
+    """Normalize free-text profile terms to the engine's hyphenated vocabulary"""
+    normalized = []
+    for term in terms or []:
+        if not isinstance(term, str):
+            continue
+        term = re.sub(r'[\s_]+', '-', term.strip().lower())
+        if term and term not in normalized:
+            normalized.append(term)
+    return normalized
+
+
+def build_recommendation_profile(user, quiz_results):
+    """Build engine inputs from the user profile and latest quiz results"""
+    profile = user.get('profile') or {}
+    
+    interests = normalize_profile_terms(
+        (profile.get('interests') or []) + (profile.get('subjects') or [])
+    )
+    skills = normalize_profile_terms(profile.get('skills') or [])
+    personality = {}
+    
+    for result in quiz_results:
+        score = result.get('score') or {}
+        skills.extend(
+            skill for skill in normalize_profile_terms(result.get('identified_skills'))
+            if skill not in skills
+        )
+        
+        if result.get('quiz_type') == 'aptitude':
+            quiz_profile = recommendation_engine.analyze_quiz_results({
+                'quiz_type': 'aptitude',
+                'score': score.get('correct', 0),
+                'total_questions': score.get('total') or 1
+            })
+        else:
+            quiz_profile = recommendation_engine.analyze_quiz_results({
+                'quiz_type': 'personality',
+                'personality_traits': score.get('traits', {})
+            })
+        
+        skills.extend(skill for skill in quiz_profile['skills'] if skill not in skills)
+        personality.update(quiz_profile['personality'])
+    
+    return {
+        'interests': interests,
+        'skills': skills,
+        'personality': personality
+    }
+
+
+def recommendation_fingerprint(profile, top_n):
+    """Hash of everything that determines a recommendation result"""
+    payload = json.dumps({
+        'profile': profile,
+        'top_n': top_n,
+        'catalogue': recommendation_engine.catalogue_version
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
 @app.route('/api/recommendations', methods=['GET', 'OPTIONS'])
 def get_recommendations():
     """Get AI career recommendations"""
@@ -1003,37 +1023,84 @@ def get_recommendations():
         return jsonify({'error': 'Database connection error'}), 500
     
     try:
-        user_id, role, error, status = get_user_from_token()
+        user_id, role, error, status = authenticate()
         if error:
             return jsonify({'error': error}), status
         
+        try:
+            top_n = min(max(int(request.args.get('top_n', 5)), 1), 20)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'top_n must be a number'}), 400
+        
         # Get user profile
-        user = db.users.find_one({'_id': ObjectId(user_id)})
+        user = db.users.find_one({'_id': ObjectId(user_id)}, {'profile': 1})
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Mock recommendations
-        recommendations = [
-            {
-                'career_name': 'Software Engineer',
-                'match_score': 92.5,
-                'interest_score': 95,
-                'skill_score': 90,
-                'personality_score': 92,
-                'reasons': ['Matches your technology interests', 'Aligns with analytical skills'],
-                'education': ['B.Tech Computer Science', 'BCA', 'MCA'],
-                'salary_range': '₹4-25 LPA',
-                'growth_prospects': 'Excellent'
-            }
-        ]
+        # Latest result of each quiz type
+        quiz_results = []
+        for quiz_type in ['aptitude', 'personality']:
+            result = db.quiz_results.find_one(
+                {'user_id': user_id, 'quiz_type': quiz_type},
+                {'quiz_type': 1, 'score': 1, 'identified_skills': 1},
+                sort=[('completed_at', -1)]
+            )
+            if result:
+                quiz_results.append(result)
+        
+        profile = build_recommendation_profile(user, quiz_results)
+        input_hash = recommendation_fingerprint(profile, top_n)
+        
+        based_on = {
+            'interests': user.get('profile', {}).get('interests', []),
+            'skills': user.get('profile', {}).get('skills', [])
+        }
+        
+        # Serve the stored result while the inputs are unchanged
+        stored = db.career_recommendations.find_one(
+            {'user_id': user_id, 'input_hash': input_hash},
+            {'recommendations': 1, 'generated_at': 1}
+        )
+        
+        if stored:
+            return jsonify({
+                'recommendations': stored['recommendations'],
+                'based_on': based_on,
+                'generated_at': stored['generated_at'].isoformat(),
+                'cached': True
+            }), 200
+        
+        recommendations = recommendation_engine.get_recommendations(
+            profile['interests'],
+            profile['skills'],
+            profile['personality'],
+            top_n
+        )
+        generated_at = datetime.utcnow()
+        
+        db.career_recommendations.update_one(
+            {'user_id': user_id},
+            {'$set': {
+                'recommendations': recommendations,
+                'generated_at': generated_at,
+                'based_on': {
+                    'quiz_results': bool(quiz_results),
+                    'chat_analysis': False,
+                    'profile_data': bool(profile['interests'] or profile['skills'])
+                },
+                'input_hash': input_hash
+            }},
+            upsert=True
+        )
+        
+        print(f"✅ Recommendations generated for {user_id}")
         
         return jsonify({
             'recommendations': recommendations,
-            'based_on': {
-                'interests': user.get('profile', {}).get('interests', []),
-                'skills': user.get('profile', {}).get('skills', [])
-            }
+            'based_on': based_on,
+            'generated_at': generated_at.isoformat(),
+            'cached': False
         }), 200
         
     except Exception as e:
@@ -1041,6 +1108,83 @@ def get_recommendations():
         return jsonify({'error': str(e)}), 500
 
 
+def batch_profile_error(profile):
+    """Why a batch profile can't be scored, or None"""
+    if not isinstance(profile, dict):
+        return 'must be an object'
+    for field in ('interests', 'skills'):
+        values = profile.get(field)
+        if values is not None and not (
+            isinstance(values, list) and all(isinstance(value, str) for value in values)
+        ):
+            return f'{field} must be a list of strings'
+    personality = profile.get('personality')
+    if personality is not None and not (
+        isinstance(personality, dict) and all(
+            isinstance(value, (int, float)) and not isinstance(value, bool)
+            for value in personality.values()
+        )
+    ):
+        return 'personality must map traits to numbers'
+    return None
+
+
+@app.route('/api/recommendations/batch', methods=['POST', 'OPTIONS'])
+def get_batch_recommendations():
+    """Score a cohort of student profiles and stream results as NDJSON"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        user_id, role, error, status = authenticate()
+        if error:
+            return jsonify({'error': error}), status
+        
+        if role not in ['admin', 'counsellor']:
+            return jsonify({'error': 'Admin or counsellor access required'}), 403
+        
+        data = request.json or {}
+        profiles = data.get('profiles')
+        
+        if not isinstance(profiles, list) or not profiles:
+            return jsonify({'error': 'Profiles list is required'}), 400
+        
+        if len(profiles) > app.config['MAX_BATCH_PROFILES']:
+            return jsonify({
+                'error': f"At most {app.config['MAX_BATCH_PROFILES']} profiles per batch"
+            }), 413
+        
+        # Checked up front: once streaming starts the status can't change
+        for idx, profile in enumerate(profiles):
+            error = batch_profile_error(profile)
+            if error:
+                return jsonify({'error': f'Profile {idx}: {error}'}), 400
+        
+        try:
+            top_n = min(max(int(data.get('top_n', 5)), 1), 20)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'top_n must be a number'}), 400
+        
+        print(f"✅ Batch recommendations: {len(profiles)} profiles, top {top_n}")
+        
+        def generate():
+            results = get_batch_career_recommendations(profiles, top_n)
+            for idx, (profile, recommendations) in enumerate(zip(profiles, results)):
+                yield json.dumps({
+                    'id': profile.get('id', idx),
+                    'recommendations': recommendations
+                }, ensure_ascii=False) + '\n'
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson'
+        ), 200
+        
+    except Exception as e:
+        print(f"❌ Batch recommendations error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
 # ==================== COUNSELLOR ROUTES ====================
 
 @app.route('/api/counsellors', methods=['GET', 'OPTIONS'])
@@ -1121,6 +1265,9 @@ def health_check():
             'version': '7.0 - CHAT ROUTES FIXED',
             'timestamp': datetime.utcnow().isoformat(),
             'database': db_status,
+            'auth': token_verifier.stats(),
+            'passwords': password_hasher.stats(),
+            'catalogue': catalogue_cache.stats(),
             'counts': {
                 'users': user_count,
                 'careers': career_count,
@@ -1162,6 +1309,7 @@ def root():
             'GET /api/colleges',
             'GET /api/counsellors',
             'GET /api/recommendations',
+            'POST /api/recommendations/batch',
             'POST /api/chat/send'
         ]
     }), 200
@@ -1178,6 +1326,14 @@ def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 
+# ==================== NLP WARM-UP ====================
+
+# With gunicorn --preload this runs once in the master, so every forked
+# worker shares the loaded spaCy model instead of loading its own copy
+if os.getenv('SPACY_PRELOAD', 'False') == 'True':
+    from nlp_provider import nlp_provider
+    nlp_provider.warm_up()
+
 # ==================== BLUEPRINT REGISTRATION ====================
 
 # ==================== SAFE BLUEPRINT REGISTRATION ====================
@@ -8,10 +8,12 @@ from flask_cors import CORS
 from datetime import datetime, timedelta
 from pymongo import MongoClient
 from bson import ObjectId
-import bcrypt
 import jwt
 import os
 from dotenv import load_dotenv
+from password_hasher import password_hasher, PasswordPoolBusy
+from dashboard_stats import dashboard_stats
+from user_search import name_tokens
 
 # Load environment variables
 load_dotenv()
@@ -56,24 +58,17 @@ except Exception as e:
 
 def hash_password(password):
     """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    return password_hasher.hash(password)
 
 
 def verify_password(password, hashed):
     """Verify password against hash"""
-    try:
-        # Handle both bytes and string formats
-        if isinstance(password, bytes):
-            password = password.decode('utf-8')
-        if isinstance(hashed, str):
-            hashed = hashed.encode('utf-8')
-        
-        result = bcrypt.checkpw(password.encode('utf-8'), hashed)
-        print(f"🔐 Password verification: {'✅ SUCCESS' if result else '❌ FAILED'}")
-        return result
-    except Exception as e:
-        print(f"❌ Password verification error: {e}")
-        return False
+    if isinstance(password, bytes):
+        password = password.decode('utf-8')
+    
+    result = password_hasher.verify(password, hashed)
+    print(f"🔐 Password verification: {'✅ SUCCESS' if result else '❌ FAILED'}")
+    return result
 
 
 def generate_token(user_id, role='student'):
@@ -147,6 +142,7 @@ def register():
         # Create user document
         user = {
             'name': data['name'],
+            'name_tokens': name_tokens(data['name']),
             'email': email,
             'password': hashed_password,
             'role': data.get('role', 'student'),
@@ -171,6 +167,7 @@ def register():
         # Insert into database
         result = db.users.insert_one(user)
         user_id = str(result.inserted_id)
+        dashboard_stats.invalidate(db)
         
         print(f"✅ User registered successfully: {email}")
         print(f"📊 Total users: {db.users.count_documents({})}\n")
@@ -189,6 +186,8 @@ def register():
             }
         }), 201
         
+    except PasswordPoolBusy as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
     except Exception as e:
         print(f"❌ Registration error: {str(e)}\n")
         import traceback
@@ -237,12 +236,16 @@ def login():
             print("❌ No password hash stored for user\n")
             return jsonify({'error': 'Invalid credentials'}), 401
         
-        password_match = verify_password(password, stored_password)
+        password_match, upgraded_hash = password_hasher.verify_and_upgrade(password, stored_password)
         
         if not password_match:
             print(f"❌ Login failed: Incorrect password for {email}\n")
             return jsonify({'error': 'Invalid credentials'}), 401
         
+        # Hashes made with an old cost factor are replaced transparently
+        if upgraded_hash:
+            db.users.update_one({'_id': user['_id']}, {'$set': {'password': upgraded_hash}})
+        
         # Generate token
         user_id = str(user['_id'])
         token = generate_token(user_id, user.get('role', 'student'))
@@ -261,6 +264,8 @@ def login():
             }
         }), 200
         
+    except PasswordPoolBusy as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
     except Exception as e:
         print(f"❌ Login error: {str(e)}\n")
         import traceback
@@ -449,7 +454,8 @@ def health_check():
         'message': 'AI Career Counselling API is running',
         'timestamp': datetime.utcnow().isoformat(),
         'database': db_status,
-        'users_count': user_count
+        'users_count': user_count,
+        'passwords': password_hasher.stats()
     }), 200
 
 
@@ -13,11 +13,13 @@ from flask_cors import CORS
 from datetime import datetime, timedelta
 from pymongo import MongoClient, ASCENDING
 from bson import ObjectId
-import bcrypt
 import jwt
 import os
 import re
 from dotenv import load_dotenv
+from password_hasher import password_hasher, PasswordPoolBusy
+from dashboard_stats import dashboard_stats
+from user_search import name_tokens
 
 # Load environment variables
 load_dotenv()
@@ -148,21 +150,7 @@ def validate_dob(dob_str):
 
 def hash_password(password):
     """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-
-
-def verify_password(password, hashed):
-    """Verify password against hash"""
-    try:
-        if isinstance(password, bytes):
-            password = password.decode('utf-8')
-        if isinstance(hashed, str):
-            hashed = hashed.encode('utf-8')
-        
-        return bcrypt.checkpw(password.encode('utf-8'), hashed)
-    except Exception as e:
-        print(f"❌ Password verification error: {e}")
-        return False
+    return password_hasher.hash(password)
 
 
 def generate_token(user_id, role='student'):
@@ -294,6 +282,7 @@ def register():
         # ========== CREATE USER DOCUMENT ==========
         user = {
             'name': data['name'].strip(),
+            'name_tokens': name_tokens(data['name']),
             'email': email,
             'username': username,
             'password': hashed_password,
@@ -336,6 +325,7 @@ def register():
         # ========== INSERT INTO DATABASE ==========
         result = db.users.insert_one(user)
         user_id = str(result.inserted_id)
+        dashboard_stats.invalidate(db)
         
         print(f"✅ User registered successfully")
         print(f"   User ID: {user_id}")
@@ -357,6 +347,8 @@ def register():
             }
         }), 201
         
+    except PasswordPoolBusy as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
     except Exception as e:
         print(f"❌ Registration error: {str(e)}\n")
         import traceback
@@ -405,7 +397,9 @@ def login():
         print(f"   Role: {user.get('role', 'student')}")
         
         # ========== VERIFY PASSWORD ==========
-        if not verify_password(password, user['password']):
+        # Hashes made with an old cost factor are upgraded on the way through
+        matched, upgraded_hash = password_hasher.verify_and_upgrade(password, user['password'])
+        if not matched:
             print(f"❌ Invalid password\n")
             return jsonify({'error': 'Invalid username/email or password'}), 401
         
@@ -416,9 +410,12 @@ def login():
             return jsonify({'error': 'Account is deactivated. Contact support.'}), 403
         
         # ========== UPDATE LAST LOGIN ==========
+        login_update = {'last_login': datetime.utcnow()}
+        if upgraded_hash:
+            login_update['password'] = upgraded_hash
         db.users.update_one(
             {'_id': user['_id']},
-            {'$set': {'last_login': datetime.utcnow()}}
+            {'$set': login_update}
         )
         
         # ========== GENERATE TOKEN ==========
@@ -440,6 +437,8 @@ def login():
             }
         }), 200
         
+    except PasswordPoolBusy as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
     except Exception as e:
         print(f"❌ Login error: {str(e)}\n")
         import traceback
@@ -597,7 +596,8 @@ def health_check():
         'version': '5.0',
         'timestamp': datetime.utcnow().isoformat(),
         'database': db_status,
-        'users_count': user_count
+        'users_count': user_count,
+        'passwords': password_hasher.stats()
     }), 200
 
 
@@ -0,0 +1,170 @@
+"""
+Auth Middleware
+Verifies the request's bearer token once and keeps the claims on flask.g
+"""
+
+from collections import OrderedDict
+from flask import g, request, current_app
+import threading
+import time
+import jwt
+
+
+class TokenVerifier:
+    """
+    HS256 verification with an LRU of recently verified signatures
+
+    A cached entry holds the signed header and payload alongside the
+    claims, so a token only hits the cache if it is byte-for-byte the one
+    that was verified. Entries are dropped once the token expires, so a
+    cached token never outlives its own exp claim.
+    """
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+        self._secret = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.verify_seconds = 0.0
+        self.cached_seconds = 0.0
+
+    def _lookup(self, signing_input, signature, secret, now):
+        with self._lock:
+            if secret != self._secret:
+                # A rotated secret invalidates every verified token
+                self._entries.clear()
+                self._secret = secret
+                return None
+
+            entry = self._entries.get(signature)
+            if entry is None or entry[0] != signing_input:
+                return None
+
+            if entry[2] is not None and now >= entry[2]:
+                del self._entries[signature]
+                raise jwt.ExpiredSignatureError('Signature has expired')
+
+            self._entries.move_to_end(signature)
+            return entry[1]
+
+    def _store(self, signing_input, signature, claims):
+        expires_at = claims.get('exp')
+        with self._lock:
+            self._entries[signature] = (signing_input, claims, expires_at)
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def verify(self, token, secret):
+        """Return the token's claims; raises jwt.InvalidTokenError subclasses"""
+        started = time.perf_counter()
+        signing_input, _, signature = token.rpartition('.')
+
+        try:
+            claims = self._lookup(signing_input, signature, secret, time.time())
+            if claims is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.cached_seconds += time.perf_counter() - started
+                return claims
+
+            with self._lock:
+                self.misses += 1
+            claims = jwt.decode(token, secret, algorithms=['HS256'])
+            self._store(signing_input, signature, claims)
+            with self._lock:
+                self.verify_seconds += time.perf_counter() - started
+            return claims
+
+        except jwt.InvalidTokenError:
+            with self._lock:
+                self.failures += 1
+            raise
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters for monitoring"""
+        return {
+            'cached_tokens': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'failures': self.failures,
+            'avg_verify_us': round(self.verify_seconds / self.misses * 1e6, 1) if self.misses else 0,
+            'avg_cached_us': round(self.cached_seconds / self.hits * 1e6, 1) if self.hits else 0
+        }
+
+
+token_verifier = TokenVerifier()
+
+
+def _bearer_token():
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+    return auth_header.split(' ')[1]
+
+
+def load_request_auth():
+    """
+    Verify the request's bearer token and store the result on flask.g
+
+    Sets g.auth_claims, g.user_id, g.user_role and g.auth_error/g.auth_status.
+    Runs at most once per request; later calls return immediately.
+    """
+    if 'auth_checked' in g:
+        return
+
+    g.auth_checked = True
+    g.auth_claims = None
+    g.user_id = None
+    g.user_role = None
+    g.auth_error = None
+    g.auth_status = None
+
+    token = _bearer_token()
+    if not token:
+        g.auth_error, g.auth_status = 'No token provided', 401
+        return
+
+    try:
+        claims = token_verifier.verify(token, current_app.config['SECRET_KEY'])
+    except jwt.ExpiredSignatureError:
+        g.auth_error, g.auth_status = 'Token expired', 401
+        return
+    except jwt.InvalidTokenError:
+        g.auth_error, g.auth_status = 'Invalid token', 401
+        return
+
+    user_id = claims.get('user_id') or claims.get('sub')
+    if not user_id:
+        g.auth_error, g.auth_status = 'Invalid token', 401
+        return
+
+    g.auth_claims = claims
+    g.user_id = str(user_id)
+    g.user_role = claims.get('role')
+
+
+def authenticate():
+    """
+    Current request's user
+
+    Returns:
+        (user_id, role, error, status) - error and status are None on success
+    """
+    load_request_auth()
+    return g.user_id, g.user_role, g.auth_error, g.auth_status
+
+
+def init_auth(app):
+    """Verify bearer tokens before every request handled by app"""
+    app.before_request(load_request_auth)
@@ -0,0 +1,95 @@
+"""
+Career Keyword Index
+Inverted index over the chat career database so profile terms look up the
+careers they match instead of scanning every career's keyword lists
+"""
+
+from bisect import bisect_left
+
+
+class SubstringIndex:
+    """
+    Postings for a set of terms that answer "query in term or term in query"
+
+    Every suffix of every term is kept in a sorted list, so the careers
+    whose terms contain the query are found with a prefix range scan.
+    Terms contained in the query are found by probing the query's
+    substrings of each indexed term length against an exact-term table.
+    """
+
+    def __init__(self):
+        self._exact = {}
+        self._suffix_keys = []
+        self._suffix_ids = []
+        self._lengths = []
+
+    def build(self, terms_by_id):
+        """
+        Args:
+            terms_by_id: Iterable of (item_id, terms) pairs
+        """
+        exact = {}
+        suffixes = set()
+
+        for item_id, terms in terms_by_id:
+            for term in terms:
+                exact.setdefault(term, []).append(item_id)
+                for start in range(len(term)):
+                    suffixes.add((term[start:], item_id))
+
+        ordered = sorted(suffixes)
+        self._exact = exact
+        self._suffix_keys = [suffix for suffix, _ in ordered]
+        self._suffix_ids = [item_id for _, item_id in ordered]
+        self._lengths = sorted({len(term) for term in exact})
+        return self
+
+    def lookup(self, query):
+        """Return the set of ids with a term containing, or contained in, query"""
+        found = set()
+
+        # Indexed terms that contain the query
+        position = bisect_left(self._suffix_keys, query)
+        while position < len(self._suffix_keys) and self._suffix_keys[position].startswith(query):
+            found.add(self._suffix_ids[position])
+            position += 1
+
+        # Indexed terms contained in the query
+        for length in self._lengths:
+            if length > len(query):
+                break
+            for start in range(len(query) - length + 1):
+                for item_id in self._exact.get(query[start:start + length], ()):
+                    found.add(item_id)
+
+        return found
+
+
+class CareerKeywordIndex:
+    """
+    Keyword, skill, personality, subject and title postings for a career database
+
+    Build one per catalogue (the static chat database or the careers
+    collection) and rebuild it when the catalogue changes.
+    """
+
+    def __init__(self, career_database):
+        self.career_ids = list(career_database)
+        self.keywords = SubstringIndex().build(
+            (career_id, career.get('keywords', [])) for career_id, career in career_database.items()
+        )
+        self.skills = SubstringIndex().build(
+            (career_id, career.get('skills', [])) for career_id, career in career_database.items()
+        )
+        self.personality = SubstringIndex().build(
+            (career_id, career.get('personality', [])) for career_id, career in career_database.items()
+        )
+
+        self.subjects = {}
+        self.titles = {}
+        for career_id, career in career_database.items():
+            for subject in career.get('related_subjects', []):
+                self.subjects.setdefault(subject.lower(), [])
+                if career_id not in self.subjects[subject.lower()]:
+                    self.subjects[subject.lower()].append(career_id)
+            self.titles.setdefault(career['title'].lower(), []).append(career_id)
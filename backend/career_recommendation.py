@@ -3,9 +3,13 @@ Career Recommendation Engine
 Matches users with suitable careers based on interests, skills, and personality
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
+import hashlib
+import json
 import math
 
+import numpy as np
+
 
 class CareerRecommendationEngine:
     """
@@ -176,6 +180,154 @@ class CareerRecommendationEngine:
                 'growth_prospects': 'good'
             }
         }
+        
+        # Weights for the final match score
+        self.weights = {
+            'interests': 0.4,
+            'skills': 0.35,
+            'personality': 0.25
+        }
+        
+        self.compile_career_matrices()
+    
+    def compile_career_matrices(self):
+        """
+        Compile career_database into dense matrices for vectorized scoring.
+        
+        Must be called again whenever career_database is modified.
+        """
+        self.career_names = list(self.career_database.keys())
+        careers = [self.career_database[name] for name in self.career_names]
+        
+        self.interest_vocab = self._build_vocab(c['interests'] for c in careers)
+        self.skill_vocab = self._build_vocab(c['skills'] for c in careers)
+        self.trait_vocab = self._build_vocab(c['personality'].keys() for c in careers)
+        
+        n_careers = len(careers)
+        
+        # Incidence rows are pre-divided by the length of the career's term
+        # list (duplicates included, as the per-career scorer did), so a
+        # matrix-vector product yields the fraction of career terms matched
+        self.interest_matrix = np.zeros((n_careers, len(self.interest_vocab)))
+        self.skill_matrix = np.zeros((n_careers, len(self.skill_vocab)))
+        self.personality_matrix = np.zeros((n_careers, len(self.trait_vocab)))
+        
+        for row, career in enumerate(careers):
+            for term in career['interests']:
+                self.interest_matrix[row, self.interest_vocab[term]] = 1.0 / len(career['interests'])
+            
+            for term in career['skills']:
+                self.skill_matrix[row, self.skill_vocab[term]] = 1.0 / len(career['skills'])
+            
+            for trait, value in career['personality'].items():
+                self.personality_matrix[row, self.trait_vocab[trait]] = value
+        
+        self.personality_norms = np.linalg.norm(self.personality_matrix, axis=1)
+        
+        # Changes whenever the compiled catalogue does, so stored results
+        # computed against an older catalogue can be told apart
+        self.catalogue_version = hashlib.sha1(
+            json.dumps(self.career_database, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:12]
+    
+    @staticmethod
+    def _build_vocab(term_lists) -> Dict[str, int]:
+        """Map every distinct term to a fixed column index"""
+        terms = sorted({term for terms in term_lists for term in terms})
+        return {term: idx for idx, term in enumerate(terms)}
+    
+    @staticmethod
+    def _indicator_matrix(term_lists: List[List[str]], vocab: Dict[str, int]) -> np.ndarray:
+        """Binary matrix with one row per term list, over vocab columns"""
+        matrix = np.zeros((len(term_lists), len(vocab)))
+        for row, terms in enumerate(term_lists):
+            for term in terms or []:
+                idx = vocab.get(term)
+                if idx is not None:
+                    matrix[row, idx] = 1.0
+        return matrix
+    
+    def score_profiles(
+        self,
+        interests_list: List[List[str]],
+        skills_list: List[List[str]],
+        personality_list: List[Dict]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score many profiles against every career with matrix-matrix products
+        
+        Args:
+            interests_list: Interests for each profile
+            skills_list: Skills for each profile
+            personality_list: Personality dict for each profile
+        
+        Returns:
+            (final, interest, skill, personality) score matrices of shape
+            (profiles, careers), careers in career_names order, 0-1 scale
+        """
+        interest_scores = self._indicator_matrix(interests_list, self.interest_vocab) @ self.interest_matrix.T
+        skill_scores = self._indicator_matrix(skills_list, self.skill_vocab) @ self.skill_matrix.T
+        
+        user_vectors = np.zeros((len(personality_list), len(self.trait_vocab)))
+        user_magnitudes = np.zeros(len(personality_list))
+        for row, personality in enumerate(personality_list):
+            for trait, value in (personality or {}).items():
+                idx = self.trait_vocab.get(trait)
+                if idx is not None:
+                    user_vectors[row, idx] = value
+            # Magnitude covers every user trait, not only the known ones
+            user_magnitudes[row] = math.sqrt(sum(v**2 for v in (personality or {}).values()))
+        
+        denominators = np.outer(user_magnitudes, self.personality_norms)
+        personality_scores = np.zeros_like(denominators)
+        np.divide(
+            user_vectors @ self.personality_matrix.T,
+            denominators,
+            out=personality_scores,
+            where=denominators > 0
+        )
+        
+        final_scores = (
+            interest_scores * self.weights['interests'] +
+            skill_scores * self.weights['skills'] +
+            personality_scores * self.weights['personality']
+        )
+        
+        return final_scores, interest_scores, skill_scores, personality_scores
+    
+    def score_profile(
+        self,
+        user_interests: List[str] = None,
+        user_skills: List[str] = None,
+        user_personality: Dict = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score one profile against every career in a single pass
+        
+        Returns:
+            (final, interest, skill, personality) score arrays, one entry
+            per career in career_names order, each on a 0-1 scale
+        """
+        scores = self.score_profiles([user_interests], [user_skills], [user_personality])
+        return tuple(matrix[0] for matrix in scores)
+    
+    def _top_indices(self, scores: np.ndarray, top_n: int) -> np.ndarray:
+        """Indices of the top_n scores, best first, ties in database order"""
+        top_n = max(min(top_n, len(scores)), 0)
+        if top_n == 0:
+            return np.array([], dtype=int)
+        
+        if top_n < len(scores):
+            # Widen the partition to everything tied with the cut-off score
+            # so database order decides ties, as the stable sort used to
+            candidates = np.argpartition(-scores, top_n - 1)[:top_n]
+            threshold = scores[candidates].min()
+            candidates = np.flatnonzero(scores >= threshold)
+        else:
+            candidates = np.arange(len(scores))
+        
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order][:top_n]
     
     def calculate_interest_match(self, user_interests: List[str], career: Dict) -> float:
         """Calculate match score based on interests"""
@@ -244,67 +396,118 @@ class CareerRecommendationEngine:
         Returns:
             List of career recommendations with match scores
         """
-        recommendations = []
+        final_scores, interest_scores, skill_scores, personality_scores = self.score_profile(
+            user_interests, user_skills, user_personality
+        )
         
-        for career_name, career_data in self.career_database.items():
-            # Calculate individual scores
-            interest_score = self.calculate_interest_match(
-                user_interests or [], career_data
-            )
-            skill_score = self.calculate_skill_match(
-                user_skills or [], career_data
-            )
-            personality_score = self.calculate_personality_match(
-                user_personality or {}, career_data
+        # Rank on the rounded percentage that callers see, as before
+        ranking = np.round(final_scores * 100, 2)
+        
+        return [
+            self._build_recommendation(
+                idx,
+                final_scores[idx],
+                interest_scores[idx],
+                skill_scores[idx],
+                personality_scores[idx],
+                user_interests,
+                user_skills
             )
+            for idx in self._top_indices(ranking, top_n)
+        ]
+    
+    def get_batch_recommendations(
+        self,
+        profiles: List[Dict],
+        top_n: int = 5,
+        chunk_size: int = 1000
+    ) -> Iterator[List[Dict]]:
+        """
+        Get top N career recommendations for many users at once
+        
+        Profiles are scored in chunks so memory stays bounded for large
+        cohorts; results are yielded lazily in input order.
+        
+        Args:
+            profiles: List of dicts with optional 'interests', 'skills'
+                and 'personality' keys
+            top_n: Number of recommendations per profile
+            chunk_size: Number of profiles scored per matrix product
+        
+        Yields:
+            List of career recommendations for each profile
+        """
+        for start in range(0, len(profiles), chunk_size):
+            chunk = profiles[start:start + chunk_size]
+            interests_list = [p.get('interests') or [] for p in chunk]
+            skills_list = [p.get('skills') or [] for p in chunk]
             
-            # Weighted final score
-            weights = {
-                'interests': 0.4,
-                'skills': 0.35,
-                'personality': 0.25
-            }
-            
-            final_score = (
-                interest_score * weights['interests'] +
-                skill_score * weights['skills'] +
-                personality_score * weights['personality']
+            final_scores, interest_scores, skill_scores, personality_scores = self.score_profiles(
+                interests_list,
+                skills_list,
+                [p.get('personality') or {} for p in chunk]
             )
+            ranking = np.round(final_scores * 100, 2)
             
-            # Generate reasons
-            reasons = []
-            if interest_score > 0.5:
-                matched_interests = set(user_interests or []) & set(career_data['interests'])
-                reasons.append(f"Matches your interests in {', '.join(matched_interests)}")
-            
-            if skill_score > 0.5:
-                matched_skills = set(user_skills or []) & set(career_data['skills'])
-                reasons.append(f"Aligns with your {', '.join(matched_skills)} skills")
-            
-            if personality_score > 0.5:
-                reasons.append("Good personality fit for this role")
-            
-            if not reasons:
-                reasons.append("Based on your overall profile")
-            
-            recommendations.append({
-                'career_name': career_name,
-                'match_score': round(final_score * 100, 2),
-                'interest_score': round(interest_score * 100, 2),
-                'skill_score': round(skill_score * 100, 2),
-                'personality_score': round(personality_score * 100, 2),
-                'reasons': reasons,
-                'education': career_data['education'],
-                'salary_range': career_data['salary_range'],
-                'growth_prospects': career_data['growth_prospects'],
-                'work_environment': career_data['work_environment'],
-                'description': career_data.get('description', '')
-            })
-        
-        # Sort by match score
-        recommendations.sort(key=lambda x: x['match_score'], reverse=True)
-        
-        return recommendations[:top_n]
+            for row in range(len(chunk)):
+                yield [
+                    self._build_recommendation(
+                        idx,
+                        final_scores[row, idx],
+                        interest_scores[row, idx],
+                        skill_scores[row, idx],
+                        personality_scores[row, idx],
+                        interests_list[row],
+                        skills_list[row]
+                    )
+                    for idx in self._top_indices(ranking[row], top_n)
+                ]
+    
+    def _build_recommendation(
+        self,
+        idx: int,
+        final_score: float,
+        interest_score: float,
+        skill_score: float,
+        personality_score: float,
+        user_interests: List[str] = None,
+        user_skills: List[str] = None
+    ) -> Dict:
+        """Format a scored career as a recommendation dict"""
+        career_name = self.career_names[idx]
+        career_data = self.career_database[career_name]
+        
+        # Generate reasons
+        reasons = []
+        if interest_score > 0.5:
+            user_interest_set = set(user_interests or [])
+            matched_interests = [i for i in career_data['interests'] if i in user_interest_set]
+            reasons.append(f"Matches your interests in {', '.join(matched_interests)}")
+        
+        if skill_score > 0.5:
+            user_skill_set = set(user_skills or [])
+            matched_skills = [s for s in career_data['skills'] if s in user_skill_set]
+            reasons.append(f"Aligns with your {', '.join(matched_skills)} skills")
+        
+        if personality_score > 0.5:
+            reasons.append("Good personality fit for this role")
+        
+        if not reasons:
+            reasons.append("Based on your overall profile")
+        
+        return {
+            'career_name': career_name,
+            'match_score': round(float(final_score) * 100, 2),
+            'interest_score': round(float(interest_score) * 100, 2),
+            'skill_score': round(float(skill_score) * 100, 2),
+            'personality_score': round(float(personality_score) * 100, 2),
+            'reasons': reasons,
+            'education': career_data['education'],
+            'salary_range': career_data['salary_range'],
+            'growth_prospects': career_data['growth_prospects'],
+            'work_environment': career_data['work_environment'],
+            'description': career_data.get('description', '')
+        }
     
     def get_career_details(self, career_name: str) -> Dict:
         """Get detailed information about a specific career"""
@@ -376,4 +579,23 @@ def get_career_recommendations(
             print(f"{rec['career_name']}: {rec['match_score']}%")
             print(f"Reasons: {', '.join(rec['reasons'])}")
     """
-    return recommendation_engine.get_recommendations(interests, skills, personality, top_n)
\ No newline at end of file
+    return recommendation_engine.get_recommendations(interests, skills, personality, top_n)
+
+
+def get_batch_career_recommendations(
+    profiles: List[Dict],
+    top_n: int = 5
+) -> Iterator[List[Dict]]:
+    """
+    Get career recommendations for a cohort of users in one vectorized pass
+    
+    Usage:
+        profiles = [
+            {'interests': ['technology'], 'skills': ['analytical']},
+            {'interests': ['arts'], 'personality': {'creative': 0.9}}
+        ]
+        
+        for recommendations in get_batch_career_recommendations(profiles, top_n=3):
+            print([rec['career_name'] for rec in recommendations])
+    """
+    return recommendation_engine.get_batch_recommendations(profiles, top_n)
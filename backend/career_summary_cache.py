@@ -0,0 +1,103 @@
+"""
+Career Summary Cache
+In-process name -> career summary lookup used to enrich quiz recommendations
+"""
+
+import threading
+import time
+
+
+# Only the fields recommendation enrichment reads
+CAREER_SUMMARY_PROJECTION = {
+    'name': 1,
+    'description': 1,
+    'average_salary': 1,
+    'education': 1,
+    'top_colleges': 1
+}
+
+
+class CareerSummaryCache:
+    """
+    Career summaries keyed by career name
+
+    Names missing from the cache are fetched together with one $in query;
+    names with no matching career are cached as None so they are not
+    queried again. Admin career writes call invalidate(), and the ttl bounds
+    how stale another worker's copy can get.
+    """
+
+    def __init__(self, ttl_seconds=300):
+        self.ttl_seconds = ttl_seconds
+        self._summaries = {}
+        self._loaded_at = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def summarize(career):
+        return {
+            'career_id': str(career['_id']),
+            'description': career.get('description', '')[:150] + '...',
+            'average_salary': career.get('average_salary', 'N/A'),
+            'education_required': career.get('education', [])[:2],  # First 2 requirements
+            'top_colleges': career.get('top_colleges', [])[:3]  # Top 3 colleges
+        }
+
+    def get_many(self, names, db):
+        """
+        Return {name: summary or None} for every requested name
+
+        At most one database query is made, covering only uncached names.
+        """
+        names = list(dict.fromkeys(names))
+
+        with self._lock:
+            if time.monotonic() - self._loaded_at > self.ttl_seconds:
+                self._summaries = {}
+                self._loaded_at = time.monotonic()
+            found = {name: self._summaries[name] for name in names if name in self._summaries}
+
+        missing = [name for name in names if name not in found]
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        if missing:
+            fetched = dict.fromkeys(missing)
+            self.queries += 1
+            for career in db.careers.find({'name': {'$in': missing}}, CAREER_SUMMARY_PROJECTION):
+                # Keep the first match per name, as find_one did
+                if fetched.get(career['name']) is None:
+                    fetched[career['name']] = self.summarize(career)
+
+            with self._lock:
+                self._summaries.update(fetched)
+            found.update(fetched)
+
+        return found
+
+    def invalidate(self):
+        """Drop every cached summary; call after any career write"""
+        with self._lock:
+            self._summaries = {}
+            self._loaded_at = time.monotonic()
+            self.invalidations += 1
+
+    def stats(self):
+        """Counters for monitoring"""
+        with self._lock:
+            size = len(self._summaries)
+        return {
+            'size': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'queries': self.queries,
+            'invalidations': self.invalidations
+        }
+
+
+career_summary_cache = CareerSummaryCache()
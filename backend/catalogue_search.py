@@ -0,0 +1,104 @@
+"""
+Catalogue Search
+Inverted index with prefix matching for career and college search
+"""
+
+from bisect import bisect_left
+import re
+import unicodedata
+
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Field weights per collection; a hit in the name outranks one in the description
+SEARCH_FIELDS = {
+    'careers': {'name': 10, 'category': 4, 'skills': 3, 'description': 1},
+    'colleges': {'name': 10, 'short_name': 8, 'location': 4, 'district': 4, 'specializations': 3, 'courses': 2}
+}
+
+# Exact token matches score higher than prefix matches
+PREFIX_FACTOR = 0.5
+
+# Shorter query tokens only match exactly; one letter would match almost everything
+MIN_PREFIX_LENGTH = 2
+
+
+def tokenize(text):
+    """Lowercase, accent-free alphanumeric tokens of a value (strings or lists)"""
+    if isinstance(text, (list, tuple)):
+        return [token for item in text for token in tokenize(item)]
+    if not isinstance(text, str):
+        return []
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """
+    Weighted inverted index over a fixed set of documents
+
+    Each token maps to {doc_id: weight}. Query tokens are matched as
+    prefixes of indexed tokens through a sorted vocabulary, so typing
+    "comp sci" finds "Computer Science". Every query token has to match
+    for a document to be returned.
+    """
+
+    def __init__(self, documents, fields):
+        self.size = 0
+        postings = {}
+
+        for document in documents:
+            doc_id = document['_id']
+            self.size += 1
+            for field, weight in fields.items():
+                for token in set(tokenize(document.get(field))):
+                    entry = postings.setdefault(token, {})
+                    entry[doc_id] = entry.get(doc_id, 0) + weight
+
+        self._postings = postings
+        self._vocabulary = sorted(postings)
+
+    def _matches(self, token):
+        """{doc_id: score} for every indexed token starting with token"""
+        if len(token) < MIN_PREFIX_LENGTH:
+            return dict(self._postings.get(token, {}))
+
+        scores = {}
+        vocabulary = self._vocabulary
+        position = bisect_left(vocabulary, token)
+
+        while position < len(vocabulary) and vocabulary[position].startswith(token):
+            word = vocabulary[position]
+            position += 1
+            factor = 1.0 if word == token else PREFIX_FACTOR
+            for doc_id, weight in self._postings[word].items():
+                score = weight * factor
+                if score > scores.get(doc_id, 0):
+                    scores[doc_id] = score
+
+        return scores
+
+    def search(self, query):
+        """
+        Rank documents against a free-text query
+
+        Returns:
+            List of (doc_id, score), best match first
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        # Start from the rarest token so the intersection stays small
+        matches = sorted((self._matches(token) for token in tokens), key=len)
+        totals = dict(matches[0])
+
+        for scores in matches[1:]:
+            totals = {
+                doc_id: total + scores[doc_id]
+                for doc_id, total in totals.items() if doc_id in scores
+            }
+            if not totals:
+                break
+
+        return sorted(totals.items(), key=lambda item: -item[1])
@@ -0,0 +1,288 @@
+"""
+Catalogue Snapshot
+Process-local, read-only copy of careers, courses and colleges with filter indexes
+"""
+
+import threading
+import time
+
+from catalogue_search import SearchIndex, SEARCH_FIELDS
+
+
+CATALOGUE_COLLECTIONS = ('careers', 'courses', 'colleges')
+
+# Filter name -> document fields it matches, per collection
+FILTER_FIELDS = {
+    'careers': {'category': ('category',)},
+    'courses': {},
+    'colleges': {
+        'district': ('district',),
+        'type': ('type',),
+        'course': ('courses', 'primary_course')
+    }
+}
+
+# Datetime fields the catalogue routes have always returned as ISO strings
+ISO_DATE_FIELDS = {
+    'careers': (),
+    'courses': (),
+    'colleges': ('created_at', 'updated_at')
+}
+
+
+def read_catalogue_version(db):
+    """Current catalogue version; 0 if it has never been bumped"""
+    meta = db.catalogue_meta.find_one({'_id': 'catalogue'}, {'version': 1})
+    return meta.get('version', 0) if meta else 0
+
+
+def bump_catalogue_version(db):
+    """Mark the catalogue as changed; every process reloads on its next check"""
+    db.catalogue_meta.update_one(
+        {'_id': 'catalogue'},
+        {'$inc': {'version': 1}},
+        upsert=True
+    )
+
+
+def serialize_document(collection, document):
+    """JSON-ready copy of a catalogue document, as the routes return it"""
+    document = dict(document)
+    document['_id'] = str(document['_id'])
+    for field in ISO_DATE_FIELDS[collection]:
+        if document.get(field) is not None:
+            document[field] = document[field].isoformat()
+    return document
+
+
+# Upper bound is just above 5 so perfect ratings land in the top bucket
+RATING_BOUNDARIES = [0, 3, 3.5, 4, 4.5, 5.01]
+
+
+def compute_college_stats(db):
+    """All college counts in one $facet aggregation"""
+    def group_by(field):
+        return [
+            {'$match': {field: {'$ne': None}}},
+            {'$group': {'_id': f'${field}', 'count': {'$sum': 1}}}
+        ]
+    
+    pipeline = [{'$facet': {
+        'total': [{'$count': 'count'}],
+        'by_type': group_by('type'),
+        'by_district': group_by('district'),
+        'by_course': [{'$unwind': '$courses'}] + group_by('courses'),
+        'by_rating': [{'$bucket': {
+            'groupBy': '$rating',
+            'boundaries': RATING_BOUNDARIES,
+            'default': 'unrated',
+            'output': {'count': {'$sum': 1}}
+        }}]
+    }}]
+    
+    facets = next(db.colleges.aggregate(pipeline), {})
+    
+    def as_counts(rows):
+        return {row['_id']: row['count'] for row in rows}
+    
+    labels = {
+        low: f"{low}-{min(high, 5)}"
+        for low, high in zip(RATING_BOUNDARIES, RATING_BOUNDARIES[1:])
+    }
+    by_rating = {labels.get(row['_id'], row['_id']): row['count'] for row in facets.get('by_rating', [])}
+    
+    total = facets.get('total', [])
+    return {
+        'total': total[0]['count'] if total else 0,
+        'by_type': as_counts(facets.get('by_type', [])),
+        'by_district': as_counts(facets.get('by_district', [])),
+        'by_course': as_counts(facets.get('by_course', [])),
+        'by_rating': by_rating
+    }
+
+
+def _filter_keys(value):
+    """Lowercased index keys for a field value (scalar or list)"""
+    values = value if isinstance(value, list) else [value]
+    return {item.strip().lower() for item in values if isinstance(item, str) and item.strip()}
+
+
+class CatalogueSnapshot:
+    """
+    Immutable view of the catalogue at one version
+
+    Documents are serialized once at load time. Filters resolve through
+    value -> positions indexes, and search goes through a SearchIndex
+    built on first use, so reads never touch the database.
+    """
+
+    def __init__(self, version, documents):
+        """
+        Args:
+            version: Catalogue version the documents were loaded at
+            documents: {collection: [raw documents in natural order]}
+        """
+        self.version = version
+        self.loaded_at = time.time()
+        self.documents = {}
+        self._by_id = {}
+        self._filters = {}
+        self._search_indexes = {}
+        self._memo = {}
+
+        for collection in CATALOGUE_COLLECTIONS:
+            serialized = [serialize_document(collection, doc) for doc in documents.get(collection, [])]
+            self.documents[collection] = serialized
+            self._by_id[collection] = {doc['_id']: doc for doc in serialized}
+
+            filters = {}
+            for name, fields in FILTER_FIELDS[collection].items():
+                index = {}
+                for position, doc in enumerate(serialized):
+                    for field in fields:
+                        for key in _filter_keys(doc.get(field)):
+                            index.setdefault(key, set()).add(position)
+                filters[name] = index
+            self._filters[collection] = filters
+
+    def get(self, collection, document_id):
+        """Serialized document by its string _id, or None"""
+        return self._by_id[collection].get(document_id)
+
+    def _filter_positions(self, collection, name, value):
+        index = self._filters[collection][name]
+        value = value.strip().lower()
+        if value in index:
+            return index[value]
+
+        # Partial values still match, as the old case-insensitive regex filters did
+        positions = set()
+        for key, matched in index.items():
+            if value in key:
+                positions |= matched
+        return positions
+
+    def _search_index(self, collection):
+        index = self._search_indexes.get(collection)
+        if index is None:
+            documents = self.documents[collection]
+            index = SearchIndex(
+                ({**doc, '_id': position} for position, doc in enumerate(documents)),
+                SEARCH_FIELDS[collection]
+            )
+            self._search_indexes[collection] = index
+        return index
+
+    def find(self, collection, filters=None, search=None):
+        """
+        Documents matching every filter (and the search query, if given)
+
+        Filter values of None, '' or 'all' are ignored. Results keep the
+        collection's natural order, or relevance order when searching.
+        """
+        documents = self.documents[collection]
+        positions = None
+
+        for name, value in (filters or {}).items():
+            if not value or value.lower() == 'all':
+                continue
+            matched = self._filter_positions(collection, name, value)
+            positions = matched if positions is None else positions & matched
+
+        if search:
+            ranked = self._search_index(collection).search(search)
+            return [
+                documents[position] for position, score in ranked
+                if positions is None or position in positions
+            ]
+
+        if positions is None:
+            return list(documents)
+        return [documents[position] for position in sorted(positions)]
+
+    def memo(self, key, compute):
+        """
+        Value derived from this catalogue version, computed once
+
+        Anything cached here is dropped with the snapshot when the
+        catalogue changes.
+        """
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def counts(self):
+        return {collection: len(docs) for collection, docs in self.documents.items()}
+
+
+class CatalogueCache:
+    """
+    Holds the current CatalogueSnapshot and reloads it when the catalogue changes
+
+    Writers bump a version counter in catalogue_meta. The cache reads that
+    counter at most once every check_seconds, and rebuilds the snapshot
+    only when it has moved. Writes made through invalidate() in this
+    process take effect on the next read.
+    """
+
+    def __init__(self, check_seconds=10):
+        self.check_seconds = check_seconds
+        self._snapshot = None
+        self._stale = True
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+        self.loads = 0
+        self.version_checks = 0
+        self.last_load_seconds = None
+
+    def get(self, db):
+        """Current snapshot, reloading it first if the catalogue has changed"""
+        snapshot = self._snapshot
+        if (snapshot is not None and not self._stale and
+                time.monotonic() - self._checked_at < self.check_seconds):
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if (snapshot is not None and not self._stale and
+                    time.monotonic() - self._checked_at < self.check_seconds):
+                return snapshot
+
+            version = read_catalogue_version(db)
+            self.version_checks += 1
+            self._checked_at = time.monotonic()
+
+            if snapshot is None or self._stale or version != snapshot.version:
+                self._stale = False
+                started = time.perf_counter()
+                documents = {
+                    collection: list(db[collection].find({}))
+                    for collection in CATALOGUE_COLLECTIONS
+                }
+                snapshot = CatalogueSnapshot(version, documents)
+                self._snapshot = snapshot
+                self.loads += 1
+                self.last_load_seconds = round(time.perf_counter() - started, 4)
+                print(f"📚 Catalogue snapshot v{version} loaded: {snapshot.counts()}")
+
+            return snapshot
+
+    def invalidate(self, db):
+        """Record a catalogue write so this and every other process reloads"""
+        bump_catalogue_version(db)
+        self._stale = True
+
+    def stats(self):
+        """Counters for monitoring"""
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version if snapshot else None,
+            'counts': snapshot.counts() if snapshot else {},
+            'loads': self.loads,
+            'version_checks': self.version_checks,
+            'last_load_seconds': self.last_load_seconds
+        }
+
+
+catalogue_cache = CatalogueCache()
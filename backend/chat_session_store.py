@@ -0,0 +1,337 @@
+"""
+Chat Session Store
+Pluggable storage for chat sessions: a bounded in-process LRU with idle-TTL
+eviction, and a MongoDB backend shared by every worker
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import threading
+
+
+# Rough fixed cost of a session object before any messages are added
+SESSION_BASE_BYTES = 2048
+
+
+def estimate_session_size(session):
+    """Approximate memory footprint of a chat session in bytes"""
+    size = SESSION_BASE_BYTES
+
+    for message in session.conversation_history:
+        size += len(message.get('content', '')) + 100
+
+    for values in session.user_profile.values():
+        if isinstance(values, list):
+            size += sum(len(str(value)) + 50 for value in values)
+
+    return size
+
+
+class SessionBackend:
+    """Interface every chat session backend implements"""
+
+    def get(self, session_id):
+        """Return the session, or None if unknown or expired"""
+        raise NotImplementedError
+
+    def put(self, session):
+        """Store or refresh a session; call again after mutating it"""
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        """Remove a session; returns True if it existed"""
+        raise NotImplementedError
+
+    def stats(self):
+        """Counters for monitoring"""
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionBackend):
+    """
+    LRU session store with idle-TTL expiry and a hard memory budget
+
+    Sessions idle for longer than ttl (judged by session.last_activity)
+    are dropped on access, and the least recently used sessions are
+    evicted whenever max_sessions or max_bytes would be exceeded.
+    """
+
+    def __init__(self, max_sessions=1000, ttl_minutes=60, max_bytes=64 * 1024 * 1024):
+        self.max_sessions = max_sessions
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self.max_bytes = max_bytes
+
+        self._sessions = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _is_expired(self, session, now):
+        return now - session.last_activity > self.ttl
+
+    def _remove(self, session_id):
+        self._sessions.pop(session_id, None)
+        self._total_bytes -= self._sizes.pop(session_id, 0)
+
+    def _expire_idle(self, now):
+        """Drop expired sessions from the least recently used end"""
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if not self._is_expired(session, now):
+                break
+            self._remove(session_id)
+            self.expirations += 1
+
+    def _enforce_budget(self):
+        """Evict least recently used sessions until within limits"""
+        while self._sessions and (
+            len(self._sessions) > self.max_sessions or
+            self._total_bytes > self.max_bytes
+        ):
+            session_id = next(iter(self._sessions))
+            self._remove(session_id)
+            self.evictions += 1
+
+    def get(self, session_id):
+        """Return the session, or None if unknown or expired"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+
+            if session is None:
+                self.misses += 1
+                return None
+
+            if self._is_expired(session, datetime.utcnow()):
+                self._remove(session_id)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._sessions.move_to_end(session_id)
+            self.hits += 1
+            return session
+
+    def put(self, session):
+        """Store or refresh a session; call again after mutating it"""
+        with self._lock:
+            session_id = session.session_id
+            size = estimate_session_size(session)
+
+            self._total_bytes += size - self._sizes.get(session_id, 0)
+            self._sizes[session_id] = size
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+
+            self._expire_idle(datetime.utcnow())
+            self._enforce_budget()
+
+    def delete(self, session_id):
+        """Remove a session; returns True if it existed"""
+        with self._lock:
+            existed = session_id in self._sessions
+            self._remove(session_id)
+            return existed
+
+    def stats(self):
+        """Counters for monitoring"""
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'sessions': len(self._sessions),
+                'bytes': self._total_bytes,
+                'max_sessions': self.max_sessions,
+                'max_bytes': self.max_bytes,
+                'ttl_minutes': int(self.ttl.total_seconds() // 60),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class MongoSessionStore(SessionBackend):
+    """
+    Chat sessions persisted in the chat_history collection
+
+    Every worker reads and writes the same documents, so a conversation
+    survives being routed to a different process. Writes go through a
+    local MemorySessionStore, but get() still makes one find_one per
+    call: a cached session is reused only after a version-only lookup
+    confirms no other worker has changed it. The cache saves loading and
+    rebuilding the full transcript, not the round trip. Writes are
+    conditional on the version last seen, so when two workers update the
+    same session both sets of new messages are kept (the later write's
+    profile state wins).
+    """
+
+    def __init__(self, get_collection, load_session, cache_size=200, ttl_minutes=60,
+                 max_write_attempts=3):
+        """
+        Args:
+            get_collection: Callable returning the chat_history collection,
+                or None when the database is unavailable
+            load_session: Callable building a session from a stored document
+            cache_size: Sessions kept in the local write-through cache,
+                which spares the full-document read but not the version check
+            ttl_minutes: Idle time after which a session is no longer served
+            max_write_attempts: Conditional writes tried before giving up
+                when other workers keep changing the same session
+        """
+        self.get_collection = get_collection
+        self.load_session = load_session
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self.max_write_attempts = max_write_attempts
+        self.cache = MemorySessionStore(max_sessions=cache_size, ttl_minutes=ttl_minutes)
+
+        self.reads = 0
+        self.version_checks = 0
+        self.writes = 0
+        self.cache_hits = 0
+        self.stale_reads = 0
+        self.conflicts = 0
+        self.errors = 0
+
+    def _active_query(self, session_id):
+        return {
+            'session_id': session_id,
+            'is_active': True,
+            'last_message_at': {'$gte': datetime.utcnow() - self.ttl}
+        }
+
+    def get(self, session_id):
+        cached = self.cache.get(session_id)
+        collection = self.get_collection()
+
+        if collection is None:
+            return cached
+
+        try:
+            query = self._active_query(session_id)
+
+            if cached is not None:
+                self.version_checks += 1
+                current = collection.find_one(query, {'version': 1})
+                if current is None:
+                    self.cache.delete(session_id)
+                    return None
+                if current.get('version') == getattr(cached, '_store_version', None):
+                    self.cache_hits += 1
+                    return cached
+                self.stale_reads += 1
+
+            self.reads += 1
+            document = collection.find_one(query)
+            if document is None:
+                return None
+
+            session = self.load_session(document)
+            session._store_version = document.get('version', 0)
+            session._persisted_messages = len(document.get('messages', []))
+            self.cache.put(session)
+            return session
+
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Chat session read failed, using local cache: {e}")
+            return cached
+
+    def put(self, session):
+        self.cache.put(session)
+        collection = self.get_collection()
+
+        if collection is None:
+            return
+
+        try:
+            document = session.to_document()
+            messages = document.pop('messages')
+            persisted = getattr(session, '_persisted_messages', 0)
+            expected = getattr(session, '_store_version', None)
+            document['is_active'] = True
+            conflicted = False
+
+            for attempt in range(self.max_write_attempts):
+                if expected is None:
+                    # Never stored: only create, never overwrite another worker's copy
+                    result = collection.update_one(
+                        {'session_id': session.session_id},
+                        {'$setOnInsert': {**document, 'messages': messages, 'version': 1}},
+                        upsert=True
+                    )
+                    written = result.upserted_id is not None
+                else:
+                    # Only messages added since the last write are sent
+                    result = collection.update_one(
+                        {'session_id': session.session_id, 'version': expected or {'$in': [0, None]}},
+                        {
+                            '$set': document,
+                            '$inc': {'version': 1},
+                            '$push': {'messages': {'$each': messages[persisted:]}}
+                        }
+                    )
+                    written = result.matched_count > 0
+
+                if written:
+                    break
+
+                # Another worker wrote first; append on top of its version
+                self.conflicts += 1
+                conflicted = True
+                current = collection.find_one({'session_id': session.session_id}, {'version': 1})
+                expected = current.get('version', 0) if current is not None else None
+                if current is None:
+                    persisted = 0
+            else:
+                self.errors += 1
+                print(f"⚠️ Chat session {session.session_id} kept changing, write skipped")
+                return
+
+            session._store_version = (expected or 0) + 1
+            session._persisted_messages = len(messages)
+            self.writes += 1
+
+            if conflicted:
+                # The stored transcript has messages this copy lacks; reload it next time
+                self.cache.delete(session.session_id)
+
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Chat session write failed, kept in local cache: {e}")
+
+    def delete(self, session_id):
+        existed = self.cache.delete(session_id)
+        collection = self.get_collection()
+
+        if collection is None:
+            return existed
+
+        try:
+            # Keep the transcript as chat history, just close the session
+            result = collection.update_one(
+                {'session_id': session_id, 'is_active': True},
+                {'$set': {'is_active': False}}
+            )
+            return existed or result.matched_count > 0
+
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Chat session delete failed: {e}")
+            return existed
+
+    def stats(self):
+        return {
+            'backend': 'mongodb',
+            'reads': self.reads,
+            'version_checks': self.version_checks,
+            'writes': self.writes,
+            'cache_hits': self.cache_hits,
+            'stale_reads': self.stale_reads,
+            'conflicts': self.conflicts,
+            'errors': self.errors,
+            'cache': self.cache.stats()
+        }
@@ -6,6 +6,7 @@ Run this once to create an admin account in MongoDB
 from pymongo import MongoClient
 import bcrypt
 from datetime import datetime
+from user_search import name_tokens
 
 # MongoDB connection
 MONGODB_URI = 'mongodb://localhost:27017/career_counselling'
@@ -71,6 +72,7 @@ def create_admin():
         # Create admin user document
         admin_user = {
             'name': name,
+            'name_tokens': name_tokens(name),
             'username': username,
             'email': email,
             'password': hashed_password,
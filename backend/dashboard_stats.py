@@ -0,0 +1,145 @@
+"""
+Dashboard Stats
+Admin dashboard counters materialized into one shared stats document
+"""
+
+from datetime import datetime, timedelta
+
+from catalogue_snapshot import catalogue_cache
+
+
+def _count_if(condition):
+    return {'$sum': {'$cond': [condition, 1, 0]}}
+
+
+def compute_dashboard_stats(db):
+    """
+    Every dashboard counter, with one aggregation per collection
+
+    Careers and colleges come from the catalogue snapshot, so they cost
+    no extra queries. Collections that don't exist yet aggregate to nothing.
+    """
+    active_since = datetime.utcnow() - timedelta(hours=24)
+
+    users = next(db.users.aggregate([
+        {'$group': {
+            '_id': None,
+            'total': {'$sum': 1},
+            'students': _count_if({'$eq': ['$role', 'student']}),
+            'counsellors': _count_if({'$eq': ['$role', 'counsellor']}),
+            'pending_approvals': _count_if({'$and': [
+                {'$eq': ['$role', 'counsellor']},
+                {'$eq': ['$is_active', False]}
+            ]}),
+            # Missing last_login sorts below any date, so it never counts
+            'active_now': _count_if({'$gte': ['$last_login', active_since]})
+        }}
+    ]), {})
+
+    appointments = next(db.appointments.aggregate([
+        {'$group': {
+            '_id': None,
+            'total': {'$sum': 1},
+            'revenue': {'$sum': {'$cond': [
+                {'$eq': ['$status', 'completed']},
+                {'$ifNull': ['$payment_amount', 0]},
+                0
+            ]}}
+        }}
+    ]), {})
+
+    catalogue = catalogue_cache.get(db).counts()
+
+    return {
+        'totalUsers': users.get('total', 0),
+        'totalStudents': users.get('students', 0),
+        'totalCounsellors': users.get('counsellors', 0),
+        'totalSessions': appointments.get('total', 0),
+        'totalCareers': catalogue['careers'],
+        'totalColleges': catalogue['colleges'],
+        'revenue': appointments.get('revenue', 0),
+        'activeNow': users.get('active_now', 0),
+        'pendingApprovals': users.get('pending_approvals', 0)
+    }
+
+
+class DashboardStats:
+    """
+    Dashboard counters stored as a single admin_stats document
+
+    Every worker reads the same document, so a dashboard load is one
+    find_one. It is recomputed once it is older than max_age_seconds;
+    writes that change the numbers (registration, booking, payment and
+    admin edits) call invalidate() so the next load recomputes straight
+    away. Only the request that claims the
+    document's computing_since marker recomputes; concurrent loads keep
+    serving the previous numbers until it finishes. A claim older than
+    compute_timeout_seconds is treated as abandoned.
+    """
+
+    def __init__(self, max_age_seconds=60, compute_timeout_seconds=120):
+        self.max_age_seconds = max_age_seconds
+        self.compute_timeout_seconds = compute_timeout_seconds
+
+        self.reads = 0
+        self.refreshes = 0
+        self.stale_reads = 0
+        self.last_refresh_seconds = None
+
+    def _claim(self, db, now):
+        """Mark the document as being recomputed; False if someone else already is"""
+        abandoned = now - timedelta(seconds=self.compute_timeout_seconds)
+        result = db.admin_stats.update_one(
+            {
+                '_id': 'dashboard',
+                '$or': [
+                    {'computing_since': None},
+                    {'computing_since': {'$lt': abandoned}}
+                ]
+            },
+            {'$set': {'computing_since': now}}
+        )
+        return result.modified_count > 0
+
+    def get(self, db, refresh=False):
+        """Current counters plus the time they were computed"""
+        self.reads += 1
+        now = datetime.utcnow()
+        document = db.admin_stats.find_one({'_id': 'dashboard'})
+
+        if document is not None and 'stats' in document:
+            age = now - document['computed_at']
+            if not refresh and not document.get('stale') and age.total_seconds() < self.max_age_seconds:
+                return document['stats'], document['computed_at']
+
+            if not self._claim(db, now):
+                self.stale_reads += 1
+                return document['stats'], document['computed_at']
+
+        started = datetime.utcnow()
+        stats = compute_dashboard_stats(db)
+        computed_at = datetime.utcnow()
+
+        db.admin_stats.update_one(
+            {'_id': 'dashboard'},
+            {
+                '$set': {'stats': stats, 'computed_at': computed_at, 'stale': False},
+                '$unset': {'computing_since': ''}
+            },
+            upsert=True
+        )
+
+        self.refreshes += 1
+        self.last_refresh_seconds = round((computed_at - started).total_seconds(), 4)
+        return stats, computed_at
+
+    def invalidate(self, db):
+        """Force the next dashboard load to recompute"""
+        try:
+            db.admin_stats.update_one({'_id': 'dashboard'}, {'$set': {'stale': True}})
+        except Exception as e:
+            # The caller's write already happened; the stats catch up within max_age
+            print(f"⚠️  Could not mark dashboard stats stale: {e}")
+
+
+dashboard_stats = DashboardStats()
@@ -7,6 +7,7 @@ from pymongo import MongoClient
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from catalogue_snapshot import bump_catalogue_version
 
 # Load environment variables
 load_dotenv()
@@ -1789,6 +1790,7 @@ def populate_colleges():
         # Insert colleges
         print(f"\n📥 Inserting {len(kerala_colleges)} Kerala colleges...")
         result = db.colleges.insert_many(kerala_colleges)
+        bump_catalogue_version(db)
         
         print(f"\n✅ Successfully added {len(result.inserted_ids)} colleges!")
         
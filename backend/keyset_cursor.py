@@ -0,0 +1,45 @@
+"""
+Keyset Cursor
+Opaque page tokens for lists sorted newest first on (timestamp field, _id)
+"""
+
+from datetime import datetime
+from bson import ObjectId
+import base64
+import json
+
+
+def encode_cursor(document, field):
+    """Opaque cursor for the position just after document"""
+    value = document.get(field)
+    position = {
+        't': value.isoformat() if value else None,
+        'id': str(document['_id'])
+    }
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return (timestamp or None, ObjectId) from a cursor; raises ValueError if malformed"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        value = datetime.fromisoformat(position['t']) if position['t'] else None
+        return value, ObjectId(position['id'])
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def after_cursor(field, value, last_id):
+    """
+    Query for everything after (value, last_id) in (field desc, _id desc) order
+
+    Documents without the field sort last, so they follow every dated one.
+    """
+    if value is None:
+        return {field: None, '_id': {'$lt': last_id}}
+
+    return {'$or': [
+        {field: {'$lt': value}},
+        {field: value, '_id': {'$lt': last_id}},
+        {field: None}
+    ]}
@@ -250,6 +250,8 @@ class CareerRecommendationModel:
                 'chat_analysis': bool,
                 'profile_data': bool,
             },
+            'input_hash': str,  # Fingerprint of the profile/quiz inputs used
+            'quiz_recommendations': Dict,  # {quiz_type: {'recommendations', 'generated_at'}} from quiz submissions
             'user_feedback': Optional[str],
         }
 
@@ -1,21 +1,13 @@
 # nlp_chatbot_improved.py
 from flask import Blueprint, request, jsonify
 from flask_cors import cross_origin
-import spacy
 from datetime import datetime
 import re
+from nlp_provider import nlp_provider
 
 # Create Blueprint
 chatbot_bp = Blueprint('chatbot', __name__)
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-    print("✅ SpaCy model loaded successfully")
-except:
-    print("⚠️ Please install: python -m spacy download en_core_web_sm")
-    nlp = None
-
 # ==================== CAREER DATABASE ====================
 CAREER_DATABASE = {
     "software_engineer": {
@@ -180,6 +172,7 @@ class ChatSession:
 # ==================== IMPROVED NLP PROCESSING ====================
 def extract_keywords_advanced(text):
     """Extract meaningful keywords using spaCy with better filtering"""
+    nlp = nlp_provider.get()
     if not nlp:
         return text.lower().split()
     
@@ -191,8 +184,8 @@ def extract_keywords_advanced(text):
         if token.pos_ in ['NOUN', 'VERB', 'ADJ', 'PROPN'] and not token.is_stop and len(token.text) > 2:
             keywords.append(token.lemma_)
     
-    # Also extract noun chunks (multi-word phrases)
-    for chunk in doc.noun_chunks:
+    # Also extract noun chunks (multi-word phrases), which need the parser
+    for chunk in (doc.noun_chunks if doc.has_annotation("DEP") else []):
         if len(chunk.text.split()) > 1:  # Multi-word phrases
             keywords.append(chunk.text.lower())
     
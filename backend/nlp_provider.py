@@ -0,0 +1,98 @@
+"""
+NLP Provider
+One lazily loaded spaCy pipeline shared by every chat module
+"""
+
+import os
+import threading
+import time
+
+
+SPACY_MODEL = os.getenv('SPACY_MODEL', 'en_core_web_sm')
+
+# Pipeline components to leave out entirely, e.g. "parser" when noun
+# chunks are not needed and only lemmas and entities are used
+SPACY_EXCLUDE = [pipe.strip() for pipe in os.getenv('SPACY_EXCLUDE', '').split(',') if pipe.strip()]
+
+
+class NLPProvider:
+    """
+    Loads the spaCy model on first use instead of at import time
+
+    When the model is missing the provider falls back to a tokenizer-only
+    blank English pipeline (mode "tokenizer"), and to None when spaCy
+    itself is not installed (mode "unavailable"). Call warm_up() in the
+    master process before forking workers so they share the loaded model
+    pages copy-on-write.
+    """
+
+    def __init__(self, model_name=SPACY_MODEL, exclude=None):
+        self.model_name = model_name
+        self.exclude = list(SPACY_EXCLUDE if exclude is None else exclude)
+
+        self._nlp = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+        self.mode = 'unloaded'
+        self.load_seconds = None
+        self.error = None
+
+    def get(self):
+        """Return the shared pipeline, loading it on the first call"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+        return self._nlp
+
+    def _load(self):
+        started = time.perf_counter()
+
+        try:
+            import spacy
+        except ImportError as e:
+            self.error = str(e)
+            self.mode = 'unavailable'
+            print("⚠️ spaCy is not installed - NLP features disabled")
+        else:
+            try:
+                self._nlp = spacy.load(self.model_name, exclude=self.exclude)
+                self.mode = 'full'
+                print(f"✅ spaCy model {self.model_name} loaded successfully")
+            except Exception as e:
+                self.error = str(e)
+                self._nlp = spacy.blank('en')
+                self.mode = 'tokenizer'
+                print(f"⚠️ spaCy model not found. Run: python -m spacy download {self.model_name}")
+                print("⚠️ Falling back to tokenizer-only NLP")
+
+        self.load_seconds = round(time.perf_counter() - started, 3)
+        self._loaded = True
+        print(f"⏱️ NLP startup took {self.load_seconds}s (mode: {self.mode})")
+
+    def has_pipe(self, name):
+        """Whether the loaded pipeline runs a component, e.g. 'parser' or 'ner'"""
+        nlp = self.get()
+        return nlp is not None and name in nlp.pipe_names
+
+    def warm_up(self):
+        """Load the model now and run it once so first requests are not slow"""
+        nlp = self.get()
+        if nlp is not None:
+            nlp("Warm up the career counselling pipeline.")
+        return self.stats()
+
+    def stats(self):
+        """Load metrics for monitoring"""
+        return {
+            'model': self.model_name,
+            'mode': self.mode,
+            'load_seconds': self.load_seconds,
+            'pipes': list(self._nlp.pipe_names) if self._nlp is not None else [],
+            'excluded': self.exclude,
+            'error': self.error
+        }
+
+
+nlp_provider = NLPProvider()
@@ -0,0 +1,178 @@
+"""
+Password Hasher
+Runs bcrypt on a small dedicated pool so password work can't starve other requests
+"""
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import os
+import threading
+import time
+
+import bcrypt
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the pool is full or an operation waited too long"""
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification on a size-limited thread pool
+
+    At most max_workers hashes run at once (bcrypt releases the GIL, so
+    they do run in parallel), and at most max_pending may be running or
+    queued. Beyond that, callers get PasswordPoolBusy immediately. An
+    admitted call blocks its request thread for at most timeout_seconds
+    before it also gets PasswordPoolBusy; routes turn both into a 429.
+    Hashes made with a cost other than rounds are upgraded on a
+    successful login.
+    """
+
+    def __init__(self, rounds=12, max_workers=4, max_pending=32, timeout_seconds=5.0):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()  # Guards executor creation and the counters
+        self._executor = None
+        self._pid = None
+
+        self.hashes = 0
+        self.verifications = 0
+        self.rehashes = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.hash_seconds = 0.0
+        self.verify_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _get_executor(self):
+        """Create the pool lazily, and again in forked workers"""
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='password'
+                    )
+        return self._executor
+
+    def _run(self, func, *args):
+        """Run func on the pool and wait for it; raises PasswordPoolBusy when full or slow"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordPoolBusy('Server is busy, please try again shortly')
+
+        submitted = time.perf_counter()
+
+        def task():
+            # The slot is held until the task finishes, even if the caller gave up on it
+            try:
+                waited = time.perf_counter() - submitted
+                with self._lock:
+                    self.wait_seconds += waited
+                    self.max_wait_seconds = max(self.max_wait_seconds, waited)
+                return func(*args)
+            finally:
+                self._slots.release()
+
+        try:
+            future = self._get_executor().submit(task)
+        except Exception:
+            self._slots.release()
+            raise
+
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except TimeoutError:
+            # A task cancelled before it started never releases its slot itself
+            if future.cancel():
+                self._slots.release()
+            with self._lock:
+                self.timeouts += 1
+            raise PasswordPoolBusy('Server is busy, please try again shortly')
+
+    @staticmethod
+    def _to_bytes(value):
+        return value.encode('utf-8') if isinstance(value, str) else value
+
+    @staticmethod
+    def cost_of(hashed):
+        """Cost factor encoded in a bcrypt hash ($2b$12$...), or None"""
+        try:
+            return int(PasswordHasher._to_bytes(hashed).split(b'$')[2])
+        except (IndexError, ValueError):
+            return None
+
+    def _hash(self, password):
+        started = time.perf_counter()
+        hashed = bcrypt.hashpw(self._to_bytes(password), bcrypt.gensalt(self.rounds))
+        with self._lock:
+            self.hash_seconds += time.perf_counter() - started
+            self.hashes += 1
+        return hashed
+
+    def _verify(self, password, hashed, upgrade):
+        started = time.perf_counter()
+        try:
+            matched = bcrypt.checkpw(self._to_bytes(password), self._to_bytes(hashed))
+        except (ValueError, TypeError):
+            # Not a bcrypt hash, or no stored hash at all
+            matched = False
+        with self._lock:
+            self.verify_seconds += time.perf_counter() - started
+            self.verifications += 1
+
+        if matched and upgrade and self.cost_of(hashed) != self.rounds:
+            with self._lock:
+                self.rehashes += 1
+            return True, self._hash(password)
+        return matched, None
+
+    def hash(self, password):
+        """bcrypt hash of password at the configured cost"""
+        return self._run(self._hash, password)
+
+    def verify(self, password, hashed):
+        """True if password matches hashed"""
+        return self._run(self._verify, password, hashed, False)[0]
+
+    def verify_and_upgrade(self, password, hashed):
+        """
+        Verify a password and rehash it if its cost is out of date
+
+        Returns:
+            (matched, new_hash) - new_hash is None unless the stored hash
+            should be replaced
+        """
+        return self._run(self._verify, password, hashed, True)
+
+    def stats(self):
+        """Counters for monitoring"""
+        operations = self.hashes + self.verifications
+        return {
+            'rounds': self.rounds,
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'hashes': self.hashes,
+            'verifications': self.verifications,
+            'rehashes': self.rehashes,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+            'avg_hash_ms': round(self.hash_seconds / self.hashes * 1000, 1) if self.hashes else 0,
+            'avg_verify_ms': round(self.verify_seconds / self.verifications * 1000, 1) if self.verifications else 0,
+            'avg_wait_ms': round(self.wait_seconds / operations * 1000, 1) if operations else 0,
+            'max_wait_ms': round(self.max_wait_seconds * 1000, 1)
+        }
+
+
+password_hasher = PasswordHasher(
+    rounds=int(os.getenv('BCRYPT_ROUNDS', 12)),
+    max_workers=int(os.getenv('PASSWORD_WORKERS', 4)),
+    max_pending=int(os.getenv('PASSWORD_MAX_PENDING', 32)),
+    timeout_seconds=float(os.getenv('PASSWORD_TIMEOUT_SECONDS', 5))
+)
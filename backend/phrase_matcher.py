@@ -0,0 +1,97 @@
+"""
+Phrase Matcher
+Aho-Corasick automaton that finds every known phrase in a text in one pass
+"""
+
+from collections import deque
+
+
+class PhraseMatcher:
+    """
+    Multi-phrase matcher with whole-word semantics
+
+    Phrases are added with a label, compiled once with build(), and then
+    every occurrence in a text is found in time linear in the text length
+    regardless of how many phrases are registered. A match only counts
+    when it is not part of a larger word, so "it" does not match "with".
+    Phrases added with prefix=True only need to start a word, so the stem
+    "recommend" also matches "recommendations".
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        self._built = False
+
+    def add(self, phrase, label, prefix=False):
+        """Register a phrase (matched case-sensitively) under a label"""
+        if not phrase:
+            return
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append((len(phrase), phrase, label, prefix))
+        self._built = False
+
+    def build(self):
+        """Compute failure links; must be called after the last add()"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                # Inherit matches that end at the same position
+                self._outputs[next_state] = (
+                    self._outputs[next_state] + self._outputs[self._fail[next_state]]
+                )
+
+        self._built = True
+        return self
+
+    def find(self, text):
+        """
+        Find all whole-word phrase occurrences in text
+
+        Returns:
+            List of (label, phrase, start, end) tuples ordered by end position
+        """
+        if not self._built:
+            self.build()
+
+        matches = []
+        state = 0
+        length = len(text)
+
+        for idx, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+
+            for phrase_length, phrase, label, prefix in self._outputs[state]:
+                start = idx - phrase_length + 1
+                end = idx + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if not prefix and end < length and text[end].isalnum():
+                    continue
+                matches.append((label, phrase, start, end))
+
+        return matches
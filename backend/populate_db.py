@@ -5,6 +5,7 @@ Run this to populate with all comprehensive careers
 
 from pymongo import MongoClient
 from datetime import datetime
+from catalogue_snapshot import bump_catalogue_version
 
 print("=" * 60)
 print("🚀 ADDING 50+ COMPREHENSIVE CAREERS")
@@ -1009,6 +1010,7 @@ try:
     
     print(f"📝 Inserting {len(all_careers)} careers...")
     result = db.careers.insert_many(all_careers)
+    bump_catalogue_version(db)
     print(f"✅ Successfully inserted {len(result.inserted_ids)} careers!")
     
     # Verify
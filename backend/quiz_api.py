@@ -3,10 +3,17 @@ Enhanced Quiz API with AI-Powered Career Recommendations
 Analyzes quiz results and generates personalized career matches
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response
 from datetime import datetime
 from bson import ObjectId
-import jwt
+from pymongo import InsertOne, UpdateOne
+from auth_middleware import authenticate
+from user_role_cache import user_role_cache
+import numpy as np
+from career_summary_cache import career_summary_cache
+from quiz_bank import QuestionBank
+from write_behind import quiz_writer, WriteQueueFull
+from keyset_cursor import encode_cursor, decode_cursor, after_cursor
 
 quiz_bp = Blueprint('quiz', __name__)
 
@@ -208,6 +215,12 @@ PERSONALITY_QUESTIONS = [
 ]
 
 
+question_bank = QuestionBank({
+    'aptitude': APTITUDE_QUESTIONS,
+    'personality': PERSONALITY_QUESTIONS
+})
+
+
 def get_db():
     """Get database from app config or fallback"""
     try:
@@ -221,34 +234,34 @@ def get_db():
             return None
 
 
-def get_user_from_token(request):
-    """Extract user ID from JWT token"""
-    auth_header = request.headers.get('Authorization')
+# Routes
+def questions_response(quiz_type):
+    """Serve a pre-encoded question snapshot, honouring If-None-Match"""
+    snapshot = question_bank.get(quiz_type, get_db())
     
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None, {'error': 'No token provided'}, 401
+    use_gzip = 'gzip' in request.accept_encodings
+    etag = snapshot.gzip_etag if use_gzip else snapshot.etag
     
-    token = auth_header.split(' ')[1]
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        print(f"✓ Sending {len(snapshot.questions)} {quiz_type} questions")
+        response = Response(snapshot.gzip_body if use_gzip else snapshot.body, mimetype='application/json')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
     
-    try:
-        secret_key = current_app.config.get('SECRET_KEY', 'your-secret-key')
-        payload = jwt.decode(token, secret_key, algorithms=['HS256'])
-        return payload.get('user_id') or payload.get('sub'), None, None
-    except:
-        try:
-            payload = jwt.decode(token, options={"verify_signature": False})
-            return payload.get('user_id') or payload.get('sub'), None, None
-        except:
-            return None, {'error': 'Invalid token'}, 401
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Question-Bank-Version'] = snapshot.version
+    return response
 
 
-# Routes
 @quiz_bp.route('/api/quiz/aptitude/questions', methods=['GET'])
 def get_aptitude_questions():
     """Get aptitude test questions"""
     try:
-        print(f"✓ Sending {len(APTITUDE_QUESTIONS)} aptitude questions")
-        return jsonify({'questions': APTITUDE_QUESTIONS}), 200
+        return questions_response('aptitude')
     except Exception as e:
         print(f"✗ Error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -258,8 +271,7 @@ def get_aptitude_questions():
 def get_personality_questions():
     """Get personality test questions"""
     try:
-        print(f"✓ Sending {len(PERSONALITY_QUESTIONS)} personality questions")
-        return jsonify({'questions': PERSONALITY_QUESTIONS}), 200
+        return questions_response('personality')
     except Exception as e:
         print(f"✗ Error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -273,58 +285,83 @@ def submit_quiz():
         print(f"✓ Received quiz submission")
         
         # Try to get user from token
-        user_id, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
             print(f"⚠ No valid token, proceeding without user ID")
             user_id = 'anonymous'
         
-        quiz_type = data.get('quiz_type')
+        quiz_type = 'aptitude' if data.get('quiz_type') == 'aptitude' else 'personality'
         answers = data.get('answers', {})
-        questions = data.get('questions', [])
         
-        print(f"  Quiz type: {quiz_type}, Answers: {len(answers)}")
+        # Score against the server's questions; client-sent questions are ignored
+        db = get_db()
+        snapshot = question_bank.get(quiz_type, db)
+        
+        # Answers only line up with the questions they were given for
+        version = data.get('version')
+        if not version:
+            return jsonify({
+                'error': 'Quiz version is required, please reload the quiz',
+                'version': snapshot.version
+            }), 400
+        if version != snapshot.version:
+            return jsonify({
+                'error': 'Quiz questions have changed, please reload the quiz',
+                'version': snapshot.version
+            }), 409
         
-        # Use default questions if not provided
-        if not questions:
-            questions = APTITUDE_QUESTIONS if quiz_type == 'aptitude' else PERSONALITY_QUESTIONS
+        answers_error = snapshot.compiled.answers_error(answers)
+        if answers_error:
+            return jsonify({'error': answers_error}), 400
+        
+        print(f"  Quiz type: {quiz_type}, Answers: {len(answers)}")
         
         # Calculate score
-        if quiz_type == 'aptitude':
-            score = calculate_aptitude_score(answers, questions)
-            identified_skills = extract_skills_from_aptitude(answers, questions)
-        else:
-            score = calculate_personality_score(answers, questions)
-            identified_skills = []
+        score, identified_skills, career_tally = score_quiz(quiz_type, snapshot.compiled, answers)
         
         print(f"✓ Score: {score}")
         
         # Get AI-powered career recommendations
-        db = get_db()
         recommendations = generate_ai_recommendations(
             quiz_type, 
             score, 
-            answers, 
-            questions,
+            career_tally,
             identified_skills,
             db
         )
         
-        # Try to save to database
+        # Queue the result and recommendation snapshot; the response doesn't wait
         if db is not None and user_id != 'anonymous':
+            completed_at = datetime.utcnow()
+            result_doc = {
+                '_id': ObjectId(),  # Set up front so a retried write can't duplicate it
+                'user_id': user_id,
+                'quiz_type': quiz_type,
+                'question_bank_version': snapshot.version,
+                'answers': answers,
+                'score': score,
+                'identified_skills': identified_skills,
+                'recommendations': recommendations,
+                'completed_at': completed_at
+            }
+            try:
+                quiz_writer.submit(db.quiz_results, InsertOne(result_doc))
+            except WriteQueueFull as e:
+                return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+            
             try:
-                result_doc = {
-                    'user_id': user_id,
-                    'quiz_type': quiz_type,
-                    'answers': answers,
-                    'score': score,
-                    'identified_skills': identified_skills,
-                    'recommendations': recommendations,
-                    'completed_at': datetime.utcnow()
-                }
-                db.quiz_results.insert_one(result_doc)
-                print("✓ Saved to database")
-            except Exception as e:
-                print(f"⚠ Database save failed: {e}")
+                # Kept beside, not over, the engine's cached recommendations
+                quiz_writer.submit(db.career_recommendations, UpdateOne(
+                    {'user_id': user_id},
+                    {'$set': {f'quiz_recommendations.{quiz_type}': {
+                        'recommendations': recommendations,
+                        'generated_at': completed_at
+                    }}},
+                    upsert=True
+                ), ordered=True)
+                print("✓ Queued for saving")
+            except WriteQueueFull:
+                print("⚠ Write queue full, recommendation snapshot not saved")
         
         print(f"✓ Generated {len(recommendations)} AI-powered recommendations")
         
@@ -342,114 +379,135 @@ def submit_quiz():
         return jsonify({'error': str(e)}), 500
 
 
-def calculate_aptitude_score(answers, questions):
-    """Calculate aptitude score with category breakdown"""
-    categories = {
-        'logical': {'correct': 0, 'total': 0},
-        'numerical': {'correct': 0, 'total': 0},
-        'verbal': {'correct': 0, 'total': 0}
-    }
+def score_quiz(quiz_type, compiled, answers):
+    """
+    Score a submission in one pass over the compiled questions
     
-    correct = 0
-    total = len(questions)
-    
-    for idx, question in enumerate(questions):
-        user_answer = answers.get(str(idx))
-        correct_answer = question.get('correct')
-        category = question.get('category', 'general')
-        
-        if category in categories:
-            categories[category]['total'] += 1
-        
-        if user_answer == correct_answer:
-            correct += 1
-            if category in categories:
-                categories[category]['correct'] += 1
-    
-    # Calculate percentages
-    for cat in categories:
-        if categories[cat]['total'] > 0:
-            categories[cat]['percentage'] = round(
-                (categories[cat]['correct'] / categories[cat]['total']) * 100, 2
-            )
-        else:
-            categories[cat]['percentage'] = 0
-    
-    percentage = (correct / total * 100) if total > 0 else 0
-    
-    return {
-        'correct': correct,
-        'total': total,
-        'percentage': round(percentage, 2),
-        'categories': categories
-    }
-
-
-def extract_skills_from_aptitude(answers, questions):
-    """Extract skills demonstrated in aptitude test"""
-    skills = []
-    
-    for idx, question in enumerate(questions):
-        user_answer = answers.get(str(idx))
-        correct_answer = question.get('correct')
+    Returns:
+        (score, identified_skills, career_tally) where career_tally maps
+        each career suggested by a personality answer to its count and reasons
+    """
+    if quiz_type == 'aptitude':
+        categories = {
+            category: {'correct': 0, 'total': total}
+            for category, total in compiled.category_totals.items()
+        }
+        correct = 0
+        skills = []
         
-        # If answered correctly, add associated skills
-        if user_answer == correct_answer:
-            question_skills = question.get('skills', [])
-            skills.extend(question_skills)
-    
-    # Return unique skills
-    return list(set(skills))
-
-
-def calculate_personality_score(answers, questions):
-    """Calculate personality score with trait analysis"""
-    traits = {}
-    career_preferences = []
-    
-    for idx, question in enumerate(questions):
-        trait = question.get('trait')
-        answer = answers.get(str(idx))
+        for idx in range(compiled.size):
+            if compiled.answer_at(answers, idx) == compiled.answer_key[idx]:
+                correct += 1
+                category = compiled.categories[idx]
+                if category in categories:
+                    categories[category]['correct'] += 1
+                # If answered correctly, add associated skills
+                skills.extend(compiled.skills[idx])
         
-        if trait and answer is not None:
-            if trait not in traits:
-                traits[trait] = []
-            
-            # Store answer for trait
-            traits[trait].append(answer)
-            
-            # Extract career preferences from mapping
-            career_mapping = question.get('career_mapping', {})
-            if answer in career_mapping:
-                career_preferences.extend(career_mapping[answer])
-    
-    # Calculate trait scores
-    trait_scores = {}
-    for trait, answers_list in traits.items():
-        if isinstance(answers_list[0], str):
-            # For Likert scale answers
-            likert_map = {
-                'Strongly Disagree': 1,
-                'Disagree': 2,
-                'Neutral': 3,
-                'Agree': 4,
-                'Strongly Agree': 5
+        # Calculate percentages
+        for cat in categories:
+            if categories[cat]['total'] > 0:
+                categories[cat]['percentage'] = round(
+                    (categories[cat]['correct'] / categories[cat]['total']) * 100, 2
+                )
+            else:
+                categories[cat]['percentage'] = 0
+        
+        percentage = (correct / compiled.size * 100) if compiled.size > 0 else 0
+        
+        score = {
+            'correct': correct,
+            'total': compiled.size,
+            'percentage': round(percentage, 2),
+            'categories': categories
+        }
+        return score, list(dict.fromkeys(skills)), {}
+    
+    score, career_tally = score_personality_bulk(compiled, [answers])[0]
+    return score, [], career_tally
+
+
+def score_personality_bulk(compiled, submissions, with_reasons=True):
+    """
+    Score many personality submissions at once
+    
+    Args:
+        compiled: CompiledQuiz for the personality questions
+        submissions: List of answers dicts
+        with_reasons: Attribute reasons to each career; analytics
+            backfills that only need scores can skip this
+    
+    Returns:
+        List of (score, career_tally) per submission, where career_tally maps
+        each suggested career to {'count', 'reasons'} ordered by count
+    """
+    if not submissions:
+        return []
+    
+    slots = np.array([compiled.encode_answers(answers) for answers in submissions], dtype=np.int64)
+    slots = slots.reshape(len(submissions), compiled.size)
+    answered = slots >= 0
+    counted = answered & (compiled.question_trait >= 0)
+    safe_slots = np.where(answered, slots, 0)
+    
+    # Trait means from Likert codes
+    likert = np.where(counted, compiled.likert_codes[safe_slots], 0)
+    trait_sums = likert @ compiled.trait_matrix
+    trait_counts = counted.astype(np.float64) @ compiled.trait_matrix
+    trait_means = np.divide(trait_sums, trait_counts, out=np.zeros_like(trait_sums), where=trait_counts > 0)
+    
+    # Career tallies: answer incidence summed over the answered questions
+    chosen = np.zeros((len(submissions), compiled.incidence.shape[0]), dtype=np.int64)
+    rows, questions = np.nonzero(counted)
+    chosen[rows, slots[rows, questions]] = 1
+    career_counts = chosen @ compiled.incidence
+    
+    results = []
+    for row in range(len(submissions)):
+        # Traits in the order they were first answered
+        row_means = trait_means[row].tolist()
+        trait_ids = dict.fromkeys(compiled.question_trait[counted[row]].tolist())
+        trait_scores = {compiled.trait_names[trait]: round(row_means[trait], 2) for trait in trait_ids}
+        overall = round(sum(trait_scores.values()) / len(trait_scores), 2) if trait_scores else 0
+        
+        # Which answered questions suggested each career
+        reasons_by_career = {}
+        if with_reasons:
+            for question, slot in enumerate(slots[row].tolist()):
+                if slot < 0:
+                    continue
+                reason = compiled.trait_reasons[question]
+                for career in compiled.slot_careers[slot]:
+                    reasons = reasons_by_career.setdefault(career, [])
+                    if reason not in reasons:
+                        reasons.append(reason)
+        
+        # Most frequently suggested careers first, ties in question order
+        row_counts = career_counts[row].tolist()
+        career_ids = sorted(
+            (career for career, count in enumerate(row_counts) if count > 0),
+            key=lambda career: (-row_counts[career], career)
+        )
+        
+        career_tally = {
+            compiled.career_names[career]: {
+                'count': row_counts[career],
+                'reasons': reasons_by_career.get(career, [])
             }
-            scores = [likert_map.get(ans, 3) for ans in answers_list]
-            trait_scores[trait] = round(sum(scores) / len(scores), 2) if scores else 3
-        else:
-            trait_scores[trait] = len(answers_list)
-    
-    overall = round(sum(trait_scores.values()) / len(trait_scores), 2) if trait_scores else 0
+            for career in career_ids
+        }
+        
+        score = {
+            'traits': trait_scores,
+            'overall': overall,
+            'career_preferences': list(career_tally)  # Unique career preferences
+        }
+        results.append((score, career_tally))
     
-    return {
-        'traits': trait_scores,
-        'overall': overall,
-        'career_preferences': list(set(career_preferences))  # Unique career preferences
-    }
+    return results
 
 
-def generate_ai_recommendations(quiz_type, score, answers, questions, identified_skills, db):
+def generate_ai_recommendations(quiz_type, score, career_tally, identified_skills, db):
     """Generate intelligent career recommendations based on quiz analysis"""
     
     recommendations = []
@@ -459,7 +517,7 @@ def generate_ai_recommendations(quiz_type, score, answers, questions, identified
         recommendations = generate_aptitude_recommendations(score, identified_skills, db)
     else:
         # Personality-based recommendations
-        recommendations = generate_personality_recommendations(score, answers, questions, db)
+        recommendations = generate_personality_recommendations(score, career_tally, db)
     
     # Fetch additional details from database
     if db is not None:
@@ -540,27 +598,18 @@ def generate_aptitude_recommendations(score, identified_skills, db):
     return recommendations[:8]  # Top 8 recommendations
 
 
-def generate_personality_recommendations(score, answers, questions, db):
+def generate_personality_recommendations(score, career_tally, db):
     """Generate recommendations based on personality test results"""
     
     recommendations = []
-    career_preferences = score.get('career_preferences', [])
-    
-    # Count career frequency
-    career_counts = {}
-    for career in career_preferences:
-        career_counts[career] = career_counts.get(career, 0) + 1
     
-    # Sort by frequency
-    sorted_careers = sorted(career_counts.items(), key=lambda x: x[1], reverse=True)
-    
-    # Generate recommendations
-    for career_name, count in sorted_careers[:10]:
+    # Tally is already sorted by frequency
+    for career_name, tally in list(career_tally.items())[:10]:
         # Calculate match score based on how often career appeared
-        base_score = min(50 + (count * 10), 95)
+        base_score = min(50 + (tally['count'] * 10), 95)
         
         # Get reasons based on answers
-        reasons = generate_personality_reasons(career_name, answers, questions)
+        reasons = tally['reasons'] or ["Your personality profile is a good match"]
         
         recommendations.append({
             'career_name': career_name,
@@ -574,24 +623,6 @@ def generate_personality_recommendations(score, answers, questions, db):
     return recommendations
 
 
-def generate_personality_reasons(career_name, answers, questions):
-    """Generate specific reasons why a career matches personality"""
-    reasons = []
-    
-    for idx, question in enumerate(questions):
-        user_answer = answers.get(str(idx))
-        career_mapping = question.get('career_mapping', {})
-        
-        if user_answer in career_mapping and career_name in career_mapping[user_answer]:
-            trait = question.get('trait', '').replace('_', ' ').title()
-            reasons.append(f"Your {trait} aligns well with this career")
-    
-    if not reasons:
-        reasons.append("Your personality profile is a good match")
-    
-    return list(set(reasons))  # Remove duplicates
-
-
 def get_career_category(career_name):
     """Get category for a career"""
     category_mapping = {
@@ -629,18 +660,21 @@ def enrich_recommendations_from_db(recommendations, db):
     """Enrich recommendations with database information"""
     
     try:
+        # One lookup for every recommended career instead of one per recommendation
+        summaries = career_summary_cache.get_many(
+            [rec['career_name'] for rec in recommendations], db
+        )
+        
         for rec in recommendations:
             career_name = rec['career_name']
-            
-            # Find career in database
-            career = db.careers.find_one({'name': career_name})
+            career = summaries.get(career_name)
             
             if career:
-                rec['career_id'] = str(career['_id'])
-                rec['description'] = career.get('description', '')[:150] + '...'
-                rec['average_salary'] = career.get('average_salary', 'N/A')
-                rec['education_required'] = career.get('education', [])[:2]  # First 2 requirements
-                rec['top_colleges'] = career.get('top_colleges', [])[:3]  # Top 3 colleges
+                rec['career_id'] = career['career_id']
+                rec['description'] = career['description']
+                rec['average_salary'] = career['average_salary']
+                rec['education_required'] = list(career['education_required'])
+                rec['top_colleges'] = list(career['top_colleges'])
             else:
                 # If not in database, create basic info
                 rec['career_id'] = None
@@ -655,6 +689,24 @@ def enrich_recommendations_from_db(recommendations, db):
     return recommendations
 
 
+@quiz_bp.route('/api/quiz/write-stats', methods=['GET'])
+def get_write_stats():
+    """Write-behind queue metrics for quiz persistence (admins only)"""
+    try:
+        user_id, role, error, status = authenticate()
+        if error:
+            return jsonify({'error': error}), status
+        
+        db = get_db()
+        identity = user_role_cache.get(user_id, db) if db is not None else None
+        if not identity or identity['role'] != 'admin' or not identity['is_active']:
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        return jsonify({'write_behind': quiz_writer.stats()}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 # Alternative route format
 @quiz_bp.route('/api/quiz/<quiz_type>/questions', methods=['GET'])
 def get_quiz_questions_alt(quiz_type):
@@ -667,24 +719,70 @@ def get_quiz_questions_alt(quiz_type):
         return jsonify({'error': 'Invalid quiz type'}), 400
 
 
+# Fields returned unless detail=full is requested
+RESULT_SUMMARY_PROJECTION = {
+    'quiz_type': 1,
+    'score': 1,
+    'identified_skills': 1,
+    'question_bank_version': 1,
+    'completed_at': 1,
+    'recommendations.career_name': 1,
+    'recommendations.match_score': 1
+}
+
+
 @quiz_bp.route('/api/quiz/results/<user_id>', methods=['GET'])
 def get_quiz_results(user_id):
-    """Get user's quiz results"""
+    """
+    Get user's quiz results, newest first
+    
+    Query params:
+        limit: Page size (default 20, max 100)
+        cursor: next_cursor from the previous page
+        detail: 'full' to include answers and complete recommendations
+    
+    'total' counts all of the user's results; 'count' is this page's size.
+    """
     try:
         db = get_db()
         if db is None:
             return jsonify({'error': 'Database not available'}), 500
         
-        results = list(db.quiz_results.find({'user_id': user_id}).sort('completed_at', -1))
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        full = request.args.get('detail') == 'full'
+        
+        query = {'user_id': user_id}
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                completed_at, last_id = decode_cursor(cursor)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            query.update(after_cursor('completed_at', completed_at, last_id))
+        
+        # Served by the (user_id, completed_at, _id) index created at startup
+        results = list(
+            db.quiz_results.find(query, None if full else RESULT_SUMMARY_PROJECTION)
+            .sort([('completed_at', -1), ('_id', -1)])
+            .limit(limit + 1)
+        )
+        
+        has_more = len(results) > limit
+        results = results[:limit]
+        next_cursor = encode_cursor(results[-1], 'completed_at') if has_more else None
         
         for result in results:
             result['_id'] = str(result['_id'])
-            if 'completed_at' in result:
+            if result.get('completed_at'):
                 result['completed_at'] = result['completed_at'].isoformat()
         
         return jsonify({
             'results': results,
-            'total': len(results)
+            'total': db.quiz_results.count_documents({'user_id': user_id}),
+            'count': len(results),
+            'has_more': has_more,
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
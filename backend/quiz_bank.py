@@ -0,0 +1,283 @@
+"""
+Quiz Question Bank
+Versioned, pre-encoded snapshots of the quiz questions served by quiz_api
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+import numpy as np
+
+
+# Scored aptitude categories, in the order the results report them
+APTITUDE_CATEGORIES = ('logical', 'numerical', 'verbal')
+
+# Likert answers as numbers; any other answer counts as neutral
+LIKERT_CODES = {
+    'Strongly Disagree': 1,
+    'Disagree': 2,
+    'Neutral': 3,
+    'Agree': 4,
+    'Strongly Agree': 5
+}
+NEUTRAL_CODE = 3
+
+# Longest answer text accepted in a submission; real options are far shorter
+MAX_ANSWER_LENGTH = 200
+
+
+class CompiledQuiz:
+    """
+    Scoring tables for one question snapshot
+
+    Holds the answer key, category index, skill lists and per-question
+    career mapping as parallel lists, so a submission is scored in a
+    single pass over the real questions.
+    """
+
+    def __init__(self, questions):
+        self.size = len(questions)
+        self.options = [question.get('options', []) for question in questions]
+        self.answer_key = [question.get('correct') for question in questions]
+        self.categories = [question.get('category', 'general') for question in questions]
+        self.skills = [question.get('skills', []) for question in questions]
+        self.traits = [question.get('trait') for question in questions]
+        self.career_mappings = [question.get('career_mapping', {}) for question in questions]
+
+        self.category_totals = {category: 0 for category in APTITUDE_CATEGORIES}
+        for category in self.categories:
+            if category in self.category_totals:
+                self.category_totals[category] += 1
+
+        self._compile_personality()
+
+    def _compile_personality(self):
+        """
+        Integer-code the personality tables
+
+        Every distinct answer to every question gets a slot, plus one
+        catch-all slot per question for unknown answers. Slots carry their
+        Likert code and a row of the slot -> career incidence matrix.
+        """
+        self.trait_names = list(dict.fromkeys(trait for trait in self.traits if trait))
+        trait_ids = {trait: idx for idx, trait in enumerate(self.trait_names)}
+        self.question_trait = np.array([trait_ids.get(trait, -1) for trait in self.traits], dtype=np.int64)
+
+        # Question -> trait one-hot, all zeros for questions without a trait
+        self.trait_matrix = np.zeros((self.size, len(self.trait_names)))
+        has_trait = self.question_trait >= 0
+        self.trait_matrix[np.nonzero(has_trait)[0], self.question_trait[has_trait]] = 1
+
+        self.career_names = list(dict.fromkeys(
+            career
+            for mapping in self.career_mappings
+            for careers in mapping.values()
+            for career in careers
+        ))
+        career_ids = {career: idx for idx, career in enumerate(self.career_names)}
+
+        self.answer_slots = []
+        self.other_slots = []
+        likert_codes = []
+        incidence_rows = []
+
+        for options, mapping in zip(self.options, self.career_mappings):
+            slots = {}
+            for answer in dict.fromkeys(list(options) + list(mapping)):
+                slots[answer] = len(likert_codes)
+                likert_codes.append(LIKERT_CODES.get(answer, NEUTRAL_CODE))
+                incidence_rows.append([career_ids[career] for career in mapping.get(answer, [])])
+            self.answer_slots.append(slots)
+
+            self.other_slots.append(len(likert_codes))
+            likert_codes.append(NEUTRAL_CODE)
+            incidence_rows.append([])
+
+        # Slot -> careers as plain lists, for per-submission reason lookups
+        self.slot_careers = incidence_rows
+        self.trait_reasons = [
+            f"Your {(trait or '').replace('_', ' ').title()} aligns well with this career"
+            for trait in self.traits
+        ]
+
+        self.likert_codes = np.array(likert_codes, dtype=np.float64)
+        self.incidence = np.zeros((len(likert_codes), len(self.career_names)), dtype=np.int64)
+        for slot, careers in enumerate(incidence_rows):
+            self.incidence[slot, careers] = 1
+
+    def encode_answers(self, answers):
+        """Slot index of each question's answer, -1 where unanswered"""
+        encoded = np.full(self.size, -1, dtype=np.int64)
+        for idx in range(self.size):
+            answer = self.answer_at(answers, idx)
+            if answer is None:
+                continue
+            slots = self.answer_slots[idx]
+            encoded[idx] = slots.get(answer, self.other_slots[idx]) if isinstance(answer, str) else self.other_slots[idx]
+        return encoded
+
+    def answers_error(self, answers):
+        """
+        Why a submitted answers payload can't be scored or stored, or None
+
+        Answers must be an object keyed by question index ("0".."size-1")
+        whose values are option text or option indexes.
+        """
+        if not isinstance(answers, dict):
+            return 'Answers must be an object keyed by question index'
+        if len(answers) > self.size:
+            return f'Too many answers: this quiz has {self.size} questions'
+        for key, answer in answers.items():
+            if not (key.isdigit() and int(key) < self.size):
+                return f'Unknown question index: {key[:20]}'
+            if isinstance(answer, bool) or not isinstance(answer, (str, int)):
+                return f'Answer {key} must be option text or an option index'
+            if isinstance(answer, str) and len(answer) > MAX_ANSWER_LENGTH:
+                return f'Answer {key} is too long'
+        return None
+
+    def answer_at(self, answers, idx):
+        """
+        The submitted answer text for question idx, or None
+
+        Answers are keyed by question index and may give either the option
+        text or the option's index.
+        """
+        answer = answers.get(str(idx)) if isinstance(answers, dict) else None
+        if isinstance(answer, int) and not isinstance(answer, bool) and 0 <= answer < len(self.options[idx]):
+            return self.options[idx][answer]
+        return answer
+
+
+class QuestionSnapshot:
+    """One immutable version of a quiz's questions and its encoded payloads"""
+
+    def __init__(self, quiz_type, questions, source):
+        self.quiz_type = quiz_type
+        self.questions = questions
+        self.source = source  # 'database' or 'builtin'
+
+        self.compiled = CompiledQuiz(questions)
+
+        encoded_questions = json.dumps(questions, separators=(',', ':'), default=str)
+        self.version = hashlib.sha256(encoded_questions.encode('utf-8')).hexdigest()[:16]
+        # Clients send the version back with their answers
+        self.body = f'{{"version":"{self.version}","questions":{encoded_questions}}}'.encode('utf-8')
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.loaded_at = time.time()
+
+    @property
+    def etag(self):
+        return f"{self.quiz_type}-{self.version}"
+
+    @property
+    def gzip_etag(self):
+        # Strong ETags must differ between encodings of the same content
+        return f"{self.quiz_type}-{self.version}-gz"
+
+
+def normalize_question(document, position):
+    """Convert a quiz_questions document to the shape the quiz API serves"""
+    options = document.get('options', [])
+    question = {
+        'id': document.get('id', position),
+        'question': document['question'],
+        'options': options,
+        'category': document.get('category')
+    }
+
+    if document.get('type') == 'aptitude':
+        correct = document.get('correct', document.get('correct_answer'))
+        # populate_quiz_questions.py stores the index of the correct option
+        if isinstance(correct, int) and 0 <= correct < len(options):
+            correct = options[correct]
+        question['correct'] = correct
+        question['skills'] = document.get('skills', document.get('skills_tested', []))
+    else:
+        question['trait'] = document.get('trait', document.get('category'))
+        question['career_mapping'] = document.get('career_mapping', {})
+
+    return question
+
+
+def is_scorable(quiz_type, question):
+    """
+    True if score_quiz can use a normalized question
+
+    Aptitude questions need their correct option; personality questions
+    need a career_mapping (documents that only carry a trait_mapping
+    would score as neutral traits with no careers).
+    """
+    if quiz_type == 'aptitude':
+        return question.get('correct') in question['options']
+    return bool(question.get('career_mapping'))
+
+
+class QuestionBank:
+    """
+    Quiz questions loaded from the quiz_questions collection
+
+    Falls back to the built-in question lists when the collection is
+    empty, unreachable, or holds questions the scorer can't use. Snapshots are rebuilt at most every
+    refresh_seconds, and a reload that yields identical questions keeps
+    the existing snapshot (and its ETag).
+    """
+
+    def __init__(self, builtin_questions, refresh_seconds=300):
+        self.builtin_questions = builtin_questions
+        self.refresh_seconds = refresh_seconds
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def quiz_types(self):
+        return list(self.builtin_questions)
+
+    def _load_questions(self, quiz_type, db):
+        if db is not None:
+            try:
+                documents = list(db.quiz_questions.find({'type': quiz_type}).sort('_id', 1))
+                questions = [
+                    normalize_question(document, position)
+                    for position, document in enumerate(documents, 1)
+                ]
+                unscorable = sum(1 for question in questions if not is_scorable(quiz_type, question))
+                if questions and not unscorable:
+                    return questions, 'database'
+                if unscorable:
+                    print(f"⚠ {unscorable} {quiz_type} questions in the database can't be scored, using built-in questions")
+            except Exception as e:
+                print(f"⚠ Quiz question load failed, using built-in questions: {e}")
+
+        return self.builtin_questions[quiz_type], 'builtin'
+
+    def get(self, quiz_type, db=None):
+        """Return the current QuestionSnapshot for a quiz type"""
+        snapshot = self._snapshots.get(quiz_type)
+        if snapshot is not None and time.time() - snapshot.loaded_at < self.refresh_seconds:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshots.get(quiz_type)
+            if snapshot is not None and time.time() - snapshot.loaded_at < self.refresh_seconds:
+                return snapshot
+
+            questions, source = self._load_questions(quiz_type, db)
+            fresh = QuestionSnapshot(quiz_type, questions, source)
+
+            if snapshot is not None and snapshot.version == fresh.version:
+                snapshot.loaded_at = fresh.loaded_at
+                return snapshot
+
+            self._snapshots[quiz_type] = fresh
+            print(f"✓ Loaded {len(questions)} {quiz_type} questions ({source}, version {fresh.version})")
+            return fresh
+
+    def invalidate(self, quiz_type=None):
+        """Force the next get() to reload one or all quiz types"""
+        with self._lock:
+            if quiz_type is None:
+                self._snapshots = {}
+            else:
+                self._snapshots.pop(quiz_type, None)
@@ -0,0 +1,339 @@
+"""
+Re-score Stored Quiz Results
+Recomputes scores and recommendations for quiz_results with the current
+question bank. Run from the command line; the admin API starts the same
+command in a child process.
+
+Usage:
+    python rescore_quiz_results.py [--quiz-type all] [--workers 4] [--resume]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from quiz_api import (
+    question_bank, score_quiz, score_personality_bulk,
+    generate_ai_recommendations, enrich_recommendations_from_db
+)
+from quiz_bank import CompiledQuiz
+
+
+CHECKPOINT_COLLECTION = 'job_checkpoints'
+
+# A running job whose checkpoint hasn't moved for this long is taken to be dead
+STALE_JOB_SECONDS = 1800
+
+# Compiled questions in each worker process, set by _init_worker
+_compiled = {}
+
+
+def _init_worker(questions_by_type):
+    for quiz_type, questions in questions_by_type.items():
+        _compiled[quiz_type] = CompiledQuiz(questions)
+
+
+def score_batch(quiz_type, batch):
+    """
+    Score one batch of stored results
+
+    Args:
+        batch: List of (result_id, answers)
+
+    Returns:
+        List of (result_id, score, identified_skills, recommendations)
+    """
+    compiled = _compiled[quiz_type]
+    scored = []
+
+    if quiz_type == 'personality':
+        results = score_personality_bulk(compiled, [answers for _, answers in batch])
+        for (result_id, _), (score, career_tally) in zip(batch, results):
+            recommendations = generate_ai_recommendations(quiz_type, score, career_tally, [], None)
+            scored.append((result_id, score, [], recommendations))
+    else:
+        for result_id, answers in batch:
+            score, identified_skills, career_tally = score_quiz(quiz_type, compiled, answers)
+            recommendations = generate_ai_recommendations(quiz_type, score, career_tally, identified_skills, None)
+            scored.append((result_id, score, identified_skills, recommendations))
+
+    return scored
+
+
+def score_in_pool(pool, quiz_type, batches, max_pending):
+    """
+    Score batches on the pool, yielding results in input order
+
+    At most max_pending batches are read ahead of the writer, so memory
+    stays bounded however large the collection is.
+    """
+    pending = deque()
+    for batch in batches:
+        pending.append(pool.submit(score_batch, quiz_type, batch))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_batches(db, quiz_type, after_id, batch_size, limit=None):
+    """Stream (result_id, answers) batches in _id order, starting after after_id"""
+    query = {'quiz_type': quiz_type}
+    if after_id is not None:
+        query['_id'] = {'$gt': after_id}
+
+    cursor = db.quiz_results.find(query, {'answers': 1}).sort('_id', 1).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    batch = []
+    for document in cursor:
+        batch.append((document['_id'], document.get('answers') or {}))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def rescore_quiz_results(db, quiz_types=('aptitude', 'personality'), batch_size=500,
+                         workers=None, resume=False, job_id='quiz-rescore', limit=None):
+    """
+    Re-score stored quiz results and write them back in batches
+
+    Progress is checkpointed per quiz type after every written batch, so a
+    run with resume=True continues after the last written result.
+
+    Args:
+        db: Database handle
+        quiz_types: Quiz types to re-score
+        batch_size: Results per cursor batch and per bulk_write
+        workers: Process pool size; 0 scores in this process
+        resume: Continue from the stored checkpoint instead of starting over
+        job_id: Checkpoint document id
+        limit: Maximum results per quiz type (for trial runs)
+
+    Returns:
+        The final checkpoint document
+    """
+    workers = os.cpu_count() if workers is None else workers
+    checkpoints = db[CHECKPOINT_COLLECTION]
+
+    checkpoint = checkpoints.find_one({'_id': job_id}) if resume else None
+    if checkpoint is None:
+        checkpoint = {'_id': job_id, 'progress': {}, 'started_at': datetime.utcnow()}
+
+    snapshots = {quiz_type: question_bank.get(quiz_type, db) for quiz_type in quiz_types}
+    checkpoint.update({
+        'status': 'running',
+        'versions': {quiz_type: snapshot.version for quiz_type, snapshot in snapshots.items()},
+        'error': None,
+        'updated_at': datetime.utcnow()
+    })
+    checkpoints.replace_one({'_id': job_id}, checkpoint, upsert=True)
+
+    questions_by_type = {quiz_type: snapshot.questions for quiz_type, snapshot in snapshots.items()}
+    pool = None
+    if workers > 0:
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(questions_by_type,))
+    else:
+        _init_worker(questions_by_type)
+
+    try:
+        for quiz_type in quiz_types:
+            progress = checkpoint['progress'].setdefault(quiz_type, {'last_id': None, 'processed': 0})
+            version = snapshots[quiz_type].version
+            batches = iter_batches(db, quiz_type, progress['last_id'], batch_size, limit)
+
+            if pool is not None:
+                # Results come back in input order, so checkpoints only move forward
+                scored_batches = score_in_pool(pool, quiz_type, batches, workers * 2)
+            else:
+                scored_batches = (score_batch(quiz_type, batch) for batch in batches)
+
+            for scored in scored_batches:
+                rescored_at = datetime.utcnow()
+                operations = []
+                for result_id, score, identified_skills, recommendations in scored:
+                    enrich_recommendations_from_db(recommendations, db)
+                    operations.append(UpdateOne(
+                        {'_id': result_id},
+                        {'$set': {
+                            'score': score,
+                            'identified_skills': identified_skills,
+                            'recommendations': recommendations,
+                            'question_bank_version': version,
+                            'rescored_at': rescored_at
+                        }}
+                    ))
+
+                if operations:
+                    db.quiz_results.bulk_write(operations, ordered=False)
+
+                progress['last_id'] = scored[-1][0]
+                progress['processed'] += len(scored)
+                checkpoints.update_one(
+                    {'_id': job_id},
+                    {'$set': {f'progress.{quiz_type}': progress, 'updated_at': datetime.utcnow()}}
+                )
+                print(f"✓ Re-scored {progress['processed']} {quiz_type} results")
+
+        checkpoint['status'] = 'completed'
+
+    except Exception as e:
+        checkpoint['status'] = 'failed'
+        checkpoint['error'] = str(e)
+        print(f"❌ Re-scoring failed, resume to continue: {e}")
+        raise
+
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        checkpoints.update_one(
+            {'_id': job_id},
+            {'$set': {
+                'status': checkpoint['status'],
+                'error': checkpoint.get('error'),
+                'updated_at': datetime.utcnow()
+            }}
+        )
+
+    return checkpoints.find_one({'_id': job_id})
+
+
+def claim_job(db, job_id, stale_after=STALE_JOB_SECONDS):
+    """
+    Mark job_id as running unless another process already has it
+
+    The status check and the write are one update_one, so two web workers
+    (or a worker and the command line) can't both start the same job.
+    A claim whose checkpoint went quiet for stale_after seconds is
+    treated as a crashed run and can be taken over.
+
+    Returns:
+        True if this caller now owns the job
+    """
+    now = datetime.utcnow()
+    try:
+        db[CHECKPOINT_COLLECTION].update_one(
+            {'_id': job_id, '$or': [
+                {'status': {'$ne': 'running'}},
+                {'updated_at': {'$lt': now - timedelta(seconds=stale_after)}}
+            ]},
+            {
+                '$set': {'status': 'running', 'error': None, 'updated_at': now},
+                '$setOnInsert': {'progress': {}, 'started_at': now}
+            },
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The filter missed an existing document: someone else is running it
+        return False
+    return True
+
+
+def _reap(db, job_id, process):
+    """Wait for a job process so it doesn't linger as a zombie"""
+    returncode = process.wait()
+    if returncode != 0:
+        # A crash before rescore_quiz_results could record it leaves the claim behind
+        db[CHECKPOINT_COLLECTION].update_one(
+            {'_id': job_id, 'status': 'running'},
+            {'$set': {
+                'status': 'failed',
+                'error': f'Job process exited with code {returncode}',
+                'updated_at': datetime.utcnow()
+            }}
+        )
+        print(f"❌ Re-scoring job {job_id} exited with code {returncode}")
+
+
+def start_rescore_job(db, quiz_type='all', batch_size=500, workers=2, resume=False, job_id='quiz-rescore'):
+    """
+    Claim job_id and run this module's command line in a child process
+
+    The process pool is created there instead of being forked from a web
+    worker with live request threads. The child reads MONGODB_URI from
+    the same environment as the app; progress is on the checkpoint.
+
+    Returns:
+        False if the job is already running in any process
+    """
+    if not claim_job(db, job_id):
+        return False
+
+    command = [
+        sys.executable, os.path.abspath(__file__),
+        f'--quiz-type={quiz_type}',
+        f'--batch-size={batch_size}',
+        f'--workers={workers}',
+        f'--job-id={job_id}',
+        '--claimed'
+    ]
+    if resume:
+        command.append('--resume')
+
+    try:
+        process = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)))
+    except Exception as e:
+        db[CHECKPOINT_COLLECTION].update_one(
+            {'_id': job_id},
+            {'$set': {'status': 'failed', 'error': str(e), 'updated_at': datetime.utcnow()}}
+        )
+        raise
+
+    threading.Thread(target=_reap, args=(db, job_id, process), daemon=True).start()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-score stored quiz results with the current question bank')
+    parser.add_argument('--quiz-type', choices=['aptitude', 'personality', 'all'], default='all')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='0 to score in-process')
+    parser.add_argument('--resume', action='store_true', help='Continue from the last checkpoint')
+    parser.add_argument('--job-id', default='quiz-rescore')
+    parser.add_argument('--limit', type=int, default=None, help='Maximum results per quiz type')
+    parser.add_argument('--claimed', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--mongodb-uri', default=os.getenv('MONGODB_URI', 'mongodb://localhost:27017/career_counselling'))
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongodb_uri, serverSelectionTimeoutMS=5000)
+    db = client.get_database()
+
+    quiz_types = ('aptitude', 'personality') if args.quiz_type == 'all' else (args.quiz_type,)
+
+    # Jobs started from the admin API were claimed before the process started
+    if not args.claimed and not claim_job(db, args.job_id):
+        print(f"❌ Job {args.job_id} is already running")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("🔁 RE-SCORING QUIZ RESULTS")
+    print("=" * 60)
+
+    checkpoint = rescore_quiz_results(
+        db,
+        quiz_types=quiz_types,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        resume=args.resume,
+        job_id=args.job_id,
+        limit=args.limit
+    )
+
+    for quiz_type, progress in checkpoint['progress'].items():
+        print(f"   ✓ {quiz_type}: {progress['processed']} results")
+    print("✅ RE-SCORING COMPLETE")
+
+
+if __name__ == '__main__':
+    main()
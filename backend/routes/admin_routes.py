@@ -3,24 +3,17 @@ Admin Routes - User, Counsellor, Career, College Management & Analytics
 """
 
 from flask import Blueprint, request, jsonify
-from functools import wraps
 from bson import ObjectId
-from datetime import datetime, timedelta
+from datetime import datetime
+from career_summary_cache import career_summary_cache
+from catalogue_snapshot import catalogue_cache
+from user_role_cache import user_role_cache
+from dashboard_stats import dashboard_stats
+from user_search import name_tokens
+from admin_common import admin_required, list_users
 
 admin_bp = Blueprint('admin', __name__)
 
-# Admin authentication decorator
-def admin_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        from app import get_current_user
-        
-        user = get_current_user()
-        if not user or user.get('role') != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
-        return f(*args, **kwargs)
-    return decorated_function
-
 
 @admin_bp.route('/dashboard', methods=['GET'])
 @admin_required
@@ -29,42 +22,10 @@ def get_dashboard_stats():
     try:
         from app import db
         
-        # Count users by role
-        total_users = db.users.count_documents({})
-        total_students = db.users.count_documents({'role': 'student'})
-        total_counsellors = db.users.count_documents({'role': 'counsellor'})
-        
-        # Count careers and colleges
-        total_careers = db.careers.count_documents({})
-        total_colleges = db.colleges.count_documents({})
-        
-        # Count sessions (from appointments or bookings)
-        total_sessions = db.appointments.count_documents({}) if 'appointments' in db.list_collection_names() else 0
-        
-        # Calculate revenue (sum of all completed sessions)
-        revenue_pipeline = [
-            {'$match': {'status': 'completed'}},
-            {'$group': {'_id': None, 'total': {'$sum': '$amount'}}}
-        ]
-        revenue_result = list(db.appointments.aggregate(revenue_pipeline)) if 'appointments' in db.list_collection_names() else []
-        revenue = revenue_result[0]['total'] if revenue_result else 0
+        # One shared document, recomputed at most once a minute
+        stats, computed_at = dashboard_stats.get(db, refresh=request.args.get('refresh') == 'true')
         
-        # Active users (logged in last 24 hours)
-        twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
-        active_now = db.users.count_documents({
-            'last_login': {'$gte': twenty_four_hours_ago}
-        }) if 'last_login' in db.users.find_one({}) or {} else 0
-        
-        return jsonify({
-            'totalUsers': total_users,
-            'totalStudents': total_students,
-            'totalCounsellors': total_counsellors,
-            'totalSessions': total_sessions,
-            'totalCareers': total_careers,
-            'totalColleges': total_colleges,
-            'revenue': revenue,
-            'activeNow': active_now
-        }), 200
+        return jsonify({**stats, 'computedAt': computed_at.isoformat()}), 200
         
     except Exception as e:
         print(f"Error getting dashboard stats: {e}")
@@ -77,44 +38,7 @@ def get_all_users():
     """Get all users with filters"""
     try:
         from app import db
-        
-        # Get query parameters
-        role = request.args.get('role')
-        search = request.args.get('search')
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 10))
-        
-        # Build query
-        query = {}
-        if role:
-            query['role'] = role
-        if search:
-            query['$or'] = [
-                {'name': {'$regex': search, '$options': 'i'}},
-                {'email': {'$regex': search, '$options': 'i'}},
-                {'username': {'$regex': search, '$options': 'i'}}
-            ]
-        
-        # Get users
-        users = list(db.users.find(query)
-                    .skip((page - 1) * limit)
-                    .limit(limit)
-                    .sort('created_at', -1))
-        
-        # Remove password field
-        for user in users:
-            user['_id'] = str(user['_id'])
-            user.pop('password', None)
-        
-        # Get total count
-        total = db.users.count_documents(query)
-        
-        return jsonify({
-            'users': users,
-            'total': total,
-            'page': page,
-            'pages': (total + limit - 1) // limit
-        }), 200
+        return list_users(db, default_limit=10)
         
     except Exception as e:
         print(f"Error getting users: {e}")
@@ -136,6 +60,11 @@ def update_user(user_id):
         
         data['updated_at'] = datetime.utcnow()
         
+        # Keep the indexed search words in step with the name
+        data.pop('name_tokens', None)
+        if 'name' in data:
+            data['name_tokens'] = name_tokens(data['name'])
+        
         result = db.users.update_one(
             {'_id': ObjectId(user_id)},
             {'$set': data}
@@ -144,6 +73,9 @@ def update_user(user_id):
         if result.modified_count == 0:
             return jsonify({'error': 'User not found'}), 404
         
+        user_role_cache.invalidate(user_id)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({'message': 'User updated successfully'}), 200
         
     except Exception as e:
@@ -163,6 +95,9 @@ def delete_user(user_id):
         if result.deleted_count == 0:
             return jsonify({'error': 'User not found'}), 404
         
+        user_role_cache.invalidate(user_id)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({'message': 'User deleted successfully'}), 200
         
     except Exception as e:
@@ -219,6 +154,9 @@ def approve_counsellor(counsellor_id):
         if result.modified_count == 0:
             return jsonify({'error': 'Counsellor not found'}), 404
         
+        user_role_cache.invalidate(counsellor_id)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({
             'message': f'Counsellor {"approved" if approved else "rejected"} successfully'
         }), 200
@@ -266,6 +204,9 @@ def add_career():
         data['updated_at'] = datetime.utcnow()
         
         result = db.careers.insert_one(data)
+        career_summary_cache.invalidate()
+        catalogue_cache.invalidate(db)
+        dashboard_stats.invalidate(db)
         
         return jsonify({
             'message': 'Career added successfully',
@@ -295,6 +236,10 @@ def update_career(career_id):
         if result.modified_count == 0:
             return jsonify({'error': 'Career not found'}), 404
         
+        career_summary_cache.invalidate()
+        catalogue_cache.invalidate(db)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({'message': 'Career updated successfully'}), 200
         
     except Exception as e:
@@ -314,6 +259,10 @@ def delete_career(career_id):
         if result.deleted_count == 0:
             return jsonify({'error': 'Career not found'}), 404
         
+        career_summary_cache.invalidate()
+        catalogue_cache.invalidate(db)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({'message': 'Career deleted successfully'}), 200
         
     except Exception as e:
@@ -359,6 +308,8 @@ def add_college():
         data['updated_at'] = datetime.utcnow()
         
         result = db.colleges.insert_one(data)
+        catalogue_cache.invalidate(db)
+        dashboard_stats.invalidate(db)
         
         return jsonify({
             'message': 'College added successfully',
@@ -388,6 +339,9 @@ def update_college(college_id):
         if result.modified_count == 0:
             return jsonify({'error': 'College not found'}), 404
         
+        catalogue_cache.invalidate(db)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({'message': 'College updated successfully'}), 200
         
     except Exception as e:
@@ -407,6 +361,9 @@ def delete_college(college_id):
         if result.deleted_count == 0:
             return jsonify({'error': 'College not found'}), 404
         
+        catalogue_cache.invalidate(db)
+        dashboard_stats.invalidate(db)
+        
         return jsonify({'message': 'College deleted successfully'}), 200
         
     except Exception as e:
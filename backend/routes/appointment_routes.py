@@ -1,32 +1,12 @@
 from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime, timedelta
 from bson import ObjectId
-import jwt
+from auth_middleware import authenticate
+from dashboard_stats import dashboard_stats
 
 appointment_bp = Blueprint('appointment', __name__)
 
 
-# Helper function to get user from token
-def get_user_from_token(request):
-    """Extract user ID from JWT token"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None, {'error': 'No token provided'}, 401
-    
-    token = auth_header.split(' ')[1]
-    
-    try:
-        payload = jwt.decode(
-            token,
-            current_app.config['SECRET_KEY'],
-            algorithms=['HS256']
-        )
-        return payload['user_id'], payload.get('role'), None, None
-    except:
-        return None, None, {'error': 'Invalid token'}, 401
-
-
 # ==================== COUNSELLOR ROUTES ====================
 
 @appointment_bp.route('/counsellors', methods=['GET'])
@@ -207,9 +187,9 @@ def book_appointment():
         data = request.json
         
         # Get user from token
-        user_id, role, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         # Validate required fields
         required = ['counsellor_id', 'appointment_date', 'appointment_time']
@@ -253,6 +233,7 @@ def book_appointment():
             # MongoDB
             result = db.appointments.insert_one(appointment)
             appointment_id = str(result.inserted_id)
+            dashboard_stats.invalidate(db)
         
         return jsonify({
             'message': 'Appointment booked successfully',
@@ -282,9 +263,9 @@ def get_user_appointments():
         db = current_app.config['DB']
         
         # Get user from token
-        user_id, role, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         status_filter = request.args.get('status')
         
@@ -353,9 +334,9 @@ def get_counsellor_appointments():
         db = current_app.config['DB']
         
         # Get user from token
-        user_id, role, error, status_code = get_user_from_token(request)
+        user_id, role, error, status_code = authenticate()
         if error:
-            return jsonify(error), status_code
+            return jsonify({'error': error}), status_code
         
         # Check if user is a counsellor
         if role != 'counsellor':
@@ -437,9 +418,9 @@ def get_appointment_details(appointment_id):
         db = current_app.config['DB']
         
         # Get user from token
-        user_id, role, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         # Get appointment
         if isinstance(db, dict):
@@ -487,9 +468,9 @@ def cancel_appointment(appointment_id):
         db = current_app.config['DB']
         
         # Get user from token
-        user_id, role, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         # Update appointment status
         if isinstance(db, dict):
@@ -536,9 +517,9 @@ def complete_appointment(appointment_id):
         data = request.json
         
         # Get user from token
-        user_id, role, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         # Update appointment
         if isinstance(db, dict):
@@ -566,6 +547,9 @@ def complete_appointment(appointment_id):
             
             if result.matched_count == 0:
                 return jsonify({'error': 'Appointment not found'}), 404
+            
+            # Completed appointments count towards revenue
+            dashboard_stats.invalidate(db)
         
         return jsonify({'message': 'Appointment marked as completed'}), 200
         
@@ -589,9 +573,9 @@ def rate_appointment(appointment_id):
         data = request.json
         
         # Get user from token
-        user_id, role, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         # Validate rating
         rating = data.get('rating')
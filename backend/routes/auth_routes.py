@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime, timedelta
-import bcrypt
 import jwt
+from auth_middleware import authenticate
+from password_hasher import password_hasher, PasswordPoolBusy
+from user_search import name_tokens
+from dashboard_stats import dashboard_stats
 from bson import ObjectId
 import re
 
@@ -10,11 +13,11 @@ auth_bp = Blueprint('auth', __name__)
 # Helper functions
 def hash_password(password):
     """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    return password_hasher.hash(password)
 
 def verify_password(password, hashed):
     """Verify a password against its hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed)
+    return password_hasher.verify(password, hashed)
 
 def generate_token(user_id, role):
     """Generate JWT token"""
@@ -123,6 +126,7 @@ def register():
         # Create base user document
         user = {
             'name': data['name'],
+            'name_tokens': name_tokens(data['name']),
             'email': data['email'].lower(),
             'username': username.lower() if username else data['email'].split('@')[0].lower(),
             'password': hashed_password,
@@ -195,6 +199,7 @@ def register():
         # Insert into database
         result = db.users.insert_one(user)
         user_id = result.inserted_id
+        dashboard_stats.invalidate(db)
         
         print(f"✅ User inserted into database with ID: {user_id}")
         
@@ -220,6 +225,8 @@ def register():
             }
         }), 201
         
+    except PasswordPoolBusy as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
     except Exception as e:
         print(f"❌ REGISTRATION ERROR: {str(e)}")
         import traceback
@@ -311,8 +318,9 @@ def login():
         if not user:
             return jsonify({'error': 'Invalid credentials'}), 401
         
-        # Verify password
-        if not verify_password(data['password'], user['password']):
+        # Verify password, upgrading hashes made with an old cost factor
+        matched, upgraded_hash = password_hasher.verify_and_upgrade(data['password'], user['password'])
+        if not matched:
             return jsonify({'error': 'Invalid credentials'}), 401
         
         # Check if user is active
@@ -320,9 +328,12 @@ def login():
             return jsonify({'error': 'Account is deactivated'}), 403
         
         # Update last login
+        login_update = {'last_login': datetime.utcnow()}
+        if upgraded_hash:
+            login_update['password'] = upgraded_hash
         db.users.update_one(
             {'_id': user['_id']},
-            {'$set': {'last_login': datetime.utcnow()}}
+            {'$set': login_update}
         )
         
         # Generate token
@@ -342,6 +353,8 @@ def login():
             }
         }), 200
         
+    except PasswordPoolBusy as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
     except Exception as e:
         print(f"❌ Login error: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -355,31 +368,17 @@ def verify_token():
     Headers: Authorization: Bearer <token>
     """
     try:
-        # Get token from header
-        auth_header = request.headers.get('Authorization')
-        
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'No token provided'}), 401
-        
-        token = auth_header.split(' ')[1]
-        
-        # Decode token
-        payload = jwt.decode(
-            token,
-            current_app.config['SECRET_KEY'],
-            algorithms=['HS256']
-        )
+        # Verified once per request by the before_request hook
+        user_id, role, error, status = authenticate()
+        if error:
+            return jsonify({'error': error}), status
         
         return jsonify({
             'valid': True,
-            'user_id': payload['user_id'],
-            'role': payload['role']
+            'user_id': user_id,
+            'role': role
         }), 200
         
-    except jwt.ExpiredSignatureError:
-        return jsonify({'error': 'Token has expired'}), 401
-    except jwt.InvalidTokenError:
-        return jsonify({'error': 'Invalid token'}), 401
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -395,19 +394,11 @@ def change_password():
     try:
         db = current_app.config['DB']
         
-        # Get token from header
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'Unauthorized'}), 401
-        
-        token = auth_header.split(' ')[1]
-        payload = jwt.decode(
-            token,
-            current_app.config['SECRET_KEY'],
-            algorithms=['HS256']
-        )
+        user_id, role, error, status = authenticate()
+        if error:
+            return jsonify({'error': error}), status
         
-        user_id = ObjectId(payload['user_id'])
+        user_id = ObjectId(user_id)
         data = request.json
         
         # Validate required fields
@@ -444,7 +435,7 @@ def change_password():
         
         return jsonify({'message': 'Password changed successfully'}), 200
         
-    except jwt.InvalidTokenError:
-        return jsonify({'error': 'Invalid token'}), 401
+    except PasswordPoolBusy as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -1,24 +1,21 @@
 # chat_routes_ultra_advanced.py - ULTRA REALISTIC AI CHATBOT
 # Production-grade conversational AI with advanced NLP and context awareness
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
-import spacy
+import os
 import re
 import random
+import heapq
 from collections import Counter
+from chat_session_store import MemorySessionStore, MongoSessionStore
+from phrase_matcher import PhraseMatcher
+from career_keyword_index import CareerKeywordIndex
+from nlp_provider import nlp_provider
 
 # Create Blueprint
 chat_bp = Blueprint('chat', __name__)
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-    print("✅ spaCy model loaded successfully")
-except:
-    print("⚠️ spaCy model not found. Run: python -m spacy download en_core_web_sm")
-    nlp = None
-
 # ==================== EXPANDED CAREER DATABASE ====================
 CAREER_DATABASE = {
     "software_engineer": {
@@ -310,8 +307,365 @@ DEFINITELY_OFF_TOPIC = [
     "travel", "vacation", "holiday", "shopping", "fashion", "celebrity"
 ]
 
-# Session storage
-chat_sessions = {}
+# ==================== PHRASE VOCABULARIES ====================
+# Compiled once into CHAT_MATCHER so each message is scanned in a single pass
+
+OFF_TOPIC_INDICATORS = {
+    'weather': ['weather', 'rain', 'sunny', 'temperature'],
+    'food_recipes': ['recipe', 'cooking steps', 'how to cook'],
+    'entertainment': ['movie plot', 'tv show', 'celebrity gossip'],
+    'sports_scores': ['cricket score', 'football score', 'match score'],
+    'random_chat': ['how are you doing', 'whats up with you']
+}
+
+OFF_TOPIC_QUESTIONS = [
+    'what is the weather',
+    'tell me a joke',
+    'sing a song',
+    'what movie should i watch',
+    'recipe for'
+]
+
+OFF_TOPIC_OVERRIDE_WORDS = ['career', 'job', 'work', 'study', 'college', 'salary', 'education']
+
+INTENT_PATTERNS = {
+    'greeting': ['hi', 'hello', 'hey', 'greetings', 'good morning', 'good evening',
+                 'good afternoon', 'namaste', 'hii', 'helo', 'hola'],
+    'farewell': ['bye', 'goodbye', 'see you', 'thanks', 'thank you', "that's all",
+                 'thats all', 'nothing else', 'no more', 'gtg', 'gotta go'],
+    'recommend': ['recommend', 'suggest', 'which career', 'what career', 'best career',
+                  'suitable career', 'right career', 'good career', 'career for me',
+                  'help me choose', 'what should i', 'career options', 'job for me',
+                  'what can i do', 'what job', 'career path', 'advise', 'guidance'],
+    'details': ['tell me about', 'more about', 'details about', 'information about',
+                'what is', 'what are', 'describe', 'explain', 'how to become',
+                'what does', 'day in life', 'pros and cons', 'salary of'],
+    'sharing_interest': ['i like', 'i love', 'i enjoy', 'i am interested', 'interested in',
+                         'passionate about', 'i am good at', 'good at', 'excel at', 'excel in',
+                         'my favorite', 'favorite subject', 'i prefer'],
+    'sharing_dislike': ['i hate', 'i dislike', 'not good at', 'boring', "don't like",
+                        'dont like', 'not interested', 'weak at', 'struggle with', 'bad at'],
+    'concern': ['worried', 'concerned', 'afraid', 'scared', 'unsure', 'confused',
+                'doubt', 'difficult', 'hard', 'challenging', 'nervous', 'anxious',
+                'not sure', 'dont know', "don't know", 'uncertain'],
+    'salary_question': ['salary', 'salaries', 'pay', 'earn', 'income', 'money', 'package'],
+    'education_question': ['course', 'study', 'degree', 'education', 'qualification', 'college', 'university'],
+    'work': ['work', 'working'],
+    'work_life_question': ['environment', 'culture', 'life', 'balance', 'hours', 'schedule'],
+    'future_question': ['future', 'growth', 'opportunity', 'scope', 'prospects', 'demand'],
+    'personal_info': ['my name is', 'i am', "i'm", 'i study', 'i am in']
+}
+
+AFFIRM_PATTERNS = ['yes', 'yeah', 'yep', 'yup', 'sure', 'ok', 'okay', 'definitely',
+                   'of course', 'absolutely', 'correct', 'right', 'exactly']
+
+NEGATE_PATTERNS = ['no', 'nope', 'nah', 'not really', "don't think so", 'dont think so', 'never']
+
+SUBJECT_MAPPING = {
+    'mathematics': ['math', 'mathematics', 'maths', 'algebra', 'calculus', 'geometry', 'trigonometry', 'statistics'],
+    'physics': ['physics', 'mechanics', 'thermodynamics', 'quantum', 'classical physics'],
+    'chemistry': ['chemistry', 'organic chemistry', 'inorganic', 'physical chemistry', 'biochemistry'],
+    'biology': ['biology', 'life science', 'zoology', 'botany', 'biotechnology', 'microbiology', 'genetics'],
+    'computer science': ['computer', 'cs', 'computer science', 'programming', 'coding', 'it', 'information technology'],
+    'english': ['english', 'literature', 'writing', 'grammar', 'communication'],
+    'history': ['history', 'historical', 'ancient history', 'modern history'],
+    'economics': ['economics', 'economy', 'economic', 'macro economics', 'micro economics'],
+    'commerce': ['commerce', 'business studies', 'accountancy', 'accounting'],
+    'arts': ['arts', 'fine arts', 'visual arts', 'creative arts'],
+    'psychology': ['psychology', 'psychological', 'mental health', 'behavior'],
+    'political science': ['political science', 'politics', 'civics'],
+    'geography': ['geography', 'geological', 'earth science']
+}
+
+SKILL_PATTERNS = {
+    'programming': ['programming', 'coding', 'development', 'software development'],
+    'problem-solving': ['problem solving', 'problem-solving', 'solving problems', 'analytical thinking', 'logic'],
+    'communication': ['communication', 'speaking', 'presenting', 'explaining', 'public speaking'],
+    'leadership': ['leadership', 'leading', 'managing people', 'team management', 'leading teams'],
+    'creativity': ['creative', 'creativity', 'imaginative', 'innovative', 'thinking outside box'],
+    'analytical': ['analytical', 'analysis', 'analyzing', 'critical thinking'],
+    'writing': ['writing', 'written communication', 'composition', 'content writing'],
+    'research': ['research', 'researching', 'investigation', 'studying'],
+    'teamwork': ['teamwork', 'team player', 'collaboration', 'working with others'],
+    'organization': ['organization', 'organizing', 'planning', 'time management'],
+    'design': ['design', 'designing', 'visual design', 'graphic design'],
+    'teaching': ['teaching', 'explaining concepts', 'tutoring', 'mentoring']
+}
+
+HOBBIES_MAPPING = {
+    'reading': ['reading', 'read books', 'books'],
+    'writing': ['writing', 'creative writing', 'blogging'],
+    'painting': ['painting', 'drawing', 'sketching'],
+    'music': ['music', 'singing', 'playing instrument', 'guitar', 'piano'],
+    'sports': ['sports', 'football', 'cricket', 'basketball', 'tennis', 'badminton', 'athletics'],
+    'coding': ['coding projects', 'personal coding', 'programming hobby'],
+    'gaming': ['gaming', 'video games', 'pc gaming'],
+    'photography': ['photography', 'taking photos', 'camera'],
+    'cooking': ['cooking', 'baking', 'culinary'],
+    'traveling': ['traveling', 'travel', 'exploring places'],
+    'volunteering': ['volunteering', 'social work', 'community service']
+}
+
+TRAIT_PATTERNS = {
+    'introvert': ['introvert', 'introverted', 'shy', 'quiet', 'reserved', 'prefer alone'],
+    'extrovert': ['extrovert', 'extroverted', 'outgoing', 'social', 'talkative', 'people person'],
+    'creative': ['creative', 'imaginative', 'artistic', 'out of box'],
+    'logical': ['logical', 'rational', 'methodical', 'systematic'],
+    'organized': ['organized', 'systematic', 'structured', 'neat'],
+    'patient': ['patient', 'calm', 'composed', 'tolerant'],
+    'ambitious': ['ambitious', 'driven', 'motivated', 'goal-oriented'],
+    'detail-oriented': ['detail oriented', 'detail-oriented', 'meticulous', 'precise', 'perfectionist'],
+    'independent': ['independent', 'self-reliant', 'autonomous'],
+    'collaborative': ['collaborative', 'team-oriented', 'cooperative']
+}
+
+# Checked in order - the first level mentioned wins
+EDUCATION_LEVELS = {
+    'Class 10': ['10th', 'tenth', 'class 10'],
+    'Class 11': ['11th', 'eleventh', 'class 11'],
+    'Class 12': ['12th', 'twelfth', 'class 12'],
+    'Undergraduate': ['graduate', 'graduation', 'undergraduate', 'btech', 'bsc', 'ba', 'bcom'],
+    'Postgraduate': ['postgraduate', 'masters', 'mtech', 'msc', 'ma', 'mba']
+}
+
+WORK_PREFERENCE_PATTERNS = {
+    'remote work': ['remote', 'work from home', 'wfh'],
+    'office work': ['office', 'on-site', 'workplace'],
+    'flexible hours': ['flexible', 'flexibility'],
+    'travel': ['travel', 'traveling for work']
+}
+
+CAREER_GOAL_TRIGGERS = ['want to be', 'become', 'aspire', 'dream', 'goal is']
+
+CONCERN_KEYWORDS = ['worried about', 'concerned about', 'afraid of', 'scared of',
+                    'difficulty with', 'struggle with', 'challenging']
+
+POSITIVE_WORDS = ['love', 'enjoy', 'like', 'passion', 'passionate', 'interested', 'excited',
+                  'great', 'good', 'excellent', 'amazing', 'wonderful', 'fantastic', 'happy',
+                  'fun', 'fascinating', 'awesome', 'brilliant', 'superb']
+NEGATIVE_WORDS = ['hate', 'dislike', 'boring', 'difficult', 'hard', 'not', 'never', 'terrible',
+                  'awful', 'bad', 'worried', 'concerned', 'afraid', 'scared', 'poor', 'worst',
+                  'horrible', 'disappointing']
+STRONG_SENTIMENT_WORDS = ['love', 'passion', 'passionate', 'amazing', 'hate', 'terrible', 'awful', 'worst']
+
+# Entries this long are stems that also match inflected forms ('recommend' ->
+# 'recommendations', 'love' -> 'loved'); shorter ones ('hi', 'it') must be whole words
+MIN_STEM_LENGTH = 4
+
+
+def build_chat_matcher():
+    """Compile every chat vocabulary into one phrase matcher"""
+    matcher = PhraseMatcher()
+    
+    def add_all(phrases, category, value=None):
+        for phrase in phrases:
+            matcher.add(
+                phrase.lower(),
+                (category, value if value is not None else phrase),
+                prefix=len(phrase) >= MIN_STEM_LENGTH
+            )
+    
+    for group, phrases in OFF_TOPIC_INDICATORS.items():
+        add_all(phrases, 'off_topic', group)
+    add_all(OFF_TOPIC_QUESTIONS, 'off_topic_question')
+    add_all(OFF_TOPIC_OVERRIDE_WORDS, 'career_word')
+    
+    for intent, phrases in INTENT_PATTERNS.items():
+        add_all(phrases, intent)
+    
+    for category, mapping in [
+        ('subject', SUBJECT_MAPPING),
+        ('skill', SKILL_PATTERNS),
+        ('hobby', HOBBIES_MAPPING),
+        ('trait', TRAIT_PATTERNS),
+        ('education_level', EDUCATION_LEVELS),
+        ('work_preference', WORK_PREFERENCE_PATTERNS)
+    ]:
+        for value, phrases in mapping.items():
+            add_all(phrases, category, value)
+    
+    add_all(CAREER_GOAL_TRIGGERS, 'career_goal_trigger')
+    add_all(CONCERN_KEYWORDS, 'concern_phrase')
+    add_all(POSITIVE_WORDS, 'positive')
+    add_all(NEGATIVE_WORDS, 'negative')
+    
+    for career_id, career_data in CAREER_DATABASE.items():
+        add_all(
+            [career_data['title'], career_id.replace('_', ' ')] + career_data.get('aliases', []),
+            'career',
+            career_id
+        )
+    
+    return matcher.build()
+
+
+CHAT_MATCHER = build_chat_matcher()
+CAREER_INDEX = CareerKeywordIndex(CAREER_DATABASE)
+
+class CareerScoreAccumulator:
+    """
+    Running career match scores for one chat profile
+    
+    Profile terms are scored once, when they are first added, by looking up
+    their candidate careers in CAREER_INDEX. Recommendations then read the
+    top careers from the accumulated hits instead of rescoring the profile.
+    """
+    
+    SCORED_FIELDS = ('interests', 'skills', 'personality', 'subjects', 'hobbies', 'career_goals', 'dislikes')
+    
+    def __init__(self, matches=None):
+        self.matches = matches or {}
+    
+    def _hits(self, career_id):
+        if career_id not in self.matches:
+            self.matches[career_id] = {
+                'score': 0,
+                'interests': 0,
+                'skills': [],
+                'traits': [],
+                'subjects': [],
+                'subject_points': 0,
+                'hobbies': 0,
+                'goals': 0,
+                'dislikes': []
+            }
+        return self.matches[career_id]
+    
+    def add_terms(self, field, terms):
+        """Score terms newly added to a profile field"""
+        # A term counts at most once per career, like the first-match
+        # break of a linear keyword scan
+        for term in terms:
+            term_lower = term.lower()
+            
+            # === INTEREST MATCHING (weight: 5, max contribution: 25) ===
+            if field == 'interests':
+                for career_id in CAREER_INDEX.keywords.lookup(term_lower):
+                    hits = self._hits(career_id)
+                    hits['score'] += 5
+                    hits['interests'] += 1
+            
+            # === SKILLS MATCHING (weight: 4, max contribution: 20) ===
+            elif field == 'skills':
+                for career_id in CAREER_INDEX.skills.lookup(term_lower):
+                    hits = self._hits(career_id)
+                    hits['score'] += 4
+                    hits['skills'].append(term)
+            
+            # === PERSONALITY MATCHING (weight: 3, max contribution: 15) ===
+            elif field == 'personality':
+                for career_id in CAREER_INDEX.personality.lookup(term_lower):
+                    hits = self._hits(career_id)
+                    hits['score'] += 3
+                    hits['traits'].append(term)
+            
+            # === SUBJECT MATCHING (weight: 3, max contribution: 15) ===
+            elif field == 'subjects':
+                # Check against related subjects
+                for career_id in CAREER_INDEX.subjects.get(term_lower, []):
+                    hits = self._hits(career_id)
+                    hits['score'] += 3
+                    hits['subject_points'] += 3
+                    hits['subjects'].append(term)
+                # Also check in keywords
+                for career_id in CAREER_INDEX.keywords.lookup(term_lower):
+                    hits = self._hits(career_id)
+                    hits['score'] += 2
+                    hits['subject_points'] += 2
+                    hits['subjects'].append(term)
+            
+            # === HOBBY MATCHING (weight: 2) ===
+            elif field == 'hobbies':
+                for career_id in CAREER_INDEX.keywords.lookup(term_lower):
+                    hits = self._hits(career_id)
+                    hits['score'] += 2
+                    hits['hobbies'] += 1
+            
+            # === CAREER GOAL MATCHING (bonus) ===
+            elif field == 'career_goals':
+                for career_id in CAREER_INDEX.titles.get(term_lower, []):
+                    hits = self._hits(career_id)
+                    hits['score'] += 10
+                    hits['goals'] += 1
+            
+            # === DISLIKES PENALTY (weight: -4) ===
+            elif field == 'dislikes':
+                for career_id in CAREER_INDEX.keywords.lookup(term_lower):
+                    hits = self._hits(career_id)
+                    hits['score'] -= 4
+                    hits['dislikes'].append(term)
+    
+    def add_profile(self, user_profile):
+        """Score every term of a profile"""
+        for field in self.SCORED_FIELDS:
+            self.add_terms(field, user_profile.get(field, []))
+    
+    def score(self, career_id):
+        hits = self.matches.get(career_id)
+        return max(hits['score'], 0) if hits else 0
+    
+    def top(self, count):
+        """Best (career_id, score) pairs, ties in CAREER_DATABASE order"""
+        positive = [
+            (position, career_id, self.score(career_id))
+            for position, career_id in enumerate(CAREER_INDEX.career_ids)
+            if self.score(career_id) > 0
+        ]
+        best = [
+            (career_id, score)
+            for _, career_id, score in heapq.nsmallest(count, positive, key=lambda x: (-x[2], x[0]))
+        ]
+        
+        # Pad with unmatched careers, as a full ranking would
+        if len(best) < count:
+            ranked = {career_id for career_id, _ in best}
+            for career_id in CAREER_INDEX.career_ids:
+                if len(best) >= count:
+                    break
+                if career_id not in ranked:
+                    best.append((career_id, 0))
+        
+        return best
+    
+    def explanation(self, career_id):
+        hits = self.matches.get(career_id)
+        if hits is None:
+            return ["Limited information to match"]
+        
+        reasons = []
+        if hits['interests'] > 0:
+            reasons.append(f"✓ {hits['interests']} of your interests strongly align with this field")
+        if hits['skills']:
+            reasons.append(f"✓ Your skills in {', '.join(hits['skills'][:2])} are valuable here")
+        if hits['traits']:
+            reasons.append(f"✓ Your {hits['traits'][0]} personality fits well")
+        if hits['subjects']:
+            reasons.append(f"✓ Your background in {hits['subjects'][0]} is relevant")
+        if hits['hobbies'] > 0:
+            reasons.append(f"✓ Your hobbies align with the work")
+        for _ in range(hits['goals']):
+            reasons.append(f"✓✓ This matches your stated career goal!")
+        if hits['dislikes']:
+            reasons.append(f"⚠️ Note: Involves {hits['dislikes'][0]}, which you mentioned disliking")
+        
+        return reasons if reasons else ["Limited information to match"]
+    
+    def details(self, career_id):
+        hits = self.matches.get(career_id, {})
+        return {
+            'interest_match': hits.get('interests', 0) * 5,
+            'skill_match': len(hits.get('skills', [])) * 4,
+            'personality_match': len(hits.get('traits', [])) * 3,
+            'subject_match': hits.get('subject_points', 0),
+            'total_possible': 50
+        }
+    
+    def results(self):
+        """Full ranking, explanations and match details for every career"""
+        ranked = self.top(len(CAREER_INDEX.career_ids))
+        explanations = {career_id: self.explanation(career_id) for career_id in CAREER_INDEX.career_ids}
+        match_details = {career_id: self.details(career_id) for career_id in CAREER_INDEX.career_ids}
+        return ranked, explanations, match_details
 
 class UltraAdvancedChatSession:
     def __init__(self, session_id, user_id=None):
@@ -346,6 +700,7 @@ class UltraAdvancedChatSession:
         self.conversation_stage = "introduction"
         self.messages_count = 0
         self.has_enough_info = False
+        self.career_scores = CareerScoreAccumulator()
         self.created_at = datetime.utcnow()
         self.last_activity = datetime.utcnow()
         
@@ -359,77 +714,200 @@ class UltraAdvancedChatSession:
             self.context["conversation_depth"] += 1
             self.messages_count += 1
         self.last_activity = datetime.utcnow()
+    
+    def to_document(self):
+        """Serialize to a chat_history document (see ChatHistoryModel)"""
+        return {
+            "session_id": self.session_id,
+            "user_id": self.user_id,
+            "messages": [
+                {
+                    "type": message["role"],
+                    "text": message["content"],
+                    "timestamp": datetime.fromisoformat(message["timestamp"])
+                }
+                for message in self.conversation_history
+            ],
+            "started_at": self.created_at,
+            "last_message_at": self.last_activity,
+            "state": {
+                # Empty profile lists are rebuilt by __init__, no need to store them
+                "profile": {key: value for key, value in self.user_profile.items() if value},
+                "context": self.context,
+                "user_name": self.user_name,
+                "stage": self.conversation_stage,
+                "messages_count": self.messages_count,
+                "has_enough_info": self.has_enough_info,
+                "career_scores": self.career_scores.matches
+            }
+        }
+    
+    @classmethod
+    def from_document(cls, document):
+        """Rebuild a session from a chat_history document"""
+        session = cls(document["session_id"], document.get("user_id"))
+        state = document.get("state", {})
+        
+        session.conversation_history = [
+            {
+                "role": message["type"],
+                "content": message["text"],
+                "timestamp": message["timestamp"].isoformat()
+            }
+            for message in document.get("messages", [])
+        ]
+        session.user_profile.update(state.get("profile", {}))
+        session.context.update(state.get("context", {}))
+        session.user_name = state.get("user_name")
+        session.conversation_stage = state.get("stage", "introduction")
+        session.messages_count = state.get("messages_count", 0)
+        session.has_enough_info = state.get("has_enough_info", False)
+        if "career_scores" in state:
+            session.career_scores = CareerScoreAccumulator(state["career_scores"])
+        else:
+            session.career_scores.add_profile(session.user_profile)
+        session.created_at = document.get("started_at", session.created_at)
+        session.last_activity = document.get("last_message_at", session.last_activity)
+        return session
+
+
+def get_chat_history_collection():
+    """chat_history collection, or None when the database is unavailable"""
+    db = current_app.config.get('DB')
+    if db is None:
+        from app import db
+    return db.chat_history if db is not None else None
+
+
+def create_session_store():
+    """Build the session backend selected by CHAT_SESSION_BACKEND"""
+    ttl_minutes = int(os.getenv('CHAT_SESSION_TTL_MINUTES', 60))
+    
+    if os.getenv('CHAT_SESSION_BACKEND', 'memory') == 'mongodb':
+        print("✅ Chat sessions stored in MongoDB (chat_history)")
+        return MongoSessionStore(
+            get_chat_history_collection,
+            UltraAdvancedChatSession.from_document,
+            cache_size=int(os.getenv('CHAT_SESSION_CACHE_SIZE', 200)),
+            ttl_minutes=ttl_minutes
+        )
+    
+    # Bounded so abandoned conversations are reclaimed
+    return MemorySessionStore(
+        max_sessions=int(os.getenv('CHAT_SESSION_MAX', 1000)),
+        ttl_minutes=ttl_minutes,
+        max_bytes=int(os.getenv('CHAT_SESSION_MAX_BYTES', 64 * 1024 * 1024))
+    )
+
+
+# Session storage
+chat_sessions = create_session_store()
 
 # ==================== ADVANCED NLP FUNCTIONS ====================
 
+class MessageAnalysis:
+    """
+    Single analysis of one chat message shared by every extractor.
+    
+    The spaCy pipeline runs at most once per message, and only when a
+    consumer actually needs tokens, noun chunks or entities.
+    """
+    
+    def __init__(self, text):
+        self.text = text
+        self.lower = text.lower()
+        self.stripped = self.lower.strip()
+        self._doc = None
+        self._phrase_hits = None
+    
+    @property
+    def doc(self):
+        if self._doc is None:
+            nlp = nlp_provider.get()
+            if nlp is not None:
+                self._doc = nlp(self.text)
+        return self._doc
+    
+    @property
+    def tokens(self):
+        return list(self.doc) if self.doc is not None else []
+    
+    @property
+    def lemmas(self):
+        return [(token.lemma_ or token.text).lower() for token in self.tokens]
+    
+    @property
+    def noun_chunks(self):
+        # Noun chunks need the dependency parse, absent in tokenizer-only mode
+        if self.doc is None or not self.doc.has_annotation("DEP"):
+            return []
+        return list(self.doc.noun_chunks)
+    
+    @property
+    def entities(self):
+        return list(self.doc.ents) if self.doc is not None else []
+    
+    @property
+    def phrase_hits(self):
+        """Vocabulary hits by category as (value, start, end) tuples"""
+        if self._phrase_hits is None:
+            self._phrase_hits = {}
+            for (category, value), _, start, end in CHAT_MATCHER.find(self.stripped):
+                self._phrase_hits.setdefault(category, []).append((value, start, end))
+        return self._phrase_hits
+    
+    def has(self, category):
+        return category in self.phrase_hits
+    
+    def values(self, category, order=None):
+        """Distinct values hit in a category, in the given order or text order"""
+        found = dict.fromkeys(value for value, _, _ in self.phrase_hits.get(category, []))
+        if order is not None:
+            return [value for value in order if value in found]
+        return list(found)
+
 # REPLACE THE is_career_related FUNCTION
 # Find it around line 400-450 in your chat_routes file
 
-def is_career_related(text):
+def is_career_related(analysis):
     """Determine if message is career-related - BE LENIENT"""
-    text_lower = text.lower().strip()
+    text_lower = analysis.stripped
     
     # Allow very short messages (they're usually answers like "yes", "coding", "math")
     if len(text_lower) <= 15:
         return True
     
-    # Explicitly off-topic keywords (must have multiple to trigger)
-    explicit_off_topic = {
-        'weather': ['weather', 'rain', 'sunny', 'temperature'],
-        'food_recipes': ['recipe', 'cooking steps', 'how to cook'],
-        'entertainment': ['movie plot', 'tv show', 'celebrity gossip'],
-        'sports_scores': ['cricket score', 'football score', 'match score'],
-        'random_chat': ['how are you doing', 'whats up with you']
-    }
-    
-    off_topic_count = 0
-    for category, phrases in explicit_off_topic.items():
-        if any(phrase in text_lower for phrase in phrases):
-            off_topic_count += 1
-    
     # Only mark as off-topic if multiple off-topic indicators
-    if off_topic_count >= 2:
+    if len(analysis.values('off_topic')) >= 2:
         return False
     
     # Check for obviously off-topic questions
-    off_topic_questions = [
-        'what is the weather',
-        'tell me a joke',
-        'sing a song',
-        'what movie should i watch',
-        'recipe for'
-    ]
-    
-    if any(phrase in text_lower for phrase in off_topic_questions):
+    if analysis.has('off_topic_question'):
         # But allow if career-related words are also present
-        career_words = ['career', 'job', 'work', 'study', 'college', 'salary', 'education']
-        if any(word in text_lower for word in career_words):
-            return True
-        return False
+        return analysis.has('career_word')
     
     # Default: ALLOW IT (be lenient, let the intent detector handle it)
     return True
 
-def extract_keywords_ultra(text):
+def extract_keywords_ultra(analysis):
     """Ultra-advanced keyword extraction"""
-    if not nlp:
-        return text.lower().split()
+    if analysis.doc is None:
+        return analysis.lower.split()
     
-    doc = nlp(text.lower())
     keywords = []
     
     # Extract meaningful tokens
-    for token in doc:
+    for token in analysis.tokens:
         if token.pos_ in ['NOUN', 'VERB', 'ADJ', 'PROPN'] and not token.is_stop and len(token.text) > 2:
-            keywords.append(token.lemma_)
+            keywords.append(token.lemma_.lower())
     
     # Extract noun phrases (multi-word expressions)
-    for chunk in doc.noun_chunks:
+    for chunk in analysis.noun_chunks:
         if len(chunk.text.split()) > 1 and len(chunk.text) > 4:
             keywords.append(chunk.text.lower())
     
     # Extract named entities
-    for ent in doc.ents:
+    for ent in analysis.entities:
         if ent.label_ in ['ORG', 'PRODUCT', 'EVENT', 'WORK_OF_ART', 'PERSON', 'GPE']:
             keywords.append(ent.text.lower())
     
@@ -441,86 +919,61 @@ def extract_keywords_ultra(text):
             seen.add(kw)
             unique_keywords.append(kw)
     
-    return unique_keywords if unique_keywords else text.lower().split()
+    return unique_keywords if unique_keywords else analysis.lower.split()
 
-def detect_intent_ultra(text, session):
+def detect_intent_ultra(analysis, session):
     """Ultra-advanced intent detection with context awareness"""
-    text_lower = text.lower().strip()
+    text = analysis.text
+    text_lower = analysis.stripped
     
     # First check if it's career-related
-    if not is_career_related(text):
+    if not is_career_related(analysis):
         return 'off_topic'
     
-    # Greeting
-    greeting_patterns = ['hi', 'hello', 'hey', 'greetings', 'good morning', 'good evening', 
-                         'good afternoon', 'namaste', 'hii', 'helo', 'hola']
-    if any(text_lower.startswith(word) for word in greeting_patterns) or text_lower in greeting_patterns:
+    # Greeting - must open the message
+    if any(start == 0 for _, start, _ in analysis.phrase_hits.get('greeting', [])):
         return 'greeting'
     
     # Farewell
-    farewell_patterns = ['bye', 'goodbye', 'see you', 'thanks', 'thank you', "that's all", 
-                         'thats all', 'nothing else', 'no more', 'gtg', 'gotta go']
-    if any(pattern in text_lower for pattern in farewell_patterns) and len(text_lower) < 50:
+    if analysis.has('farewell') and len(text_lower) < 50:
         return 'farewell'
     
     # Asking for recommendations (high priority)
-    recommend_patterns = ['recommend', 'suggest', 'which career', 'what career', 'best career', 
-                          'suitable career', 'right career', 'good career', 'career for me',
-                          'help me choose', 'what should i', 'career options', 'job for me',
-                          'what can i do', 'what job', 'career path', 'advise', 'guidance']
-    if any(pattern in text_lower for pattern in recommend_patterns):
+    if analysis.has('recommend'):
         return 'recommend'
     
-    # Asking for specific career details
-    detail_patterns = ['tell me about', 'more about', 'details about', 'information about',
-                       'what is', 'what are', 'describe', 'explain', 'how to become',
-                       'what does', 'day in life', 'pros and cons', 'salary of']
-    if any(pattern in text_lower for pattern in detail_patterns):
-        # Check if specific career mentioned
-        for career_id, career_data in CAREER_DATABASE.items():
-            if career_data['title'].lower() in text_lower or career_id.replace('_', ' ') in text_lower:
-                return 'details'
-            for alias in career_data.get('aliases', []):
-                if alias in text_lower:
-                    return 'details'
-        return 'details'  # General request for details
+    # Asking for specific career details (or details in general)
+    if analysis.has('details'):
+        return 'details'
     
     # Sharing interests/likes (very common)
-    interest_patterns = ['i like', 'i love', 'i enjoy', 'i am interested', 'interested in',
-                         'passionate about', 'i am good at', 'good at', 'excel at', 'excel in',
-                         'my favorite', 'favorite subject', 'i prefer']
-    if any(pattern in text_lower for pattern in interest_patterns):
+    if analysis.has('sharing_interest'):
         return 'sharing_interest'
     
     # Sharing dislikes
-    dislike_patterns = ['i hate', 'i dislike', 'not good at', 'boring', "don't like",
-                        'dont like', 'not interested', 'weak at', 'struggle with', 'bad at']
-    if any(pattern in text_lower for pattern in dislike_patterns):
+    if analysis.has('sharing_dislike'):
         return 'sharing_dislike'
     
     # Expressing concerns/doubts
-    concern_patterns = ['worried', 'concerned', 'afraid', 'scared', 'unsure', 'confused',
-                        'doubt', 'difficult', 'hard', 'challenging', 'nervous', 'anxious',
-                        'not sure', 'dont know', "don't know", 'uncertain']
-    if any(pattern in text_lower for pattern in concern_patterns):
+    if analysis.has('concern'):
         return 'concern'
     
     # Specific aspect questions
-    if any(word in text_lower for word in ['salary', 'pay', 'earn', 'income', 'money', 'package']):
+    if analysis.has('salary_question'):
         return 'salary_question'
     
-    if any(word in text_lower for word in ['course', 'study', 'degree', 'education', 'qualification', 'college', 'university']):
+    if analysis.has('education_question'):
         if '?' in text or any(w in text_lower for w in ['what', 'which', 'how']):
             return 'education_question'
     
-    if 'work' in text_lower and any(word in text_lower for word in ['environment', 'culture', 'life', 'balance', 'hours', 'schedule']):
+    if analysis.has('work') and analysis.has('work_life_question'):
         return 'work_life_question'
     
-    if any(word in text_lower for word in ['future', 'growth', 'opportunity', 'scope', 'prospects', 'demand']):
+    if analysis.has('future_question'):
         return 'future_question'
     
     # Personal information sharing (name, age, class, etc.)
-    if any(pattern in text_lower for pattern in ['my name is', 'i am', "i'm", 'i study', 'i am in']):
+    if analysis.has('personal_info'):
         return 'personal_info'
     
     # General questions
@@ -528,14 +981,11 @@ def detect_intent_ultra(text, session):
         return 'question'
     
     # Affirmation
-    affirm_patterns = ['yes', 'yeah', 'yep', 'yup', 'sure', 'ok', 'okay', 'definitely', 
-                       'of course', 'absolutely', 'correct', 'right', 'exactly']
-    if text_lower in affirm_patterns:
+    if text_lower in AFFIRM_PATTERNS:
         return 'affirmation'
     
     # Negation
-    negate_patterns = ['no', 'nope', 'nah', 'not really', "don't think so", 'dont think so', 'never']
-    if text_lower in negate_patterns:
+    if text_lower in NEGATE_PATTERNS:
         return 'negation'
     
     # Gibberish or very short messages
@@ -544,154 +994,44 @@ def detect_intent_ultra(text, session):
     
     return 'general'
 
-def extract_entities_ultra(text):
+def extract_entities_ultra(analysis):
     """Ultra-advanced entity extraction with comprehensive categorization"""
     entities = {
-        'subjects': [],
-        'skills': [],
-        'hobbies': [],
-        'personality': [],
+        'subjects': analysis.values('subject', SUBJECT_MAPPING),
+        'skills': analysis.values('skill', SKILL_PATTERNS),
+        'hobbies': analysis.values('hobby', HOBBIES_MAPPING),
+        'personality': analysis.values('trait', TRAIT_PATTERNS),
         'career_goals': [],
         'concerns': [],
         'educational_level': None,
-        'work_preferences': []
-    }
-    
-    text_lower = text.lower()
-    
-    # === SUBJECTS ===
-    subject_mapping = {
-        'mathematics': ['math', 'mathematics', 'maths', 'algebra', 'calculus', 'geometry', 'trigonometry', 'statistics'],
-        'physics': ['physics', 'mechanics', 'thermodynamics', 'quantum', 'classical physics'],
-        'chemistry': ['chemistry', 'organic chemistry', 'inorganic', 'physical chemistry', 'biochemistry'],
-        'biology': ['biology', 'life science', 'zoology', 'botany', 'biotechnology', 'microbiology', 'genetics'],
-        'computer science': ['computer', 'cs', 'computer science', 'programming', 'coding', 'it', 'information technology'],
-        'english': ['english', 'literature', 'writing', 'grammar', 'communication'],
-        'history': ['history', 'historical', 'ancient history', 'modern history'],
-        'economics': ['economics', 'economy', 'economic', 'macro economics', 'micro economics'],
-        'commerce': ['commerce', 'business studies', 'accountancy', 'accounting'],
-        'arts': ['arts', 'fine arts', 'visual arts', 'creative arts'],
-        'psychology': ['psychology', 'psychological', 'mental health', 'behavior'],
-        'political science': ['political science', 'politics', 'civics'],
-        'geography': ['geography', 'geological', 'earth science']
+        'work_preferences': analysis.values('work_preference', WORK_PREFERENCE_PATTERNS)
     }
     
-    for subject, variations in subject_mapping.items():
-        if any(var in text_lower for var in variations):
-            entities['subjects'].append(subject)
-    
-    # === SKILLS ===
-    skill_patterns = {
-        'programming': ['programming', 'coding', 'development', 'software development'],
-        'problem-solving': ['problem solving', 'problem-solving', 'solving problems', 'analytical thinking', 'logic'],
-        'communication': ['communication', 'speaking', 'presenting', 'explaining', 'public speaking'],
-        'leadership': ['leadership', 'leading', 'managing people', 'team management', 'leading teams'],
-        'creativity': ['creative', 'creativity', 'imaginative', 'innovative', 'thinking outside box'],
-        'analytical': ['analytical', 'analysis', 'analyzing', 'critical thinking'],
-        'writing': ['writing', 'written communication', 'composition', 'content writing'],
-        'research': ['research', 'researching', 'investigation', 'studying'],
-        'teamwork': ['teamwork', 'team player', 'collaboration', 'working with others'],
-        'organization': ['organization', 'organizing', 'planning', 'time management'],
-        'design': ['design', 'designing', 'visual design', 'graphic design'],
-        'teaching': ['teaching', 'explaining concepts', 'tutoring', 'mentoring']
-    }
-    
-    for skill, patterns in skill_patterns.items():
-        if any(pat in text_lower for pat in patterns):
-            entities['skills'].append(skill)
-    
-    # === HOBBIES ===
-    hobbies_mapping = {
-        'reading': ['reading', 'read books', 'books'],
-        'writing': ['writing', 'creative writing', 'blogging'],
-        'painting': ['painting', 'drawing', 'sketching'],
-        'music': ['music', 'singing', 'playing instrument', 'guitar', 'piano'],
-        'sports': ['sports', 'football', 'cricket', 'basketball', 'tennis', 'badminton', 'athletics'],
-        'coding': ['coding projects', 'personal coding', 'programming hobby'],
-        'gaming': ['gaming', 'video games', 'pc gaming'],
-        'photography': ['photography', 'taking photos', 'camera'],
-        'cooking': ['cooking', 'baking', 'culinary'],
-        'traveling': ['traveling', 'travel', 'exploring places'],
-        'volunteering': ['volunteering', 'social work', 'community service']
-    }
-    
-    for hobby, patterns in hobbies_mapping.items():
-        if any(pat in text_lower for pat in patterns):
-            entities['hobbies'].append(hobby)
-    
-    # === PERSONALITY ===
-    trait_patterns = {
-        'introvert': ['introvert', 'introverted', 'shy', 'quiet', 'reserved', 'prefer alone'],
-        'extrovert': ['extrovert', 'extroverted', 'outgoing', 'social', 'talkative', 'people person'],
-        'creative': ['creative', 'imaginative', 'artistic', 'out of box'],
-        'logical': ['logical', 'rational', 'methodical', 'systematic'],
-        'organized': ['organized', 'systematic', 'structured', 'neat'],
-        'patient': ['patient', 'calm', 'composed', 'tolerant'],
-        'ambitious': ['ambitious', 'driven', 'motivated', 'goal-oriented'],
-        'detail-oriented': ['detail oriented', 'detail-oriented', 'meticulous', 'precise', 'perfectionist'],
-        'independent': ['independent', 'self-reliant', 'autonomous'],
-        'collaborative': ['collaborative', 'team-oriented', 'cooperative']
-    }
-    
-    for trait, patterns in trait_patterns.items():
-        if any(pat in text_lower for pat in patterns):
-            entities['personality'].append(trait)
-    
     # === EDUCATIONAL LEVEL ===
-    if any(word in text_lower for word in ['10th', 'tenth', 'class 10']):
-        entities['educational_level'] = 'Class 10'
-    elif any(word in text_lower for word in ['11th', 'eleventh', 'class 11']):
-        entities['educational_level'] = 'Class 11'
-    elif any(word in text_lower for word in ['12th', 'twelfth', 'class 12']):
-        entities['educational_level'] = 'Class 12'
-    elif any(word in text_lower for word in ['graduate', 'graduation', 'undergraduate', 'btech', 'bsc', 'ba', 'bcom']):
-        entities['educational_level'] = 'Undergraduate'
-    elif any(word in text_lower for word in ['postgraduate', 'masters', 'mtech', 'msc', 'ma', 'mba']):
-        entities['educational_level'] = 'Postgraduate'
-    
-    # === WORK PREFERENCES ===
-    if any(word in text_lower for word in ['remote', 'work from home', 'wfh']):
-        entities['work_preferences'].append('remote work')
-    if any(word in text_lower for word in ['office', 'on-site', 'workplace']):
-        entities['work_preferences'].append('office work')
-    if any(word in text_lower for word in ['flexible', 'flexibility']):
-        entities['work_preferences'].append('flexible hours')
-    if any(word in text_lower for word in ['travel', 'traveling for work']):
-        entities['work_preferences'].append('travel')
+    levels = analysis.values('education_level', EDUCATION_LEVELS)
+    if levels:
+        entities['educational_level'] = levels[0]
     
     # === CAREER GOALS ===
-    if any(word in text_lower for word in ['want to be', 'become', 'aspire', 'dream', 'goal is']):
-        for career_id, career_data in CAREER_DATABASE.items():
-            if career_data['title'].lower() in text_lower:
-                entities['career_goals'].append(career_data['title'])
-            for alias in career_data.get('aliases', []):
-                if alias in text_lower:
-                    entities['career_goals'].append(career_data['title'])
+    if analysis.has('career_goal_trigger'):
+        entities['career_goals'] = [
+            CAREER_DATABASE[career_id]['title']
+            for career_id in analysis.values('career', CAREER_DATABASE)
+        ]
     
     # === CONCERNS ===
-    concern_keywords = ['worried about', 'concerned about', 'afraid of', 'scared of', 
-                        'difficulty with', 'struggle with', 'challenging']
-    if any(concern in text_lower for concern in concern_keywords):
-        entities['concerns'].append(text)
+    if analysis.has('concern_phrase'):
+        entities['concerns'].append(analysis.text)
     
     return entities
 
-def analyze_sentiment_advanced(text):
+def analyze_sentiment_advanced(analysis):
     """Advanced sentiment analysis with intensity"""
-    positive_words = ['love', 'enjoy', 'like', 'passion', 'passionate', 'interested', 'excited', 
-                      'great', 'good', 'excellent', 'amazing', 'wonderful', 'fantastic', 'happy', 
-                      'fun', 'fascinating', 'awesome', 'brilliant', 'superb']
-    negative_words = ['hate', 'dislike', 'boring', 'difficult', 'hard', 'not', 'never', 'terrible',
-                      'awful', 'bad', 'worried', 'concerned', 'afraid', 'scared', 'poor', 'worst',
-                      'horrible', 'disappointing']
-    
-    text_lower = text.lower()
-    
     # Count with weights for intensity
-    pos_count = sum(2 if word in ['love', 'passion', 'passionate', 'amazing'] else 1 
-                    for word in positive_words if word in text_lower)
-    neg_count = sum(2 if word in ['hate', 'terrible', 'awful', 'worst'] else 1 
-                    for word in negative_words if word in text_lower)
+    pos_count = sum(2 if word in STRONG_SENTIMENT_WORDS else 1
+                    for word in analysis.values('positive'))
+    neg_count = sum(2 if word in STRONG_SENTIMENT_WORDS else 1
+                    for word in analysis.values('negative'))
     
     # Calculate intensity
     if pos_count > neg_count + 3:
@@ -706,133 +1046,11 @@ def analyze_sentiment_advanced(text):
 
 def calculate_career_match_ultra(user_profile):
     """Ultra-advanced career matching with detailed scoring and explanations"""
-    scores = {}
-    explanations = {}
-    match_details = {}
-    
-    for career_id, career_data in CAREER_DATABASE.items():
-        score = 0
-        reasons = []
-        details = {
-            'interest_match': 0,
-            'skill_match': 0,
-            'personality_match': 0,
-            'subject_match': 0,
-            'total_possible': 50
-        }
-        
-        # === INTEREST MATCHING (weight: 5, max contribution: 25) ===
-        interest_matches = 0
-        for interest in user_profile['interests']:
-            interest_lower = interest.lower()
-            for keyword in career_data['keywords']:
-                if interest_lower in keyword or keyword in interest_lower:
-                    score += 5
-                    interest_matches += 1
-                    details['interest_match'] += 5
-                    break
-        
-        if interest_matches > 0:
-            reasons.append(f"✓ {interest_matches} of your interests strongly align with this field")
-        
-        # === SKILLS MATCHING (weight: 4, max contribution: 20) ===
-        skill_matches = 0
-        matched_skills = []
-        for skill in user_profile['skills']:
-            skill_lower = skill.lower()
-            for req_skill in career_data['skills']:
-                if skill_lower in req_skill or req_skill in skill_lower:
-                    score += 4
-                    skill_matches += 1
-                    matched_skills.append(skill)
-                    details['skill_match'] += 4
-                    break
-        
-        if skill_matches > 0:
-            reasons.append(f"✓ Your skills in {', '.join(matched_skills[:2])} are valuable here")
-        
-        # === PERSONALITY MATCHING (weight: 3, max contribution: 15) ===
-        personality_matches = 0
-        matched_traits = []
-        for trait in user_profile['personality']:
-            trait_lower = trait.lower()
-            for req_trait in career_data['personality']:
-                if trait_lower in req_trait or req_trait in trait_lower:
-                    score += 3
-                    personality_matches += 1
-                    matched_traits.append(trait)
-                    details['personality_match'] += 3
-                    break
-        
-        if personality_matches > 0:
-            reasons.append(f"✓ Your {matched_traits[0]} personality fits well")
-        
-        # === SUBJECT MATCHING (weight: 3, max contribution: 15) ===
-        subject_matches = 0
-        matched_subjects = []
-        for subject in user_profile['subjects']:
-            subject_lower = subject.lower()
-            # Check against related subjects
-            if subject_lower in [s.lower() for s in career_data.get('related_subjects', [])]:
-                score += 3
-                subject_matches += 1
-                matched_subjects.append(subject)
-                details['subject_match'] += 3
-            # Also check in keywords
-            for keyword in career_data['keywords']:
-                if subject_lower in keyword or keyword in subject_lower:
-                    score += 2
-                    subject_matches += 1
-                    matched_subjects.append(subject)
-                    details['subject_match'] += 2
-                    break
-        
-        if subject_matches > 0:
-            reasons.append(f"✓ Your background in {matched_subjects[0]} is relevant")
-        
-        # === HOBBY MATCHING (weight: 2) ===
-        hobby_matches = 0
-        for hobby in user_profile['hobbies']:
-            hobby_lower = hobby.lower()
-            for keyword in career_data['keywords']:
-                if hobby_lower in keyword or keyword in hobby_lower:
-                    score += 2
-                    hobby_matches += 1
-                    break
-        
-        if hobby_matches > 0:
-            reasons.append(f"✓ Your hobbies align with the work")
-        
-        # === CAREER GOAL MATCHING (bonus) ===
-        for goal in user_profile['career_goals']:
-            if goal.lower() == career_data['title'].lower():
-                score += 10
-                reasons.append(f"✓✓ This matches your stated career goal!")
-        
-        # === DISLIKES PENALTY (weight: -4) ===
-        dislikes_found = []
-        for dislike in user_profile['dislikes']:
-            dislike_lower = dislike.lower()
-            for keyword in career_data['keywords']:
-                if dislike_lower in keyword or keyword in dislike_lower:
-                    score -= 4
-                    dislikes_found.append(dislike)
-                    break
-        
-        if dislikes_found:
-            reasons.append(f"⚠️ Note: Involves {dislikes_found[0]}, which you mentioned disliking")
-        
-        # === FINAL SCORING ===
-        final_score = max(score, 0)
-        scores[career_id] = final_score
-        explanations[career_id] = reasons if reasons else ["Limited information to match"]
-        match_details[career_id] = details
-    
-    # Sort by score
-    sorted_careers = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-    return sorted_careers, explanations, match_details
+    accumulator = CareerScoreAccumulator()
+    accumulator.add_profile(user_profile)
+    return accumulator.results()
 
-def generate_ultra_response(session, user_message, intent):
+def generate_ultra_response(session, analysis, intent):
     """Generate ultra-realistic, context-aware responses"""
     
     # Handle off-topic messages
@@ -850,9 +1068,14 @@ def generate_ultra_response(session, user_message, intent):
     session.context['off_topic_count'] = 0
     
     # Extract information from message
-    keywords = extract_keywords_ultra(user_message)
-    entities = extract_entities_ultra(user_message)
-    sentiment = analyze_sentiment_advanced(user_message)
+    keywords = extract_keywords_ultra(analysis)
+    entities = extract_entities_ultra(analysis)
+    sentiment = analyze_sentiment_advanced(analysis)
+    
+    # Remember profile sizes so only newly added terms get scored
+    previous_sizes = {
+        field: len(session.user_profile[field]) for field in CareerScoreAccumulator.SCORED_FIELDS
+    }
     
     # Update user profile with extracted information
     session.user_profile['interests'].extend(keywords[:7])
@@ -876,6 +1099,12 @@ def generate_ultra_response(session, user_message, intent):
         if isinstance(session.user_profile[key], list):
             session.user_profile[key] = list(dict.fromkeys(session.user_profile[key]))  # Preserve order
     
+    # Existing entries were already unique, so new terms are at the end
+    previous_top = session.career_scores.top(1)
+    for field in CareerScoreAccumulator.SCORED_FIELDS:
+        session.career_scores.add_terms(field, session.user_profile[field][previous_sizes[field]:])
+    current_top = session.career_scores.top(1)
+    
     # Calculate if we have enough info
     total_info = (
         len(session.user_profile['interests']) + 
@@ -887,9 +1116,8 @@ def generate_ultra_response(session, user_message, intent):
     session.has_enough_info = total_info >= 10
     
     # Extract name if mentioned
-    if nlp and not session.user_name:
-        doc = nlp(user_message)
-        for ent in doc.ents:
+    if not session.user_name:
+        for ent in analysis.entities:
             if ent.label_ == 'PERSON' and len(ent.text.split()) <= 3:
                 # Avoid extracting career names as person names
                 if ent.text.lower() not in [c['title'].lower() for c in CAREER_DATABASE.values()]:
@@ -954,8 +1182,7 @@ def generate_ultra_response(session, user_message, intent):
         
         else:
             # Generate recommendations
-            career_matches, explanations, details = calculate_career_match_ultra(session.user_profile)
-            top_careers = career_matches[:5]  # Top 5
+            top_careers = session.career_scores.top(5)  # Top 5
             
             if top_careers[0][1] < 5:
                 response = "Hmm, I'm having trouble finding strong matches. Let me ask you some specific questions:\n\n"
@@ -981,9 +1208,10 @@ def generate_ultra_response(session, user_message, intent):
                         response += f"   {career['description']}\n\n"
                         
                         # Add reasons
-                        if career_id in explanations and explanations[career_id]:
+                        reasons = session.career_scores.explanation(career_id)
+                        if reasons:
                             response += "   **Why this suits you:**\n"
-                            for reason in explanations[career_id][:4]:
+                            for reason in reasons[:4]:
                                 response += f"   {reason}\n"
                             response += "\n"
                         
@@ -1004,16 +1232,9 @@ def generate_ultra_response(session, user_message, intent):
     elif intent == 'details':
         # Find which career they're asking about
         career_found = None
-        for career_id, career_data in CAREER_DATABASE.items():
-            if career_data['title'].lower() in user_message.lower():
-                career_found = (career_id, career_data)
-                break
-            for alias in career_data.get('aliases', []):
-                if alias.lower() in user_message.lower():
-                    career_found = (career_id, career_data)
-                    break
-            if career_found:
-                break
+        mentioned_careers = analysis.values('career', CAREER_DATABASE)
+        if mentioned_careers:
+            career_found = (mentioned_careers[0], CAREER_DATABASE[mentioned_careers[0]])
         
         if career_found:
             career_id, career = career_found
@@ -1146,6 +1367,12 @@ def generate_ultra_response(session, user_message, intent):
                 response += "4️⃣ Share more about yourself\n\n"
                 response += "Just let me know!"
     
+    # Let the user know when what they just shared changed their best match
+    if (intent != 'recommend' and session.has_enough_info and previous_top[0][1] > 0 and
+            current_top[0][0] != previous_top[0][0]):
+        new_top = CAREER_DATABASE[current_top[0][0]]['title']
+        response += f"\n\n💡 Based on what you just shared, **{new_top}** is now your top career match."
+    
     return response  # <-- THIS IS IMPORTANT! Must return the response
 
 # ==================== API ROUTES ====================
@@ -1162,7 +1389,6 @@ def start_chat():
         user_id = data.get('user_id')
         
         session = UltraAdvancedChatSession(session_id, user_id)
-        chat_sessions[session_id] = session
         
         greeting = "👋 Hello! Welcome!\n\n"
         greeting += "I'm your **AI Career Counselor**, and I'm genuinely excited to help you explore career possibilities that align with who you are.\n\n"
@@ -1172,6 +1398,7 @@ def start_chat():
         greeting += "_(Feel free to share as much or as little as you'd like!)_"
         
         session.add_message("bot", greeting)
+        chat_sessions.put(session)
         
         print(f"✅ Ultra-advanced chat session started: {session_id}")
         
@@ -1198,7 +1425,8 @@ def send_message():
         session_id = data.get('session_id')
         user_message = data.get('message', '').strip()
         
-        if not session_id or session_id not in chat_sessions:
+        session = chat_sessions.get(session_id) if session_id else None
+        if session is None:
             return jsonify({
                 "success": False, 
                 "error": "Session not found. Please start a new chat."
@@ -1210,20 +1438,20 @@ def send_message():
                 "error": "Please type a message"
             }), 400
         
-        session = chat_sessions[session_id]
         session.add_message("user", user_message)
         
         # Detect intent and generate intelligent response
-        intent = detect_intent_ultra(user_message, session)
-        response = generate_ultra_response(session, user_message, intent)
+        analysis = MessageAnalysis(user_message)
+        intent = detect_intent_ultra(analysis, session)
+        response = generate_ultra_response(session, analysis, intent)
         
         session.add_message("bot", response)
+        chat_sessions.put(session)
         
         # Generate recommendations if requested and have enough info
         recommendations = []
         if intent == 'recommend' and session.has_enough_info:
-            career_matches, explanations, details = calculate_career_match_ultra(session.user_profile)
-            for career_id, score in career_matches[:5]:
+            for career_id, score in session.career_scores.top(5):
                 if score > 0:
                     career = CAREER_DATABASE[career_id]
                     match_percentage = min(int((score / 50) * 100), 95)
@@ -1233,7 +1461,7 @@ def send_message():
                         "description": career['description'],
                         "match_score": round(score, 2),
                         "match_percentage": match_percentage,
-                        "reasons": explanations.get(career_id, []),
+                        "reasons": session.career_scores.explanation(career_id),
                         "courses": career['courses'],
                         "salary_range": career['salary_range'],
                         "growth_potential": career['growth'],
@@ -1271,10 +1499,10 @@ def get_history(session_id):
         return '', 200
     
     try:
-        if session_id not in chat_sessions:
+        session = chat_sessions.get(session_id)
+        if session is None:
             return jsonify({"success": False, "error": "Session not found"}), 404
         
-        session = chat_sessions[session_id]
         return jsonify({
             "success": True,
             "history": session.conversation_history,
@@ -1289,8 +1517,8 @@ def end_chat(session_id):
         return '', 200
     
     try:
-        if session_id in chat_sessions:
-            session = chat_sessions[session_id]
+        session = chat_sessions.get(session_id)
+        if session is not None:
             summary = {
                 "total_messages": len(session.conversation_history),
                 "duration": str(datetime.utcnow() - session.created_at),
@@ -1298,7 +1526,7 @@ def end_chat(session_id):
                 "recommendations_given": session.has_enough_info
             }
             
-            del chat_sessions[session_id]
+            chat_sessions.delete(session_id)
             
             farewell = "Thank you for chatting with me! 🌟\n\n"
             farewell += "Remember, choosing a career is a journey, not a destination. Take your time, explore your options, and trust your instincts.\n\n"
@@ -1314,6 +1542,20 @@ def end_chat(session_id):
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@chat_bp.route('/chat/stats', methods=['GET', 'OPTIONS'])
+def get_session_stats():
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        return jsonify({
+            "success": True,
+            "sessions": chat_sessions.stats(),
+            "nlp": nlp_provider.stats()
+        }), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @chat_bp.route('/chat/career-details/<career_id>', methods=['GET', 'OPTIONS'])
 def get_career_details(career_id):
     if request.method == 'OPTIONS':
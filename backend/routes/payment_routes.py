@@ -5,7 +5,8 @@ import razorpay
 import hmac
 import hashlib
 import os
-import jwt
+from auth_middleware import authenticate
+from dashboard_stats import dashboard_stats
 
 payment_bp = Blueprint('payment', __name__)
 
@@ -18,28 +19,6 @@ razorpay_client = razorpay.Client(
 )
 
 
-def get_user_from_token(request):
-    """Extract user ID from JWT token"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None, {'error': 'No token provided'}, 401
-    
-    token = auth_header.split(' ')[1]
-    
-    try:
-        payload = jwt.decode(
-            token,
-            current_app.config['SECRET_KEY'],
-            algorithms=['HS256']
-        )
-        return payload['user_id'], None, None
-    except jwt.ExpiredSignatureError:
-        return None, {'error': 'Token expired'}, 401
-    except:
-        return None, {'error': 'Invalid token'}, 401
-
-
 @payment_bp.route('/create-order', methods=['POST'])
 def create_order():
     """Create Razorpay order"""
@@ -48,9 +27,9 @@ def create_order():
         data = request.json
         
         # Get user from token
-        user_id, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         # Validate required fields
         required = ['counsellor_id', 'date', 'time', 'duration', 'amount']
@@ -127,9 +106,9 @@ def verify_payment():
         data = request.json
         
         # Get user from token
-        user_id, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         # Get payment details
         order_id = data.get('razorpay_order_id')
@@ -197,6 +176,7 @@ def verify_payment():
         }
         
         result = db.appointments.insert_one(appointment)
+        dashboard_stats.invalidate(db)
         
         print(f"✅ Payment verified and appointment created: {result.inserted_id}")
         
@@ -220,9 +200,9 @@ def my_bookings():
         db = current_app.config['DB']
         
         # Get user from token
-        user_id, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         # Get appointments
         appointments = list(db.appointments.find({
@@ -1,32 +1,11 @@
 from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
 from bson import ObjectId
-import jwt
+from auth_middleware import authenticate
 
 quiz_bp = Blueprint('quiz', __name__)
 
 
-# Helper function to get user from token
-def get_user_from_token(request):
-    """Extract user ID from JWT token"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None, {'error': 'No token provided'}, 401
-    
-    token = auth_header.split(' ')[1]
-    
-    try:
-        payload = jwt.decode(
-            token,
-            current_app.config['SECRET_KEY'],
-            algorithms=['HS256']
-        )
-        return payload['user_id'], None, None
-    except:
-        return None, {'error': 'Invalid token'}, 401
-
-
 @quiz_bp.route('/quiz/<quiz_type>/questions', methods=['GET'])
 def get_quiz_questions(quiz_type):
     """
@@ -80,9 +59,9 @@ def submit_quiz():
         data = request.json
         
         # Get user from token
-        user_id, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         quiz_type = data.get('quiz_type')
         answers = data.get('answers', [])
@@ -1,33 +1,10 @@
 from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
-import jwt
+from auth_middleware import authenticate
 from bson import ObjectId
 
 user_bp = Blueprint('user', __name__)
 
-# Helper function to get user from token
-def get_user_from_token(request):
-    """Extract user ID from JWT token"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None, {'error': 'No token provided'}, 401
-    
-    token = auth_header.split(' ')[1]
-    
-    try:
-        payload = jwt.decode(
-            token,
-            current_app.config['SECRET_KEY'],
-            algorithms=['HS256']
-        )
-        return payload['user_id'], None, None
-    except jwt.ExpiredSignatureError:
-        return None, {'error': 'Token has expired'}, 401
-    except jwt.InvalidTokenError:
-        return None, {'error': 'Invalid token'}, 401
-
-
 @user_bp.route('/profile', methods=['GET'])
 def get_profile():
     """
@@ -39,9 +16,9 @@ def get_profile():
         db = current_app.config['DB']
         
         # Get user from token
-        user_id, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         # Get user from database
         user = db.users.find_one({'_id': ObjectId(user_id)})
@@ -92,9 +69,9 @@ def update_profile():
         data = request.json
         
         # Get user from token
-        user_id, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         # Build update document
         update_doc = {
@@ -151,9 +128,9 @@ def add_interests():
         data = request.json
         
         # Get user from token
-        user_id, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         if not data.get('interests') or not isinstance(data['interests'], list):
             return jsonify({'error': 'interests must be an array'}), 400
@@ -188,9 +165,9 @@ def add_skills():
         data = request.json
         
         # Get user from token
-        user_id, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         if not data.get('skills') or not isinstance(data['skills'], list):
             return jsonify({'error': 'skills must be an array'}), 400
@@ -223,9 +200,9 @@ def get_dashboard_stats():
         db = current_app.config['DB']
         
         # Get user from token
-        user_id, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         user_id_str = str(user_id)
         
@@ -289,9 +266,9 @@ def get_recent_activity():
         db = current_app.config['DB']
         
         # Get user from token
-        user_id, error, status = get_user_from_token(request)
+        user_id, role, error, status = authenticate()
         if error:
-            return jsonify(error), status
+            return jsonify({'error': error}), status
         
         limit = int(request.args.get('limit', 10))
         user_id_str = str(user_id)
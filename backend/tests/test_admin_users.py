@@ -0,0 +1,96 @@
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from bson import ObjectId
+from flask import Flask
+from admin_common import list_users
+
+
+def matches(document, query):
+    """The subset of MongoDB matching a cursor page uses"""
+    for field, condition in query.items():
+        if field == '$and':
+            if not all(matches(document, clause) for clause in condition):
+                return False
+        elif field == '$or':
+            if not any(matches(document, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not document.get(field) < condition['$lt']:
+                return False
+        elif document.get(field) != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        # created_at desc, then _id desc
+        self.documents.sort(key=lambda doc: (doc['created_at'], doc['_id']), reverse=True)
+        return self
+
+    def skip(self, count):
+        self.documents = self.documents[count:]
+        return self
+
+    def limit(self, count):
+        return [dict(doc) for doc in self.documents[:count]]
+
+
+class FakeUsers:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        return FakeCursor([doc for doc in self.documents if matches(doc, query)])
+
+    def estimated_document_count(self):
+        return len(self.documents)
+
+
+class FakeDB:
+    def __init__(self, documents):
+        self.users = FakeUsers(documents)
+
+
+app = Flask(__name__)
+start = datetime(2024, 1, 1)
+db = FakeDB([
+    {'_id': ObjectId(), 'name': f'User {idx}', 'created_at': start + timedelta(days=idx)}
+    for idx in range(5)
+])
+
+
+def get_users(query):
+    with app.test_request_context(f'/users?{query}'):
+        response, status = list_users(db)
+        return response.get_json(), status
+
+
+def test_legacy_page_parameter_still_pages():
+    body, status = get_users('page=2&limit=2')
+
+    assert status == 200
+    assert [user['name'] for user in body['users']] == ['User 2', 'User 1']
+    assert body['page'] == 2
+    assert body['pages'] == 3
+    assert body['has_more'] is True
+
+
+def test_cursor_pages_leave_out_page_fields():
+    first, _ = get_users('limit=2')
+    second, _ = get_users(f"limit=2&cursor={first['next_cursor']}")
+
+    assert 'page' not in first
+    assert [user['name'] for user in second['users']] == ['User 2', 'User 1']
+
+
+def test_bad_paging_parameters_are_rejected():
+    first, _ = get_users('limit=2')
+
+    assert get_users('page=abc')[1] == 400
+    assert get_users(f"page=2&cursor={first['next_cursor']}")[1] == 400
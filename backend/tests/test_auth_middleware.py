@@ -0,0 +1,89 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from datetime import datetime, timedelta
+from flask import Flask, g, jsonify
+import jwt
+from auth_middleware import TokenVerifier, authenticate, init_auth, token_verifier
+
+SECRET = 'test-secret-key-that-is-at-least-32-bytes'
+
+
+def make_token(exp_delta=timedelta(hours=1), secret=SECRET):
+    payload = {'user_id': 'u1', 'role': 'student', 'exp': datetime.utcnow() + exp_delta}
+    return jwt.encode(payload, secret, algorithm='HS256')
+
+
+def test_verifier_caches_and_rejects_tampering():
+    verifier = TokenVerifier()
+    token = make_token()
+
+    assert verifier.verify(token, SECRET)['user_id'] == 'u1'
+    assert verifier.verify(token, SECRET)['user_id'] == 'u1'
+    assert (verifier.hits, verifier.misses) == (1, 1)
+
+    # Same signature on a different payload must not hit the cache
+    header, _, signature = token.split('.')
+    forged = '.'.join([header, make_token().split('.')[1] + 'x', signature])
+    try:
+        verifier.verify(forged, SECRET)
+        assert False, 'forged token accepted'
+    except jwt.InvalidTokenError:
+        pass
+
+    # A rotated secret drops every cached token
+    try:
+        verifier.verify(token, 'another-secret-key-at-least-32-bytes')
+        assert False, 'token accepted under a new secret'
+    except jwt.InvalidTokenError:
+        pass
+
+    try:
+        verifier.verify(make_token(exp_delta=timedelta(seconds=-1)), SECRET)
+        assert False, 'expired token accepted'
+    except jwt.ExpiredSignatureError:
+        pass
+
+
+def test_middleware_verifies_once_per_request():
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = SECRET
+    init_auth(app)
+
+    @app.route('/me')
+    def me():
+        user_id, role, error, status = authenticate()
+        if error:
+            return jsonify({'error': error}), status
+        authenticate()
+        return jsonify({'user_id': g.user_id, 'role': role}), 200
+
+    client = app.test_client()
+    misses = token_verifier.misses
+    response = client.get('/me', headers={'Authorization': f'Bearer {make_token()}'})
+    assert response.get_json() == {'user_id': 'u1', 'role': 'student'}
+    assert token_verifier.misses == misses + 1
+
+    assert client.get('/me').get_json() == {'error': 'No token provided'}
+    response = client.get('/me', headers={'Authorization': 'Bearer not.a.token'})
+    assert response.status_code == 401
+
+
+def test_verify_token_route_uses_the_request_verification():
+    from routes.auth_routes import auth_bp
+
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = SECRET
+    init_auth(app)
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    client = app.test_client()
+
+    token = make_token(exp_delta=timedelta(minutes=30))
+    calls = token_verifier.hits + token_verifier.misses
+    response = client.get('/api/auth/verify-token', headers={'Authorization': f'Bearer {token}'})
+    assert response.get_json() == {'valid': True, 'user_id': 'u1', 'role': 'student'}
+    assert token_verifier.hits + token_verifier.misses == calls + 1
+
+    expired = make_token(exp_delta=timedelta(seconds=-1))
+    response = client.get('/api/auth/verify-token', headers={'Authorization': f'Bearer {expired}'})
+    assert (response.status_code, response.get_json()) == (401, {'error': 'Token expired'})
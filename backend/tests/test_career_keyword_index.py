@@ -0,0 +1,26 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from career_keyword_index import SubstringIndex, CareerKeywordIndex
+
+
+def test_substring_lookup_is_bidirectional():
+    index = SubstringIndex().build([
+        ('software', ['coding', 'programming']),
+        ('artist', ['art', 'painting'])
+    ])
+
+    assert index.lookup('gram') == {'software'}
+    assert index.lookup('i love coding') == {'software'}
+    assert index.lookup('art history') == {'artist'}
+    assert index.lookup('biology') == set()
+
+
+def test_subject_and_title_postings():
+    index = CareerKeywordIndex({
+        'teacher': {'title': 'Teacher', 'keywords': ['teaching'], 'related_subjects': ['English']}
+    })
+
+    assert index.subjects == {'english': ['teacher']}
+    assert index.titles == {'teacher': ['teacher']}
+    assert index.keywords.lookup('teach') == {'teacher'}
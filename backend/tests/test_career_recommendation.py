@@ -0,0 +1,82 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from career_recommendation import CareerRecommendationEngine
+
+
+def test_scores_match_scalar_methods():
+    engine = CareerRecommendationEngine()
+    interests = ['technology', 'mathematics']
+    skills = ['analytical', 'technical']
+    personality = {'analytical': 0.9, 'introverted': 0.7, 'unknown-trait': 0.3}
+
+    final, interest, skill, personality_scores = engine.score_profile(
+        interests, skills, personality
+    )
+
+    for idx, name in enumerate(engine.career_names):
+        career = engine.career_database[name]
+        assert abs(interest[idx] - engine.calculate_interest_match(interests, career)) < 1e-9
+        assert abs(skill[idx] - engine.calculate_skill_match(skills, career)) < 1e-9
+        assert abs(personality_scores[idx] - engine.calculate_personality_match(personality, career)) < 1e-9
+
+
+def test_duplicate_career_terms_keep_the_scalar_divisor():
+    engine = CareerRecommendationEngine()
+    name = engine.career_names[0]
+    career = engine.career_database[name]
+    career['interests'] = career['interests'] + career['interests'][:1]
+    career['skills'] = career['skills'] + career['skills'][:1]
+    engine.compile_career_matrices()
+
+    interests = career['interests'][:2]
+    skills = career['skills'][:2]
+    _, interest, skill, _ = engine.score_profile(interests, skills, {})
+
+    idx = engine.career_names.index(name)
+    assert abs(interest[idx] - engine.calculate_interest_match(interests, career)) < 1e-9
+    assert abs(skill[idx] - engine.calculate_skill_match(skills, career)) < 1e-9
+
+
+def test_top_n_ordering():
+    engine = CareerRecommendationEngine()
+    recommendations = engine.get_recommendations(
+        ['technology', 'mathematics', 'problem-solving'],
+        ['analytical', 'technical', 'problem-solving', 'creative'],
+        top_n=3
+    )
+
+    assert len(recommendations) == 3
+    assert recommendations[0]['career_name'] == 'Software Engineer'
+    scores = [rec['match_score'] for rec in recommendations]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_empty_profile_and_top_n_bounds():
+    engine = CareerRecommendationEngine()
+
+    assert engine.get_recommendations(top_n=0) == []
+    recommendations = engine.get_recommendations(top_n=100)
+    assert len(recommendations) == len(engine.career_database)
+    assert [rec['career_name'] for rec in recommendations] == engine.career_names
+
+
+def test_batch_matches_single_profile_results():
+    engine = CareerRecommendationEngine()
+    profiles = [
+        {'interests': ['technology'], 'skills': ['analytical']},
+        {'interests': ['arts', 'design'], 'personality': {'creative': 1.0}},
+        {}
+    ]
+
+    batch = list(engine.get_batch_recommendations(profiles, top_n=4, chunk_size=2))
+
+    assert len(batch) == len(profiles)
+    for profile, recommendations in zip(profiles, batch):
+        expected = engine.get_recommendations(
+            profile.get('interests'),
+            profile.get('skills'),
+            profile.get('personality'),
+            top_n=4
+        )
+        assert recommendations == expected
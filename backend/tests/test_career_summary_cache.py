@@ -0,0 +1,38 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from career_summary_cache import CareerSummaryCache
+
+
+class FakeCareers:
+    def __init__(self, careers):
+        self.careers = careers
+        self.queries = []
+
+    def find(self, query, projection):
+        self.queries.append(query)
+        names = query['name']['$in']
+        return [career for career in self.careers if career['name'] in names]
+
+
+class FakeDB:
+    def __init__(self, careers):
+        self.careers = FakeCareers(careers)
+
+
+def test_one_query_and_invalidation():
+    db = FakeDB([{'_id': 1, 'name': 'Teacher', 'description': 'Teach', 'education': ['B.Ed', 'MA', 'PhD']}])
+    cache = CareerSummaryCache()
+
+    summaries = cache.get_many(['Teacher', 'Astronaut', 'Teacher'], db)
+    assert summaries['Teacher']['education_required'] == ['B.Ed', 'MA']
+    assert summaries['Astronaut'] is None
+    assert db.careers.queries == [{'name': {'$in': ['Teacher', 'Astronaut']}}]
+
+    cache.get_many(['Teacher', 'Astronaut'], db)
+    assert len(db.careers.queries) == 1
+
+    db.careers.careers.append({'_id': 2, 'name': 'Astronaut', 'description': 'Fly'})
+    cache.invalidate()
+    assert cache.get_many(['Astronaut'], db)['Astronaut']['description'] == 'Fly...'
+    assert len(db.careers.queries) == 2
@@ -0,0 +1,29 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from catalogue_search import SearchIndex, tokenize
+
+COLLEGES = [
+    {'_id': 1, 'name': 'College of Engineering Trivandrum', 'short_name': 'CET', 'location': 'Thiruvananthapuram, Kerala'},
+    {'_id': 2, 'name': 'Government Medical College', 'short_name': 'GMC', 'location': 'Kozhikode, Kerala',
+     'specializations': ['General Medicine']},
+    {'_id': 3, 'name': 'Cochin University of Science and Technology', 'short_name': 'CUSAT',
+     'location': 'Kochi, Kerala', 'specializations': ['Computer Science', 'Marine Engineering']}
+]
+FIELDS = {'name': 10, 'short_name': 8, 'location': 4, 'specializations': 3}
+
+
+def test_tokenize_normalizes_text():
+    assert tokenize('Café (B.Tech)') == ['cafe', 'b', 'tech']
+    assert tokenize(['Kochi', None, 'CS']) == ['kochi', 'cs']
+
+
+def test_prefix_search_ranks_name_hits_first():
+    index = SearchIndex(COLLEGES, FIELDS)
+
+    assert [doc_id for doc_id, score in index.search('engineering')] == [1, 3]
+    assert [doc_id for doc_id, score in index.search('comp sci')] == [3]
+    assert [doc_id for doc_id, score in index.search('CUS')] == [3]
+    assert index.search('kerala medic')[0][0] == 2
+    assert index.search('.*') == []
+    assert index.search('zzz') == []
@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from datetime import datetime
+from catalogue_snapshot import CatalogueCache
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.reads = 0
+
+    def find(self, query):
+        self.reads += 1
+        return [dict(document) for document in self.documents]
+
+
+class FakeMeta:
+    def __init__(self):
+        self.version = 0
+
+    def find_one(self, query, projection):
+        return {'_id': 'catalogue', 'version': self.version} if self.version else None
+
+    def update_one(self, query, update, upsert=False):
+        self.version += update['$inc']['version']
+
+
+class FakeDB(dict):
+    def __init__(self, careers, colleges):
+        super().__init__(careers=FakeCollection(careers), colleges=FakeCollection(colleges),
+                         courses=FakeCollection([]))
+        self.catalogue_meta = FakeMeta()
+
+
+COLLEGES = [
+    {'_id': 'c1', 'name': 'NIT Calicut', 'district': 'Kozhikode', 'type': 'Engineering',
+     'courses': ['B.Tech', 'M.Tech'], 'created_at': datetime(2026, 1, 1)},
+    {'_id': 'c2', 'name': 'Medical College Kozhikode', 'district': 'Kozhikode', 'type': 'Medical',
+     'primary_course': 'MBBS'},
+    {'_id': 'c3', 'name': 'CET Trivandrum', 'district': 'Thiruvananthapuram', 'type': 'Engineering',
+     'courses': ['B.Tech']}
+]
+
+
+def test_filters_and_search_from_memory():
+    db = FakeDB([{'_id': 'k1', 'name': 'Doctor', 'category': 'Medical'}], COLLEGES)
+    snapshot = CatalogueCache().get(db)
+
+    names = lambda docs: [doc['name'] for doc in docs]
+    assert names(snapshot.find('colleges', {'district': 'kozhikode', 'type': 'all'})) == [
+        'NIT Calicut', 'Medical College Kozhikode']
+    assert names(snapshot.find('colleges', {'type': 'engineering', 'course': 'B.Tech'})) == [
+        'NIT Calicut', 'CET Trivandrum']
+    assert names(snapshot.find('colleges', {'course': 'mbbs'})) == ['Medical College Kozhikode']
+    assert names(snapshot.find('colleges', {'district': 'thiruvanan'})) == ['CET Trivandrum']
+    assert names(snapshot.find('colleges', {'type': 'engineering'}, search='calicut')) == ['NIT Calicut']
+    assert snapshot.get('colleges', 'c1')['created_at'] == '2026-01-01T00:00:00'
+    assert snapshot.find('careers', {'category': 'Technology'}) == []
+
+
+def test_reloads_only_when_version_changes():
+    db = FakeDB([], COLLEGES)
+    cache = CatalogueCache(check_seconds=0)
+
+    first = cache.get(db)
+    assert cache.get(db) is first
+    assert db['colleges'].reads == 1
+    assert first.memo('stats', lambda: 1) == 1
+    assert first.memo('stats', lambda: 2) == 1
+
+    cache.invalidate(db)
+    assert db.catalogue_meta.version == 1
+    second = cache.get(db)
+    assert second is not first and second.version == 1
+    assert second.memo('stats', lambda: 2) == 2
+
+    # Another process bumping the version is picked up on the next check
+    db.catalogue_meta.version += 1
+    assert cache.get(db).version == 2
+    assert db['colleges'].reads == 3
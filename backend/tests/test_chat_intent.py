@@ -0,0 +1,32 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from routes.chat_routes import (
+    MessageAnalysis, detect_intent_ultra, analyze_sentiment_advanced, extract_entities_ultra
+)
+
+
+def intent(text):
+    return detect_intent_ultra(MessageAnalysis(text), None)
+
+
+def test_inflected_forms_keep_their_intent():
+    assert intent('Can you give me some career recommendations?') == 'recommend'
+    assert intent('any suggestions?') == 'recommend'
+    assert intent('what about salaries') == 'salary_question'
+    assert intent('which courses and degrees') == 'education_question'
+
+
+def test_inflected_forms_keep_sentiment_and_entities():
+    analysis = MessageAnalysis('I loved designing posters and coding games')
+
+    assert detect_intent_ultra(analysis, None) == 'sharing_interest'
+    assert analyze_sentiment_advanced(analysis) == 'positive'
+    assert 'design' in extract_entities_ultra(analysis)['skills']
+    assert 'communication' in extract_entities_ultra(MessageAnalysis('I enjoy explaining things'))['skills']
+
+
+def test_short_entries_stay_whole_words():
+    assert intent('hi there') == 'greeting'
+    assert intent('I like history') == 'sharing_interest'
+    assert 'computer science' not in extract_entities_ultra(MessageAnalysis('tell me about items'))['subjects']
@@ -0,0 +1,128 @@
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from chat_session_store import MemorySessionStore
+
+
+class FakeSession:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.conversation_history = []
+        self.user_profile = {'interests': []}
+        self.last_activity = datetime.utcnow()
+
+
+def test_lru_eviction_and_counters():
+    store = MemorySessionStore(max_sessions=2)
+    store.put(FakeSession('a'))
+    store.put(FakeSession('b'))
+
+    assert store.get('a') is not None
+    store.put(FakeSession('c'))
+
+    assert store.get('b') is None
+    assert store.get('a') is not None
+    stats = store.stats()
+    assert stats['sessions'] == 2
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
+
+
+def test_idle_sessions_expire():
+    store = MemorySessionStore(ttl_minutes=30)
+    session = FakeSession('idle')
+    session.last_activity = datetime.utcnow() - timedelta(minutes=31)
+    store.put(session)
+
+    assert store.get('idle') is None
+    assert store.stats()['sessions'] == 0
+
+
+def test_memory_budget():
+    store = MemorySessionStore(max_bytes=10000)
+    for idx in range(10):
+        session = FakeSession(str(idx))
+        session.conversation_history.append({'content': 'x' * 2000})
+        store.put(session)
+
+    stats = store.stats()
+    assert stats['bytes'] <= 10000
+    assert store.get('9') is not None
+    assert store.delete('9') is True
+    assert store.delete('9') is False
+
+
+class FakeResult:
+    def __init__(self, matched_count=0, upserted_id=None):
+        self.matched_count = matched_count
+        self.upserted_id = upserted_id
+
+
+class FakeChatHistory:
+    """Just enough of a collection for MongoSessionStore writes"""
+
+    def __init__(self):
+        self.documents = {}
+
+    def find_one(self, query, projection=None):
+        return self.documents.get(query['session_id'])
+
+    def update_one(self, query, update, upsert=False):
+        document = self.documents.get(query['session_id'])
+        if document is None:
+            if not upsert:
+                return FakeResult()
+            self.documents[query['session_id']] = dict(update['$setOnInsert'])
+            return FakeResult(upserted_id=query['session_id'])
+        if '$setOnInsert' in update:
+            return FakeResult(matched_count=1)
+        if document.get('version') != query['version']:
+            return FakeResult()
+        document.update(update['$set'])
+        document['version'] += update['$inc']['version']
+        document['messages'] = document['messages'] + update['$push']['messages']['$each']
+        return FakeResult(matched_count=1)
+
+
+class FakeStoredSession(FakeSession):
+    def to_document(self):
+        return {
+            'session_id': self.session_id,
+            'messages': [message['content'] for message in self.conversation_history],
+            'last_message_at': self.last_activity
+        }
+
+
+def test_concurrent_writers_keep_both_messages():
+    from chat_session_store import MongoSessionStore
+    collection = FakeChatHistory()
+    workers = [MongoSessionStore(lambda: collection, None) for _ in range(2)]
+
+    first = FakeStoredSession('s')
+    first.conversation_history.append({'content': 'hello'})
+    workers[0].put(first)
+
+    # Both workers start from version 1 and add a different message
+    second = FakeStoredSession('s')
+    second.conversation_history.append({'content': 'hello'})
+    second._store_version = 1
+    second._persisted_messages = 1
+    first.conversation_history.append({'content': 'from worker 0'})
+    second.conversation_history.append({'content': 'from worker 1'})
+    workers[0].put(first)
+    workers[1].put(second)
+
+    stored = collection.documents['s']
+    assert stored['messages'] == ['hello', 'from worker 0', 'from worker 1']
+    assert stored['version'] == 3
+    assert workers[1].stats()['conflicts'] == 1
+    assert second._store_version == 3
+
+    # A copy that was never stored can't overwrite the existing session
+    stale = FakeStoredSession('s')
+    stale.conversation_history.append({'content': 'late'})
+    workers[1].put(stale)
+    assert collection.documents['s']['messages'][-1] == 'late'
+    assert collection.documents['s']['messages'][:3] == ['hello', 'from worker 0', 'from worker 1']
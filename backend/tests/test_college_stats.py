@@ -0,0 +1,68 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from catalogue_snapshot import RATING_BOUNDARIES, compute_college_stats
+
+
+class FakeColleges:
+    def __init__(self, facets):
+        self.facets = facets
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return iter(self.facets)
+
+
+class FakeDB:
+    def __init__(self, facets):
+        self.colleges = FakeColleges(facets)
+
+
+def test_facet_output_maps_to_counts_and_rating_labels():
+    db = FakeDB([{
+        'total': [{'count': 9}],
+        'by_type': [{'_id': 'Government', 'count': 5}, {'_id': 'Private', 'count': 4}],
+        'by_district': [{'_id': 'Srinagar', 'count': 6}, {'_id': 'Jammu', 'count': 3}],
+        'by_course': [{'_id': 'B.Tech', 'count': 7}],
+        'by_rating': [
+            {'_id': 0, 'count': 1},
+            {'_id': 3.5, 'count': 2},
+            {'_id': 4.5, 'count': 3},
+            {'_id': 'unrated', 'count': 3}
+        ]
+    }])
+
+    stats = compute_college_stats(db)
+
+    assert stats == {
+        'total': 9,
+        'by_type': {'Government': 5, 'Private': 4},
+        'by_district': {'Srinagar': 6, 'Jammu': 3},
+        'by_course': {'B.Tech': 7},
+        'by_rating': {'0-3': 1, '3.5-4': 2, '4.5-5': 3, 'unrated': 3}
+    }
+
+
+def test_ratings_are_bucketed_with_an_unrated_default():
+    db = FakeDB([{}])
+
+    compute_college_stats(db)
+
+    bucket = db.colleges.pipelines[0][0]['$facet']['by_rating'][0]['$bucket']
+    assert bucket['boundaries'] == RATING_BOUNDARIES
+    assert bucket['default'] == 'unrated'
+
+
+def test_empty_aggregation_gives_zero_counts():
+    stats = compute_college_stats(FakeDB([]))
+
+    assert stats == {
+        'total': 0,
+        'by_type': {},
+        'by_district': {},
+        'by_course': {},
+        'by_rating': {}
+    }
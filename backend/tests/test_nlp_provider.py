@@ -0,0 +1,18 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from nlp_provider import NLPProvider
+
+
+def test_loads_lazily_and_falls_back():
+    provider = NLPProvider(model_name='missing_model_for_tests')
+    assert provider.mode == 'unloaded'
+
+    nlp = provider.get()
+
+    assert provider.mode in ('tokenizer', 'unavailable')
+    assert provider.get() is nlp
+    assert provider.stats()['load_seconds'] is not None
+    assert not provider.has_pipe('parser')
+    if nlp is not None:
+        assert [token.text for token in nlp('hi there')] == ['hi', 'there']
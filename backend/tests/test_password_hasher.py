@@ -0,0 +1,76 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import threading
+import bcrypt
+from password_hasher import PasswordHasher, PasswordPoolBusy
+
+
+def test_hash_verify_and_upgrade():
+    hasher = PasswordHasher(rounds=5, max_workers=2)
+
+    hashed = hasher.hash('secret123')
+    assert PasswordHasher.cost_of(hashed) == 5
+    assert hasher.verify('secret123', hashed)
+    assert hasher.verify('secret123', hashed.decode('utf-8'))
+    assert not hasher.verify('wrong', hashed)
+    assert not hasher.verify('secret123', 'not-a-hash')
+    assert not hasher.verify('secret123', None)
+    assert hasher.verify_and_upgrade('secret123', 12345) == (False, None)
+
+    # Current cost: nothing to upgrade
+    assert hasher.verify_and_upgrade('secret123', hashed) == (True, None)
+
+    old_hash = bcrypt.hashpw(b'secret123', bcrypt.gensalt(4))
+    matched, new_hash = hasher.verify_and_upgrade('secret123', old_hash)
+    assert matched and PasswordHasher.cost_of(new_hash) == 5
+    assert hasher.verify_and_upgrade('wrong', old_hash) == (False, None)
+    assert hasher.stats()['rehashes'] == 1
+
+
+def test_rejects_when_pool_is_full():
+    hasher = PasswordHasher(rounds=4, max_workers=1, max_pending=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    worker = threading.Thread(target=hasher._run, args=(slow,))
+    worker.start()
+    started.wait(5)
+
+    try:
+        hasher.hash('secret123')
+        assert False, 'pool accepted work beyond max_pending'
+    except PasswordPoolBusy:
+        pass
+    finally:
+        release.set()
+        worker.join()
+
+    assert hasher.stats()['rejected'] == 1
+    assert hasher.verify('secret123', hasher.hash('secret123'))
+
+
+def test_admitted_call_gives_up_after_timeout():
+    hasher = PasswordHasher(rounds=4, max_workers=1, max_pending=2, timeout_seconds=0.1)
+    release = threading.Event()
+
+    # Occupy the only worker without taking a slot
+    busy = hasher._get_executor().submit(release.wait, 5)
+
+    try:
+        hasher.hash('secret123')
+        assert False, 'call waited past timeout_seconds'
+    except PasswordPoolBusy:
+        pass
+    finally:
+        release.set()
+        busy.result()
+
+    assert hasher.stats()['timeouts'] == 1
+    assert hasher.stats()['rejected'] == 0
+    hasher.timeout_seconds = 5
+    assert hasher.verify('secret123', hasher.hash('secret123'))
@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from phrase_matcher import PhraseMatcher
+
+
+def test_finds_overlapping_phrases():
+    matcher = PhraseMatcher()
+    matcher.add('data', 'word')
+    matcher.add('data scientist', 'career')
+    matcher.add('scientist', 'word')
+    matcher.build()
+
+    found = {(label, phrase) for label, phrase, _, _ in matcher.find('a data scientist')}
+
+    assert found == {('word', 'data'), ('career', 'data scientist'), ('word', 'scientist')}
+
+
+def test_whole_word_boundaries():
+    matcher = PhraseMatcher()
+    matcher.add('it', 'subject')
+    matcher.add('hi', 'greeting')
+
+    assert matcher.find('history with python') == []
+    assert matcher.find('hi, i like it') == [
+        ('greeting', 'hi', 0, 2),
+        ('subject', 'it', 11, 13)
+    ]
+
+
+def test_prefix_phrases_match_inflected_forms():
+    matcher = PhraseMatcher()
+    matcher.add('recommend', 'intent', prefix=True)
+    matcher.add('hi', 'greeting')
+
+    assert matcher.find('any recommendations?') == [('intent', 'recommend', 4, 13)]
+    # Still anchored at the start of a word
+    assert matcher.find('unrecommended') == []
+    assert matcher.find('history') == []
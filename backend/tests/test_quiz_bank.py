@@ -0,0 +1,99 @@
+import sys
+import os
+import gzip
+import json
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from quiz_bank import QuestionBank, normalize_question
+
+
+def test_builtin_snapshot_is_stable():
+    questions = [{'id': 1, 'question': 'What is 2 + 2?', 'options': ['3', '4'], 'correct': '4'}]
+    bank = QuestionBank({'aptitude': questions}, refresh_seconds=0)
+
+    first = bank.get('aptitude')
+    second = bank.get('aptitude')
+
+    assert first is second
+    assert first.source == 'builtin'
+    assert json.loads(gzip.decompress(first.gzip_body)) == {'version': first.version, 'questions': questions}
+    assert first.etag != first.gzip_etag
+
+
+def test_normalize_populated_question():
+    question = normalize_question({
+        'type': 'aptitude',
+        'category': 'verbal',
+        'question': 'Choose the synonym of "Eloquent"',
+        'options': ['Articulate', 'Hesitant'],
+        'correct_answer': 0,
+        'skills_tested': ['vocabulary']
+    }, 3)
+
+    assert question['id'] == 3
+    assert question['correct'] == 'Articulate'
+    assert question['skills'] == ['vocabulary']
+
+
+def test_compiled_answers_accept_option_index():
+    bank = QuestionBank({'aptitude': [
+        {'question': 'What is 2 + 2?', 'options': ['3', '4'], 'correct': '4', 'category': 'numerical'}
+    ]})
+    compiled = bank.get('aptitude').compiled
+
+    assert compiled.answer_at({'0': 1}, 0) == '4'
+    assert compiled.answer_at({'0': '4'}, 0) == '4'
+    assert compiled.answer_at({}, 0) is None
+    assert compiled.category_totals['numerical'] == 1
+
+
+class FakeQuestions:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query):
+        return self
+
+    def sort(self, field, direction):
+        return self.documents
+
+
+class FakeDB:
+    def __init__(self, documents):
+        self.quiz_questions = FakeQuestions(documents)
+
+
+def test_seeded_personality_documents_fall_back_to_builtin():
+    from quiz_api import PERSONALITY_QUESTIONS, score_quiz
+    # Shape written by populate_quiz_questions.py: trait weights, no careers
+    seeded = {
+        'type': 'personality',
+        'category': 'work_style',
+        'question': 'I prefer working:',
+        'options': ['Alone', 'In small groups', 'In large teams', 'It depends on the task'],
+        'trait_mapping': {'0': {'introversion': 3, 'independence': 3}}
+    }
+    bank = QuestionBank({'personality': PERSONALITY_QUESTIONS})
+
+    snapshot = bank.get('personality', FakeDB([seeded]))
+    score, _, tally = score_quiz('personality', snapshot.compiled, {'0': 'Alone'})
+
+    assert snapshot.source == 'builtin'
+    assert score['traits'] == {'work_style': 3}
+    assert 'Software Engineer' in tally
+
+
+def test_answers_are_checked_against_the_quiz_size():
+    bank = QuestionBank({'aptitude': [
+        {'question': 'What is 2 + 2?', 'options': ['3', '4'], 'correct': '4'},
+        {'question': 'What is 3 + 3?', 'options': ['6', '7'], 'correct': '6'}
+    ]})
+    compiled = bank.get('aptitude').compiled
+
+    assert compiled.answers_error({'0': '4', '1': 0}) is None
+    assert compiled.answers_error({}) is None
+    assert compiled.answers_error(['4', '6']) is not None
+    assert compiled.answers_error({str(idx): '4' for idx in range(3)}) is not None
+    assert compiled.answers_error({'2': '4'}) is not None
+    assert compiled.answers_error({'0': {'$gt': ''}}) is not None
+    assert compiled.answers_error({'0': True}) is not None
+    assert compiled.answers_error({'0': 'x' * 1000}) is not None
@@ -0,0 +1,95 @@
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from bson import ObjectId
+from flask import Flask
+from quiz_api import quiz_bp
+
+
+def matches(document, query):
+    """The subset of MongoDB matching the results route uses"""
+    for field, condition in query.items():
+        if field == '$or':
+            if not any(matches(document, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = document.get(field)
+            if value is None or not value < condition['$lt']:
+                return False
+        elif document.get(field) != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        # completed_at desc with missing dates last, then _id desc
+        self.documents.sort(key=lambda doc: (doc.get('completed_at') is not None, doc.get('completed_at') or datetime.min, doc['_id']), reverse=True)
+        return self
+
+    def limit(self, count):
+        return [dict(doc) for doc in self.documents[:count]]
+
+
+class FakeResults:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        return FakeCursor([doc for doc in self.documents if matches(doc, query)])
+
+    def count_documents(self, query):
+        return len([doc for doc in self.documents if matches(doc, query)])
+
+
+class FakeDB:
+    def __init__(self, documents):
+        self.quiz_results = FakeResults(documents)
+
+
+def make_client(documents):
+    app = Flask(__name__)
+    app.config['DB'] = FakeDB(documents)
+    app.register_blueprint(quiz_bp)
+    return app.test_client()
+
+
+def test_pages_cover_every_result_once():
+    start = datetime(2024, 1, 1)
+    documents = [
+        {'_id': ObjectId(), 'user_id': 'u1', 'completed_at': start + timedelta(minutes=idx % 3)}
+        for idx in range(5)
+    ]
+    # Older results may predate completed_at
+    documents += [{'_id': ObjectId(), 'user_id': 'u1'} for _ in range(3)]
+    documents.append({'_id': ObjectId(), 'user_id': 'u2', 'completed_at': start})
+    client = make_client(documents)
+
+    first = client.get('/api/quiz/results/u1?limit=3').get_json()
+    assert first['count'] == 3
+    assert first['total'] == 8
+    assert first['has_more'] is True
+
+    # Page size 3 puts cursors on both dated and undated results
+    pages = [first]
+    while pages[-1]['has_more']:
+        pages.append(client.get(f"/api/quiz/results/u1?limit=3&cursor={pages[-1]['next_cursor']}").get_json())
+
+    assert [page['count'] for page in pages] == [3, 3, 2]
+    assert pages[-1]['next_cursor'] is None
+    ids = [result['_id'] for page in pages for result in page['results']]
+    assert sorted(ids) == sorted(str(doc['_id']) for doc in documents[:8])
+    assert all('completed_at' not in result for result in pages[-1]['results'])
+
+
+def test_malformed_cursor_is_rejected():
+    client = make_client([])
+
+    response = client.get('/api/quiz/results/u1?cursor=not-a-cursor')
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor'}
@@ -0,0 +1,33 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from quiz_api import score_quiz, score_personality_bulk, question_bank
+
+
+def test_personality_tally_and_trait_means():
+    compiled = question_bank.get('personality').compiled
+    answers = {'0': 'Alone', '1': 'Analyze it logically', '5': 'Strongly Agree', '6': 'Disagree'}
+
+    score, skills, tally = score_quiz('personality', compiled, answers)
+
+    assert skills == []
+    assert score['traits']['creativity'] == 5
+    assert score['traits']['leadership'] == 2
+    assert list(tally)[:2] == ['Software Engineer', 'Data Scientist']
+    assert tally['Software Engineer']['count'] == 2
+    assert tally['Software Engineer']['reasons'] == [
+        'Your Work Style aligns well with this career',
+        'Your Problem Solving aligns well with this career'
+    ]
+    assert score['career_preferences'] == list(tally)
+
+
+def test_bulk_matches_single_scoring():
+    compiled = question_bank.get('personality').compiled
+    submissions = [{'0': 'Alone'}, {}, {'2': 1, '9': 'Agree'}]
+
+    bulk = score_personality_bulk(compiled, submissions)
+
+    for answers, (score, tally) in zip(submissions, bulk):
+        assert (score, [], tally) == score_quiz('personality', compiled, answers)
+    assert bulk[1][0] == {'traits': {}, 'overall': 0, 'career_preferences': []}
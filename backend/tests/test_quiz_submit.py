@@ -0,0 +1,28 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from flask import Flask
+from quiz_api import quiz_bp, question_bank
+
+
+def make_client():
+    app = Flask(__name__)
+    app.config['DB'] = None
+    app.config['SECRET_KEY'] = 'test-secret-key-that-is-at-least-32-bytes'
+    app.register_blueprint(quiz_bp)
+    return app.test_client()
+
+
+def test_submission_must_name_the_question_version():
+    client = make_client()
+    version = question_bank.get('personality', None).version
+
+    response = client.post('/api/quiz/submit', json={'quiz_type': 'personality', 'answers': {}})
+    assert response.status_code == 400
+    assert response.get_json()['version'] == version
+
+    response = client.post('/api/quiz/submit', json={'quiz_type': 'personality', 'version': 'old', 'answers': {}})
+    assert response.status_code == 409
+
+    response = client.post('/api/quiz/submit', json={'quiz_type': 'personality', 'version': version, 'answers': {'0': 'Alone'}})
+    assert response.status_code == 200
@@ -0,0 +1,163 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from pymongo.errors import DuplicateKeyError
+import rescore_quiz_results
+from rescore_quiz_results import rescore_quiz_results as rescore, score_batch, _init_worker, start_rescore_job, CHECKPOINT_COLLECTION
+from quiz_api import PERSONALITY_QUESTIONS
+
+
+class FakeCursor(list):
+    def sort(self, field, direction):
+        return FakeCursor(sorted(self, key=lambda doc: doc['_id']))
+
+    def batch_size(self, size):
+        return self
+
+    def limit(self, count):
+        return FakeCursor(self[:count])
+
+
+class FakeResults:
+    def __init__(self, documents, fail_on_write=None):
+        self.documents = documents
+        self.fail_on_write = fail_on_write
+        self.writes = []
+
+    def find(self, query, projection):
+        after = query.get('_id', {}).get('$gt')
+        return FakeCursor(
+            doc for doc in self.documents
+            if doc['quiz_type'] == query['quiz_type'] and (after is None or doc['_id'] > after)
+        )
+
+    def bulk_write(self, operations, ordered=True):
+        if len(self.writes) + 1 == self.fail_on_write:
+            self.fail_on_write = None
+            raise ConnectionError('database unavailable')
+        self.writes.append([operation._filter['_id'] for operation in operations])
+
+
+class FakeCheckpoints:
+    def __init__(self):
+        self.documents = {}
+
+    def find_one(self, query):
+        return self.documents.get(query['_id'])
+
+    def replace_one(self, query, document, upsert=False):
+        self.documents[query['_id']] = dict(document)
+
+    def update_one(self, query, update, upsert=False):
+        document = self.documents.get(query['_id'])
+        if document is None or document.get('status') != query.get('status', document.get('status')):
+            return
+        if '$or' in query:
+            # A claim: only a job that isn't running (or went quiet) can be taken
+            if document.get('status') == 'running' and document['updated_at'] >= query['$or'][1]['updated_at']['$lt']:
+                raise DuplicateKeyError('job is running')
+        for key, value in update['$set'].items():
+            if key.startswith('progress.'):
+                document['progress'][key.split('.', 1)[1]] = dict(value)
+            else:
+                document[key] = value
+
+
+class FakeEmpty:
+    def find(self, *args):
+        return FakeCursor()
+
+
+class FakeDB:
+    def __init__(self, documents, fail_on_write=None):
+        self.quiz_results = FakeResults(documents, fail_on_write)
+        self.quiz_questions = FakeEmpty()
+        self.careers = FakeEmpty()
+        self.checkpoints = FakeCheckpoints()
+
+    def __getitem__(self, name):
+        assert name == CHECKPOINT_COLLECTION
+        return self.checkpoints
+
+
+def test_score_batch_returns_one_entry_per_result():
+    _init_worker({'personality': PERSONALITY_QUESTIONS})
+
+    scored = score_batch('personality', [(1, {'0': 'Alone'}), (2, {})])
+
+    assert [result_id for result_id, _, _, _ in scored] == [1, 2]
+    assert scored[0][1]['traits'] == {'work_style': 3}
+    assert scored[0][3][0]['career_name'] == 'Software Engineer'
+    assert scored[1][3] == []
+
+
+def test_resume_continues_after_last_written_batch():
+    documents = [{'_id': idx, 'quiz_type': 'personality', 'answers': {'0': 'Alone'}} for idx in range(1, 6)]
+    db = FakeDB(documents, fail_on_write=2)
+
+    try:
+        rescore(db, quiz_types=('personality',), batch_size=2, workers=0)
+        assert False, 'expected the second batch to fail'
+    except ConnectionError:
+        pass
+
+    checkpoint = db.checkpoints.documents['quiz-rescore']
+    assert checkpoint['status'] == 'failed'
+    assert checkpoint['progress']['personality'] == {'last_id': 2, 'processed': 2}
+
+    checkpoint = rescore(db, quiz_types=('personality',), batch_size=2, workers=0, resume=True)
+
+    assert checkpoint['status'] == 'completed'
+    assert checkpoint['progress']['personality'] == {'last_id': 5, 'processed': 5}
+    assert db.quiz_results.writes == [[1, 2], [3, 4], [5]]
+
+
+class FakeProcess:
+    def __init__(self, returncode):
+        self.returncode = returncode
+
+    def wait(self):
+        return self.returncode
+
+
+class FakeThread:
+    def start(self):
+        pass
+
+
+def start_with_exit_code(db, returncode, monkeypatch):
+    threads = []
+    monkeypatch.setattr(rescore_quiz_results.subprocess, 'Popen', lambda *args, **kwargs: FakeProcess(returncode))
+    # The reaper is run by hand so the test can step through it
+    monkeypatch.setattr(rescore_quiz_results.threading, 'Thread', lambda target, args, daemon: threads.append((target, args)) or FakeThread())
+    return start_rescore_job(db, job_id='quiz-rescore'), threads
+
+
+def test_running_job_is_not_started_twice(monkeypatch):
+    db = FakeDB([])
+    db.checkpoints.documents['quiz-rescore'] = {'_id': 'quiz-rescore', 'status': 'completed', 'progress': {}}
+
+    first, threads = start_with_exit_code(db, 0, monkeypatch)
+    second, _ = start_with_exit_code(db, 0, monkeypatch)
+
+    assert first is True
+    assert second is False
+    assert db.checkpoints.documents['quiz-rescore']['status'] == 'running'
+
+    # The reaper waits on the child; a clean exit leaves the status to the job
+    target, args = threads[0]
+    target(*args)
+    assert db.checkpoints.documents['quiz-rescore']['status'] == 'running'
+
+
+def test_crashed_job_process_is_marked_failed(monkeypatch):
+    db = FakeDB([])
+    db.checkpoints.documents['quiz-rescore'] = {'_id': 'quiz-rescore', 'status': 'failed', 'progress': {}}
+
+    _, threads = start_with_exit_code(db, -9, monkeypatch)
+    target, args = threads[0]
+    target(*args)
+
+    checkpoint = db.checkpoints.documents['quiz-rescore']
+    assert checkpoint['status'] == 'failed'
+    assert checkpoint['error'] == 'Job process exited with code -9'
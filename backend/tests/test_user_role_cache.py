@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from bson import ObjectId
+from user_role_cache import UserRoleCache
+
+
+class FakeUsers:
+    def __init__(self, users):
+        self.users = users
+        self.queries = []
+
+    def find_one(self, query, projection):
+        self.queries.append(projection)
+        user = self.users.get(query['_id'])
+        return {key: user[key] for key in projection if key in user} if user else None
+
+
+class FakeDB:
+    def __init__(self, users):
+        self.users = FakeUsers(users)
+
+
+def test_cached_until_invalidated():
+    admin_id = ObjectId()
+    db = FakeDB({admin_id: {'role': 'admin', 'password': 'hash'}})
+    cache = UserRoleCache()
+
+    assert cache.get(str(admin_id), db) == {'role': 'admin', 'is_active': True}
+    assert cache.get(str(admin_id), db) == {'role': 'admin', 'is_active': True}
+    assert db.users.queries == [{'role': 1, 'is_active': 1}]
+
+    db.users.users[admin_id]['is_active'] = False
+    cache.invalidate(admin_id)
+    assert cache.get(str(admin_id), db)['is_active'] is False
+
+    missing_id = str(ObjectId())
+    assert cache.get(missing_id, db) is None
+    assert cache.get(missing_id, db) is None
+    assert len(db.users.queries) == 3
+
+
+def test_entries_expire():
+    user_id = ObjectId()
+    db = FakeDB({user_id: {'role': 'student'}})
+    cache = UserRoleCache(ttl_seconds=0)
+
+    cache.get(str(user_id), db)
+    cache.get(str(user_id), db)
+    assert len(db.users.queries) == 2
@@ -0,0 +1,47 @@
+import sys
+import os
+import re
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from user_search import name_tokens, user_search_query, backfill_name_tokens
+
+
+def test_name_tokens_are_lowercase_words():
+    assert name_tokens('José  de la Cruz') == ['jose', 'de', 'la', 'cruz']
+    assert name_tokens('Anna anna') == ['anna']
+    assert name_tokens(None) == []
+
+
+def test_query_matches_name_word_prefixes():
+    query = user_search_query(' Joh Sm ')
+    email, username, name = query['$or']
+
+    assert email == {'email': {'$regex': '^joh\\ sm'}}
+    assert username == {'username': {'$regex': '^joh\\ sm'}}
+    patterns = [clause['name_tokens']['$regex'] for clause in name['$and']]
+    assert patterns == ['^joh', '^sm']
+    assert all(any(re.match(pattern, token) for token in name_tokens('John Smith')) for pattern in patterns)
+
+
+class FakeUsers:
+    def __init__(self, users):
+        self.users = users
+        self.writes = []
+
+    def find(self, query, projection):
+        assert query == {'name_tokens': None}
+        return [user for user in self.users if 'name_tokens' not in user]
+
+    def bulk_write(self, operations, ordered=True):
+        self.writes.append(len(operations))
+
+
+class FakeDB:
+    def __init__(self, users):
+        self.users = FakeUsers(users)
+
+
+def test_backfill_batches_missing_users():
+    db = FakeDB([{'_id': idx, 'name': f'User {idx}'} for idx in range(5)] + [{'_id': 9, 'name_tokens': []}])
+
+    assert backfill_name_tokens(db, batch_size=2) == 5
+    assert db.users.writes == [2, 2, 1]
@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from pymongo import InsertOne, UpdateOne
+from write_behind import WriteBehindQueue, WriteQueueFull
+
+
+class FakeCollection:
+    def __init__(self, name, failures=0):
+        self.name = name
+        self.full_name = f'test.{name}'
+        self.failures = failures
+        self.batches = []
+        self.ordered = []
+
+    def bulk_write(self, operations, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('database unavailable')
+        self.batches.append(list(operations))
+        self.ordered.append(ordered)
+
+
+def test_batches_per_collection_and_flushes_on_close():
+    writer = WriteBehindQueue(batch_size=100, flush_interval=60)
+    results = FakeCollection('quiz_results')
+    recommendations = FakeCollection('career_recommendations')
+
+    for idx in range(3):
+        writer.submit(results, InsertOne({'n': idx}))
+    writer.submit(recommendations, InsertOne({'n': 0}))
+    writer.close()
+
+    assert [len(batch) for batch in results.batches] == [3]
+    assert [len(batch) for batch in recommendations.batches] == [1]
+    assert writer.stats()['written'] == 4
+
+
+def test_full_queue_rejects_and_flush_retries():
+    writer = WriteBehindQueue(max_queue=1, backoff_seconds=0, enabled=True)
+    writer._ensure_worker = lambda: None  # keep items queued
+    results = FakeCollection('quiz_results', failures=2)
+
+    assert writer.submit(results, InsertOne({'n': 1})) is True
+    try:
+        writer.submit(results, InsertOne({'n': 2}))
+        assert False, 'expected WriteQueueFull'
+    except WriteQueueFull:
+        pass
+    assert results.batches == []
+
+    writer.flush()
+
+    stats = writer.stats()
+    assert stats['rejected'] == 1
+    assert stats['retries'] == 2
+    assert stats['written'] == 1
+    assert results.batches == [[InsertOne({'n': 1})]]
+
+
+def test_ordered_writes_keep_submission_order():
+    writer = WriteBehindQueue(flush_interval=60)
+    writer._ensure_worker = lambda: None
+    recommendations = FakeCollection('career_recommendations')
+    first = UpdateOne({'user_id': 'u1'}, {'$set': {'n': 1}}, upsert=True)
+    second = UpdateOne({'user_id': 'u1'}, {'$set': {'n': 2}}, upsert=True)
+
+    writer.submit(recommendations, first, ordered=True)
+    writer.submit(recommendations, InsertOne({'n': 0}))
+    writer.submit(recommendations, second, ordered=True)
+    writer.flush()
+
+    assert recommendations.ordered == [True, False]
+    assert recommendations.batches == [[first, second], [InsertOne({'n': 0})]]
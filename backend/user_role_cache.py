@@ -0,0 +1,89 @@
+"""
+User Role Cache
+Short-lived user ID -> role/active flag lookup used to authorize admin requests
+"""
+
+from bson import ObjectId
+import threading
+import time
+
+
+# Only the fields authorization reads
+USER_ROLE_PROJECTION = {
+    'role': 1,
+    'is_active': 1
+}
+
+
+class UserRoleCache:
+    """
+    Role and active flag per user ID
+
+    Each entry expires ttl_seconds after it was loaded. Admin writes that
+    change a user call invalidate(user_id) so this worker sees the change
+    immediately; the ttl bounds how long another worker can lag behind.
+    Unknown users are cached as None so repeated bad IDs are not queried.
+    """
+
+    def __init__(self, ttl_seconds=30, max_entries=1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id, db):
+        """Return {'role', 'is_active'} for a user, or None if there is no such user"""
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+
+        self.misses += 1
+        user = db.users.find_one({'_id': ObjectId(user_id)}, USER_ROLE_PROJECTION)
+        identity = None
+        if user is not None:
+            identity = {
+                'role': user.get('role'),
+                'is_active': user.get('is_active', True)
+            }
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {
+                    key: value for key, value in self._entries.items() if value[0] > now
+                }
+            if len(self._entries) >= self.max_entries:
+                self._entries = {}
+            self._entries[user_id] = (now + self.ttl_seconds, identity)
+
+        return identity
+
+    def invalidate(self, user_id=None):
+        """Drop one user's entry, or every entry when user_id is None"""
+        with self._lock:
+            if user_id is None:
+                self._entries = {}
+            else:
+                self._entries.pop(str(user_id), None)
+            self.invalidations += 1
+
+    def stats(self):
+        """Counters for monitoring"""
+        with self._lock:
+            size = len(self._entries)
+        return {
+            'size': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations
+        }
+
+
+user_role_cache = UserRoleCache()
@@ -0,0 +1,84 @@
+"""
+User Search
+Indexed name tokens behind the admin user search. Run this module once
+to add name_tokens to users created before it existed.
+
+Usage:
+    python user_search.py [--batch-size 1000]
+"""
+
+import argparse
+import os
+import re
+
+from pymongo import MongoClient, UpdateOne
+
+from catalogue_search import tokenize
+
+
+def name_tokens(name):
+    """Distinct lowercase, accent-free words of a user's name"""
+    return list(dict.fromkeys(tokenize(name)))
+
+
+def user_search_query(search):
+    """
+    Users whose email or username starts with search, or whose name has
+    a word starting with each word of search ("joh sm" finds "John Smith")
+
+    Every clause is an anchored prefix, so each one is answered from an
+    index: email and username from their unique indexes, names from the
+    multikey name_tokens index.
+    """
+    search = search.strip().lower()
+    prefix = '^' + re.escape(search)
+    clauses = [
+        {'email': {'$regex': prefix}},
+        {'username': {'$regex': prefix}}
+    ]
+
+    words = name_tokens(search)
+    if words:
+        clauses.append({'$and': [
+            {'name_tokens': {'$regex': '^' + re.escape(word)}} for word in words
+        ]})
+
+    return {'$or': clauses}
+
+
+def backfill_name_tokens(db, batch_size=1000):
+    """Set name_tokens on every user that doesn't have it; returns the count"""
+    updated = 0
+    operations = []
+
+    # Missing fields index as null, so this only visits users still to do
+    for user in db.users.find({'name_tokens': None}, {'name': 1}):
+        operations.append(UpdateOne(
+            {'_id': user['_id']},
+            {'$set': {'name_tokens': name_tokens(user.get('name'))}}
+        ))
+        if len(operations) >= batch_size:
+            db.users.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+
+    if operations:
+        db.users.bulk_write(operations, ordered=False)
+        updated += len(operations)
+
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add name_tokens to existing users')
+    parser.add_argument('--mongodb-uri', default=os.getenv('MONGODB_URI', 'mongodb://localhost:27017/career_counselling'))
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    db = MongoClient(args.mongodb_uri).get_database()
+    updated = backfill_name_tokens(db, args.batch_size)
+    print(f"✅ Added name_tokens to {updated} users")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""
+Write-Behind Queue
+Buffers MongoDB writes off the request thread and flushes them in batches
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+from pymongo.errors import BulkWriteError
+
+
+class WriteQueueFull(Exception):
+    """Raised when the write-behind queue has no room for another write"""
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue of pending writes drained by a background thread
+
+    Writes are grouped per collection and sent with one bulk_write once
+    batch_size writes are waiting or flush_interval seconds have passed.
+    Inserts go unordered; writes submitted with ordered=True (upserts on
+    a shared key) keep their submission order. Transient failures are
+    retried with exponential backoff on the flush thread. When the queue
+    is full, submit() raises WriteQueueFull immediately so the request
+    thread never waits on the database. Pending writes are flushed when
+    the process exits.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=1.0, max_queue=10000,
+                 max_retries=5, backoff_seconds=0.5, enabled=True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.enabled = enabled
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed = 0
+        self.rejected = 0
+        self.last_flush_seconds = None
+        self.last_error = None
+
+    def _ensure_worker(self):
+        """Start the flush thread lazily, and again in forked workers"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def submit(self, collection, operation, ordered=False):
+        """
+        Queue a pymongo write model (InsertOne, UpdateOne, ...) for a collection
+
+        Args:
+            ordered: Apply in submission order relative to the collection's
+                other ordered writes
+
+        Returns:
+            True if queued, False if it was written synchronously because
+            the queue is disabled
+
+        Raises:
+            WriteQueueFull: The queue is at max_queue
+        """
+        if not self.enabled:
+            self._write(collection, [operation], ordered)
+            return False
+
+        self._ensure_worker()
+
+        try:
+            self._queue.put_nowait((collection, operation, ordered))
+            self.enqueued += 1
+            return True
+        except queue.Full:
+            self.rejected += 1
+            raise WriteQueueFull('Server is busy, please try again shortly')
+
+    def _drain(self, timeout):
+        """Collect up to batch_size writes, waiting at most timeout seconds"""
+        items = []
+        deadline = time.monotonic() + timeout
+
+        while len(items) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0 and not self._stop.is_set():
+                    # Wake up regularly so close() isn't held up by a long interval
+                    items.append(self._queue.get(timeout=min(remaining, 0.25)))
+                else:
+                    items.append(self._queue.get_nowait())
+            except queue.Empty:
+                if remaining <= 0 or self._stop.is_set():
+                    break
+
+        return items
+
+    def _run(self):
+        while not self._stop.is_set():
+            items = self._drain(self.flush_interval)
+            if items:
+                self._flush(items)
+
+    def _flush(self, items):
+        started = time.perf_counter()
+
+        groups = {}
+        for collection, operation, ordered in items:
+            key = (collection.full_name, ordered)
+            if key not in groups:
+                groups[key] = (collection, [])
+            groups[key][1].append(operation)
+
+        for (_, ordered), (collection, operations) in groups.items():
+            self._write(collection, operations, ordered)
+
+        self.last_flush_seconds = round(time.perf_counter() - started, 4)
+
+    def _write(self, collection, operations, ordered=False):
+        """bulk_write with retries; documents keep their _id across attempts"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                collection.bulk_write(operations, ordered=ordered)
+                self.written += len(operations)
+                self.batches += 1
+                return
+
+            except BulkWriteError as e:
+                # Individual write errors (e.g. duplicate keys) won't succeed on retry
+                details = e.details or {}
+                errors = details.get('writeErrors', [])
+                # An ordered batch stops at its first error
+                applied = errors[0]['index'] if ordered and errors else len(operations) - len(errors)
+                self.written += applied
+                self.failed += len(operations) - applied
+                self.batches += 1
+                self.last_error = str(e)
+                print(f"⚠️ Write-behind: {len(operations) - applied} writes to {collection.name} failed")
+                return
+
+            except Exception as e:
+                self.last_error = str(e)
+                if attempt == self.max_retries:
+                    break
+                self.retries += 1
+                time.sleep(self.backoff_seconds * (2 ** attempt))
+
+        self.failed += len(operations)
+        print(f"❌ Write-behind: gave up on {len(operations)} writes to {collection.name}: {self.last_error}")
+
+    def flush(self):
+        """Write everything queued so far on the calling thread"""
+        while True:
+            items = self._drain(0)
+            if not items:
+                return
+            self._flush(items)
+
+    def close(self, timeout=10):
+        """Stop the flush thread and write whatever is still queued"""
+        self._stop.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        """Counters for monitoring"""
+        return {
+            'enabled': self.enabled,
+            'queued': self._queue.qsize(),
+            'max_queue': self._queue.maxsize,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'batches': self.batches,
+            'retries': self.retries,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'last_flush_seconds': self.last_flush_seconds,
+            'last_error': self.last_error
+        }
+
+
+quiz_writer = WriteBehindQueue(
+    batch_size=int(os.getenv('WRITE_BEHIND_BATCH_SIZE', 500)),
+    flush_interval=float(os.getenv('WRITE_BEHIND_FLUSH_SECONDS', 1.0)),
+    max_queue=int(os.getenv('WRITE_BEHIND_MAX_QUEUE', 10000)),
+    enabled=os.getenv('WRITE_BEHIND_ENABLED', 'True') == 'True'
+)
+
+atexit.register(quiz_writer.close)
@@ -11,6 +11,7 @@ function Quiz() {
   const navigate = useNavigate();
   const [quizType, setQuizType] = useState(null); // 'aptitude' or 'personality'
   const [questions, setQuestions] = useState([]);
+  const [questionVersion, setQuestionVersion] = useState(null);
   const [currentQuestion, setCurrentQuestion] = useState(0);
   const [answers, setAnswers] = useState({});
   const [quizStarted, setQuizStarted] = useState(false);
@@ -19,6 +20,7 @@ function Quiz() {
   const [timeRemaining, setTimeRemaining] = useState(null);
   const [results, setResults] = useState(null);
   const [showResults, setShowResults] = useState(false);
+  const [submitError, setSubmitError] = useState(null);
 
   useEffect(() => {
     if (quizStarted && timeRemaining > 0) {
@@ -31,13 +33,18 @@ function Quiz() {
     }
   }, [timeRemaining, quizStarted]);
 
+  const loadQuestions = async (type) => {
+    const response = await axios.get(`${API_URL}/quiz/${type}/questions`);
+    setQuestions(response.data.questions || []);
+    setQuestionVersion(response.data.version || null);
+  };
+
   const startQuiz = async (type) => {
     setQuizType(type);
     setLoading(true);
     
     try {
-      const response = await axios.get(`${API_URL}/quiz/${type}/questions`);
-      setQuestions(response.data.questions || []);
+      await loadQuestions(type);
       setQuizStarted(true);
       if (type === 'aptitude') {
         setTimeRemaining(20 * 60); // 20 minutes for aptitude
@@ -152,6 +159,7 @@ function Quiz() {
   const handleSubmitQuiz = async () => {
     setLoading(true);
     setQuizCompleted(true);
+    setSubmitError(null);
     
     try {
       const token = localStorage.getItem('token');
@@ -159,8 +167,8 @@ function Quiz() {
         `${API_URL}/quiz/submit`,
         {
           quiz_type: quizType,
-          answers: answers,
-          questions: questions
+          version: questionVersion,
+          answers: answers
         },
         {
           headers: { Authorization: `Bearer ${token}` }
@@ -172,12 +180,24 @@ function Quiz() {
       setShowResults(true);
     } catch (error) {
       console.error('Error submitting quiz:', error);
-      // Show mock results
-      setResults({
-        score: { correct: 3, total: 5, percentage: 60 },
-        recommendations: []
-      });
-      setShowResults(true);
+      setQuizCompleted(false);
+      
+      if (error.response?.status === 409) {
+        // The questions changed since they were loaded; answers no longer line up
+        try {
+          await loadQuestions(quizType);
+        } catch (reloadError) {
+          console.error('Error reloading quiz:', reloadError);
+        }
+        setAnswers({});
+        setCurrentQuestion(0);
+        if (quizType === 'aptitude') {
+          setTimeRemaining(20 * 60);
+        }
+        setSubmitError('The quiz questions were updated while you were answering. Please answer the updated questions.');
+      } else {
+        setSubmitError(error.response?.data?.error || 'Could not submit your answers. Please try again.');
+      }
     } finally {
       setLoading(false);
     }
@@ -265,6 +285,7 @@ function Quiz() {
                   setResults(null);
                   setShowResults(false);
                   setTimeRemaining(null);
+                  setSubmitError(null);
                 }}
               >
                 Take Another Quiz
@@ -418,6 +439,12 @@ function Quiz() {
           </Card.Header>
 
           <Card.Body className="p-4">
+            {submitError && (
+              <Alert variant="warning" dismissible onClose={() => setSubmitError(null)}>
+                {submitError}
+              </Alert>
+            )}
+
             {/* Progress Bar */}
             <div className="mb-4">
               <div className="d-flex justify-content-between mb-2">